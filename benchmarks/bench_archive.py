@@ -0,0 +1,99 @@
+# -------------------- REPORT ARCHIVE SIZE & SEEKS --------------------
+# Archives a synthetic corpus of reports (patients, pain levels, areas, activities and quotes
+# drawn at random, one report per session) and measures the compression ratio against the
+# plain-text reports, including the SQLite index, plus add throughput and random-read latency.
+# A smaller corpus is also archived with lzma blocks for comparison.
+# Usage: python benchmarks/bench_archive.py [reports]
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.archive import ReportArchive
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+from rehab.engine import recommend
+from rehab.report import MOTIVATIONAL_QUOTES, format_report
+
+START = 1_700_000_000
+
+
+def corpus(n, rng, patients=5000):
+    # Yields (report values, epoch seconds); recommendations are memoised like the GUI's engine cache
+    names = [(f"Student{i:05d}", rng.choice(YEAR_LEVELS)) for i in range(patients)]
+    advice = {}
+    for i in range(n):
+        name, year = rng.choice(names)
+        pain = rng.randint(0, 10)
+        area = ", ".join(sorted(rng.sample(BODY_AREAS, rng.choice((1, 1, 1, 2))), key=BODY_AREAS.index))
+        activity = rng.choice(ACTIVITIES)
+        key = (pain, area, activity)
+        rec = advice.get(key)
+        if rec is None:
+            rec = advice[key] = recommend(pain, area, activity)
+        yield ({"name": name, "year": year, "pain": pain, "area": area, "activity": activity,
+                "motivation": rng.choice(MOTIVATIONAL_QUOTES), "status": rec["status"],
+                "rec_exercise": rec["rec_exercise"], "diet": rec["diet"], "tips": rec["tips"]},
+               START + i * 30)
+
+
+def archive(folder, n, method):
+    start = time.perf_counter()
+    with ReportArchive(folder, method) as reports:
+        for r, when in corpus(n, random.Random(11)):
+            reports.add(r, when)
+        reports.flush()
+        elapsed = time.perf_counter() - start
+        stats = reports.stats()
+    return elapsed, stats
+
+
+def main(n=1_000_000):
+    with tempfile.TemporaryDirectory() as folder:
+        elapsed, stats = archive(folder, n, "zlib")
+        print(f"{n:,} reports, {stats['blocks']:,} distinct advice blocks, {n / elapsed:,.0f} reports/s added")
+        print(f"plain text {stats['raw_bytes'] / 1e6:,.1f} MB -> segments {stats['segment_bytes'] / 1e6:,.1f} MB "
+              f"+ index {stats['index_bytes'] / 1e6:,.1f} MB; ratio {stats['ratio']:.1f}x "
+              f"({stats['raw_bytes'] / stats['segment_bytes']:.1f}x without the index)")
+
+        # Random reads, checked against the text the GUI would have written
+        rng = random.Random(2)
+        wanted = sorted(rng.sample(range(n), 2000))
+        expected, picks = {}, iter(wanted)
+        pick = next(picks)
+        for i, (r, _) in enumerate(corpus(n, random.Random(11))):
+            if i == pick:
+                expected[i + 1] = format_report(r)
+                pick = next(picks, None)
+                if pick is None:
+                    break
+        ids = list(expected)
+        rng.shuffle(ids)
+        times = []
+        with ReportArchive(folder) as reports:
+            for report_id in ids:
+                began = time.perf_counter()
+                text = reports.get(report_id)
+                times.append((time.perf_counter() - began) * 1e6)
+                assert text == expected[report_id], report_id
+            began = time.perf_counter()
+            found = reports.find("Student00042")
+            lookup = (time.perf_counter() - began) * 1000
+        times.sort()
+        print(f"get (random ids, {len(ids):,}): median {statistics.median(times):.0f} us, "
+              f"p99 {times[int(len(times) * 0.99)]:.0f} us; all match format_report")
+        print(f"find one patient: {len(found)} reports in {lookup:.2f} ms")
+
+    small = min(n, 100_000)
+    for method in ("zlib", "lzma"):
+        with tempfile.TemporaryDirectory() as folder:
+            elapsed, stats = archive(folder, small, method)
+            print(f"{method:4s} blocks, {small:,} reports: segments {stats['segment_bytes'] / 1e6:,.2f} MB, "
+                  f"{small / elapsed:,.0f} reports/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
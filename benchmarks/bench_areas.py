@@ -0,0 +1,60 @@
+# -------------------- BODY AREA QUERIES --------------------
+# Compares "sessions with both Knee and Back" and per-area counts done as a scan over the
+# wizard's "Knee, Back" strings with the same queries on the AreaBitmapIndex.
+# Usage: python benchmarks/bench_areas.py [sessions]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.areas import AreaBitmapIndex, count, to_mask
+from rehab.choices import BODY_AREAS
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(n=2_000_000):
+    rng = random.Random(11)
+    combos = [[a for a in BODY_AREAS if rng.random() < 0.25] or ["Knee"] for _ in range(512)]
+    labels = [", ".join(c) for c in combos]
+    picks = [rng.randrange(len(combos)) for _ in range(n)]
+    texts = [labels[i] for i in picks]
+    masks = [to_mask(combos[i]) for i in picks]
+
+    def scan_both():
+        return sum(1 for t in texts if "Knee" in t.split(", ") and "Back" in t.split(", "))
+
+    def scan_counts():
+        counts = dict.fromkeys(BODY_AREAS, 0)
+        for t in texts:
+            for area in t.split(", "):
+                counts[area] += 1
+        return counts
+
+    index, build = timed(lambda: AreaBitmapIndex(masks), repeat=1)
+    both_scan, t_scan_both = timed(scan_both, repeat=1)
+    counts_scan, t_scan_counts = timed(scan_counts, repeat=1)
+    both_bits, t_bits_both = timed(lambda: count(index.all_of(("Knee", "Back"))))
+    either_bits, t_bits_any = timed(lambda: count(index.any_of(("Knee", "Back"))))
+    counts_bits, t_bits_counts = timed(index.area_counts)
+    assert both_scan == both_bits and counts_scan == counts_bits
+
+    print(f"{n:,} sessions, index built in {build * 1000:.0f} ms")
+    print(f"Knee AND Back ({both_bits:,}): scan {t_scan_both * 1000:8.1f} ms   bitmap {t_bits_both * 1000:6.2f} ms"
+          f"   ({t_scan_both / t_bits_both:.0f}x)")
+    print(f"Knee OR Back  ({either_bits:,}): bitmap {t_bits_any * 1000:6.2f} ms")
+    print(f"Per-area counts: scan {t_scan_counts * 1000:8.1f} ms   bitmap {t_bits_counts * 1000:6.2f} ms"
+          f"   ({t_scan_counts / t_bits_counts:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,58 @@
+# -------------------- NAME AUTOCOMPLETE LATENCY --------------------
+# Builds the NameIndex over a synthetic roster and replays typing names one keystroke at
+# a time, timing every suggest() call; also times adding new students incrementally.
+# Usage: python benchmarks/bench_autocomplete.py [students]
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.autocomplete import NameIndex
+
+FIRST = ["Aaliyah", "Ben", "Chloe", "Daniel", "Ella", "Finn", "Grace", "Harry", "Isla", "Jack", "Kai", "Lily",
+         "Mason", "Noah", "Olivia", "Priya", "Quinn", "Ruby", "Sam", "Tane", "Uma", "Vivek", "Wiremu", "Zoe"]
+LAST = ["Anderson", "Brown", "Chen", "Davies", "Edwards", "Fraser", "Gupta", "Harris", "Iti", "Jones", "Kaur",
+        "Lee", "Martin", "Nguyen", "O'Brien", "Patel", "Robinson", "Singh", "Taylor", "Walker", "Wilson", "Young"]
+
+
+def make_names(n, rng):
+    names = set()
+    while len(names) < n:
+        names.add(f"{rng.choice(FIRST)} {rng.choice(LAST)}{rng.randrange(100000)}")
+    return list(names)
+
+
+def main(n=100_000):
+    rng = random.Random(16)
+    names = make_names(n, rng)
+    start = time.perf_counter()
+    index = NameIndex(names)
+    build = time.perf_counter() - start
+
+    timings = []
+    for name in rng.sample(names, 500):
+        for end in range(1, len(name) + 1):      # One suggest() per keystroke
+            start = time.perf_counter()
+            index.suggest(name[:end])
+            timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+
+    new_names = [f"New Student{i}" for i in range(1000)]
+    start = time.perf_counter()
+    for name in new_names:
+        index.add(name)
+    add_us = (time.perf_counter() - start) / len(new_names) * 1e6
+    assert index.suggest("new student99")[0] == "New Student99"
+
+    print(f"{n:,} students ({len(index.keys):,} keys), built in {build * 1000:.0f} ms")
+    print(f"suggest per keystroke ({len(timings):,}): p50 {statistics.median(timings):.1f} us   "
+          f"p99 {timings[int(len(timings) * 0.99)]:.1f} us   max {timings[-1]:.1f} us   "
+          f"over 1 ms: {sum(t > 1000 for t in timings)}")
+    print(f"add new student: {add_us:.1f} us each (no rebuild)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
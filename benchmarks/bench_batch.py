@@ -0,0 +1,40 @@
+# -------------------- BATCH ROSTER THROUGHPUT --------------------
+# Generates a synthetic CSV roster, runs the batch report generator on it and prints
+# rows per second and the peak memory of the driver process.
+# Usage: python benchmarks/bench_batch.py [rows] [workers]
+import csv
+import os
+import random
+import resource
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.batch import run_batch
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+
+
+def write_roster(path, rows, seed=3):
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as file:
+        out = csv.writer(file)
+        out.writerow(["name", "year", "pain_level", "body_areas", "activity"])
+        for n in range(rows):
+            out.writerow([f"Student {n}", rng.choice(YEAR_LEVELS), rng.randint(0, 10),
+                          ";".join(rng.sample(BODY_AREAS, rng.randint(1, 3))), rng.choice(ACTIVITIES)])
+
+
+def main(rows=200_000, workers=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        roster = os.path.join(tmp, "roster.csv")
+        write_roster(roster, rows)
+        summary = run_batch(roster, os.path.join(tmp, "reports"), workers)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"rows: {rows:,}, written: {summary['written']:,}, rejected: {summary['rejected']:,}")
+    print(f"{summary['seconds']:.1f} s, {summary['rows_per_second']:,.0f} rows/s, driver peak RSS {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
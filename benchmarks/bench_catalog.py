@@ -0,0 +1,57 @@
+# -------------------- EXERCISE CATALOG LOOKUPS --------------------
+# Builds a catalog of synthetic exercises and compares indexed/cached lookups with
+# rescanning the whole list per request.
+# Usage: python benchmarks/bench_catalog.py [exercises]
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.catalog import Exercise, ExerciseCatalog
+from rehab.choices import BODY_AREAS
+
+
+def synthetic_exercises(n, seed=5):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        low = rng.randint(0, 8)
+        items.append(Exercise(f"Exercise {i}", rng.choice(BODY_AREAS), "Synthetic exercise.",
+                              low, rng.randint(low, 10)))
+    return items
+
+
+def rescan(exercises, areas, pain):
+    # The old approach: look at every exercise on every request
+    return tuple(ex for ex in exercises if ex.target_area in areas and ex.min_pain <= pain <= ex.max_pain)
+
+
+def main(n=5000, requests=100_000):
+    tracemalloc.start()
+    exercises = synthetic_exercises(n)
+    catalog = ExerciseCatalog(exercises)
+    print(f"{n:,} exercises, catalog + indexes: {tracemalloc.get_traced_memory()[0] / 1e6:.1f} MB")
+    tracemalloc.stop()
+
+    rng = random.Random(9)
+    queries = [(rng.sample(BODY_AREAS, rng.randint(1, 2)), rng.randint(0, 10)) for _ in range(requests)]
+
+    start = time.perf_counter()
+    for areas, pain in queries[:1000]:
+        rescan(exercises, areas, pain)
+    scan_us = (time.perf_counter() - start) / 1000 * 1e6
+
+    start = time.perf_counter()
+    for areas, pain in queries:
+        catalog.exercises_for(areas, pain)
+    indexed_us = (time.perf_counter() - start) / requests * 1e6
+
+    print(f"rescan per request : {scan_us:9.2f} µs")
+    print(f"indexed + LRU      : {indexed_us:9.2f} µs  ({catalog.cache_info()})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
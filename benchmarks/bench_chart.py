@@ -0,0 +1,148 @@
+# -------------------- PAIN CHART DOWNSAMPLING --------------------
+# Times the work behind one draw of the pain-over-time chart for a patient with years of
+# daily sessions: LTTB and min/max over the whole series (baselines that live only in this
+# file), and the cached min/max buckets the chart uses while showing everything, panning
+# and zooming. With a display it also times full PainChart redraws on a real canvas (the
+# target is under 20 ms).
+# Usage: python benchmarks/bench_chart.py [years]
+import os
+import random
+import statistics
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.downsample import BucketCache, _extremes
+
+PIXELS = 346   # Plot width of the chart on the final screen
+
+
+def history(years, rng):
+    # Daily sessions (sometimes two, sometimes skipped) with pain drifting down and flaring up
+    days, pain = array("i"), array("B")
+    level = 8.0
+    for day in range(20000, 20000 + int(years * 365)):
+        for _ in range(rng.choice((0, 1, 1, 1, 2))):
+            level = min(10.0, max(0.0, level - 0.01 + rng.gauss(0, 0.6)))
+            days.append(day)
+            pain.append(round(level))
+    return days, pain
+
+
+def timed_ms(action, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = action()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def lttb(xs, ys, threshold, lo=0, hi=None):
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the shape of xs/ys[lo:hi]."""
+    hi = len(xs) if hi is None else hi
+    n = hi - lo
+    if threshold >= n or threshold < 3:
+        return list(range(lo, hi))
+    every = (n - 2) / (threshold - 2)    # Points per bucket; the first and last point are always kept
+    picked = [lo]
+    a = lo
+    for b in range(threshold - 2):
+        start = lo + int(b * every) + 1
+        end = lo + int((b + 1) * every) + 1
+        # Average of the next bucket (just the last point for the final bucket)
+        next_end = max(min(lo + int((b + 2) * every) + 1, hi), end + 1)
+        count = next_end - end
+        avg_x = sum(xs[end:next_end]) / count
+        avg_y = sum(ys[end:next_end]) / count
+        # Keep the point of this bucket that makes the largest triangle with the last kept point and that average
+        ax, ay = xs[a], ys[a]
+        dx, dy = ax - avg_x, avg_y - ay
+        best, best_area = start, -1.0
+        for i in range(start, end):
+            area = abs(dx * (ys[i] - ay) - (ax - xs[i]) * dy)
+            if area > best_area:
+                best, best_area = i, area
+        picked.append(best)
+        a = best
+    picked.append(hi - 1)
+    return picked
+
+
+# Equal-count buckets, each reduced to its extremes the same way BucketCache reduces its own
+def minmax(xs, ys, buckets, lo=0, hi=None):
+    """Indices of the lowest and highest point of each of `buckets` equal-count buckets of xs/ys[lo:hi]."""
+    hi = len(xs) if hi is None else hi
+    n = hi - lo
+    if n <= 2 * buckets:
+        return list(range(lo, hi))
+    picked = []
+    for b in range(buckets):
+        i, j = lo + b * n // buckets, lo + (b + 1) * n // buckets
+        picked.extend(_extremes(ys, i, j))
+    return picked
+
+
+def main(years=10):
+    days, pain = history(years, random.Random(5))
+    first, last = days[0], days[-1]
+    print(f"{years} years, {len(days):,} sessions, {PIXELS} px wide")
+
+    ms, picked = timed_ms(lambda: lttb(days, pain, PIXELS))
+    print(f"LTTB, whole series           : {ms:7.3f} ms -> {len(picked)} points")
+    ms, picked = timed_ms(lambda: minmax(days, pain, PIXELS // 2))
+    print(f"min/max, whole series        : {ms:7.3f} ms -> {len(picked)} points")
+
+    cache = BucketCache(days, pain)
+    start = time.perf_counter()
+    picked = cache.points(first, last, PIXELS // 2)
+    print(f"bucket cache, first draw     : {(time.perf_counter() - start) * 1000:7.3f} ms -> {len(picked)} points")
+    ms, _ = timed_ms(lambda: cache.points(first, last, PIXELS // 2))
+    print(f"bucket cache, redraw         : {ms:7.3f} ms")
+
+    # Pan a one-year view across the history, 1% of the view per step
+    span, pans = 365, []
+    x0 = first
+    while x0 + span < last:
+        start = time.perf_counter()
+        cache.points(x0, x0 + span, PIXELS // 2)
+        pans.append((time.perf_counter() - start) * 1000)
+        x0 += span / 100
+    pans.sort()
+    print(f"pan one-year view ({len(pans)} steps): median {statistics.median(pans):.3f} ms, "
+          f"max {pans[-1]:.3f} ms, {cache.computed:,} buckets computed in total")
+
+    # Zoom in and back out around the middle
+    zooms, mid, span = [], (first + last) / 2, last - first
+    for factor in [0.8] * 20 + [1.25] * 20:
+        span *= factor
+        start = time.perf_counter()
+        cache.points(mid - span / 2, mid + span / 2, PIXELS // 2)
+        zooms.append((time.perf_counter() - start) * 1000)
+    zooms.sort()
+    print(f"zoom in and out (40 steps)   : median {statistics.median(zooms):.3f} ms, max {zooms[-1]:.3f} ms")
+
+    if not os.environ.get("DISPLAY") and os.name != "nt":
+        print("no display: canvas redraws not timed (run under xvfb-run)")
+        return
+    import tkinter as tk
+    from rehab.chart import PainChart
+    root = tk.Tk()
+    chart = PainChart(root)
+    chart.pack()
+    chart.set_series(days, pain)
+    draws = []
+    for n in range(50):
+        chart.set_view(first + n * 30, first + n * 30 + 365 * (1 + n % 3))   # Pan and zoom
+        chart.redraw()
+        root.update_idletasks()
+        draws.append(chart.draw_ms)
+    root.destroy()
+    draws.sort()
+    print(f"canvas redraw                : median {statistics.median(draws):.3f} ms, max {draws[-1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 10)
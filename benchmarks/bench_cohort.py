@@ -0,0 +1,96 @@
+# -------------------- COHORT ANALYTICS AT SCALE --------------------
+# Builds the cohort counts from a synthetic column file of 10M sessions (one group-by over
+# the memory-mapped columns), then times the figures for each grouping, an incremental
+# refresh that folds in only the last 1% of sessions, and a save/load of the counts. The
+# incremental result is checked against the full build. A SQLite history is refreshed the
+# same way, with the group-by done by SQLite.
+# Usage: python benchmarks/bench_cohort.py [sessions] [folder]
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+from rehab.cohort import GROUPINGS, CohortStats, report
+from rehab.colfile import ColumnReader, ColumnWriter
+from rehab.store import SessionStore
+
+
+def write(path, n, rng):
+    users = [(f"Student {i}", rng.choice(YEAR_LEVELS)) for i in range(10_000)]
+    # A pool of pre-drawn sessions keeps the generator from dominating; mostly one or two areas
+    pool = [(rng.choice(users), 19000 + rng.randrange(3650), rng.randint(0, 10),
+             rng.sample(BODY_AREAS, rng.choice((1, 1, 1, 2, 2, 3))), rng.choice(ACTIVITIES)) for _ in range(4099)]
+    with ColumnWriter(path) as writer:
+        add = writer.add
+        for i in range(n):
+            add(*pool[i % 4099])
+
+
+def timed(action):
+    start = time.perf_counter()
+    result = action()
+    return time.perf_counter() - start, result
+
+
+def columns(folder, n):
+    path = os.path.join(folder, "sessions.rhc")
+    elapsed, _ = timed(lambda: write(path, n, random.Random(6)))
+    print(f"wrote {n:,} sessions in {elapsed:.1f} s")
+    with ColumnReader(path) as reader:
+        full = CohortStats()
+        elapsed, _ = timed(lambda: full.refresh_columns(reader))
+        tracemalloc.start()                  # Separate run: tracing slows the build down
+        CohortStats().refresh_columns(reader)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"full build: {n / elapsed:,.0f} sessions/s ({elapsed:.2f} s), {len(full.cells):,} cells, "
+              f"peak Python memory {peak / 1e6:.1f} MB")
+
+        for name, by in GROUPINGS.items():
+            elapsed, text = timed(lambda: report(full, by))
+            print(f"report by {name:8s}: {elapsed * 1000:6.1f} ms ({text.count(chr(10) * 2)} groups)")
+
+        # Counts up to the last 1%, then a refresh that reads only the rest
+        incremental = CohortStats()
+        incremental.refresh_columns(reader, stop=n - n // 100)
+        elapsed, added = timed(lambda: incremental.refresh_columns(reader))
+        print(f"incremental refresh: {added:,} new sessions in {elapsed * 1000:.0f} ms; "
+              f"same counts as the full build: {incremental.cells == full.cells}")
+        state = os.path.join(folder, "cohort.json")
+        saved, _ = timed(lambda: full.save(state))
+        loaded, again = timed(lambda: CohortStats.load(state))
+        nothing, added = timed(lambda: again.refresh_columns(reader))
+        print(f"state file {os.path.getsize(state):,} bytes: save {saved * 1000:.1f} ms, load {loaded * 1000:.1f} ms, "
+              f"refresh with nothing new {nothing * 1000:.2f} ms ({added} sessions)")
+    print()
+    print(report(full, GROUPINGS["year"]).split("\n\n")[1])
+
+
+def store(folder, n, rng):
+    path = os.path.join(folder, "sessions.db")
+    with SessionStore(path, batch_size=10_000) as history:
+        for i in range(n):
+            history.add_session(f"Student {rng.randrange(5000)}", rng.choice(YEAR_LEVELS), rng.randint(0, 10),
+                                rng.sample(BODY_AREAS, rng.choice((1, 1, 2))), rng.choice(ACTIVITIES))
+        stats = CohortStats()
+        elapsed, _ = timed(lambda: stats.refresh_store(history))
+        print(f"SQLite history, {n:,} sessions: full build {elapsed:.2f} s")
+        for i in range(n // 100):
+            history.add_session("Student 1", "Yr9", 5, ["Knee"], "Sports Player")
+        elapsed, added = timed(lambda: stats.refresh_store(history))
+        print(f"SQLite history: {added:,} new sessions folded in {elapsed * 1000:.1f} ms")
+
+
+def main(n=10_000_000, folder=None):
+    with tempfile.TemporaryDirectory(dir=folder) as folder:
+        columns(folder, n)
+        store(folder, min(n, 200_000), random.Random(7))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,77 @@
+# -------------------- COLUMN FILE WRITE & SCAN --------------------
+# Streams synthetic sessions into a column file with ColumnWriter, then memory-maps it and
+# scans whole columns through zero-copy views: pain histogram, mean pain, min(day) and
+# (with NumPy) per-area counts. tracemalloc shows the byte-column scans build no Python
+# objects per session.
+# Usage: python benchmarks/bench_colfile.py [sessions] [folder]
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.choices import ACTIVITIES, PAIN_MAX, YEAR_LEVELS
+from rehab.colfile import ColumnReader, ColumnWriter
+
+
+def write(path, n, rng):
+    users = [(f"Student {i}", rng.choice(YEAR_LEVELS)) for i in range(10_000)]
+    # A small pool of pre-drawn values keeps the generator from dominating the timing
+    pool = [(rng.choice(users), 19000 + rng.randrange(3650), rng.randint(0, 10), rng.randrange(1, 512),
+             rng.choice(ACTIVITIES)) for _ in range(4096)]
+    start = time.perf_counter()
+    with ColumnWriter(path) as writer:
+        add = writer.add
+        for i in range(n):
+            add(*pool[i & 4095])
+    return time.perf_counter() - start
+
+
+def main(n=10_000_000, folder=None):
+    with tempfile.TemporaryDirectory(dir=folder) as folder:
+        path = os.path.join(folder, "sessions.rhc")
+        elapsed = write(path, n, random.Random(9))
+        size = os.path.getsize(path)
+        print(f"write: {n:,} sessions in {elapsed:.1f} s ({n / elapsed:,.0f}/s), {size / 1e6:,.1f} MB "
+              f"({size / n:.1f} B/session)")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        reader = ColumnReader(path)
+        opened = time.perf_counter()
+        pain = reader.counts("pain", PAIN_MAX + 1)
+        counted = time.perf_counter()
+        mean = sum(reader.column("pain")) / len(reader)
+        summed = time.perf_counter()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"open (mmap + footer)      : {(opened - start) * 1000:8.2f} ms  days {reader.days}")
+        print(f"pain histogram (11 counts): {(counted - opened) * 1000:8.2f} ms  {pain}")
+        print(f"mean pain (sum)           : {(summed - counted) * 1000:8.2f} ms  {mean:.3f}")
+        print(f"peak Python memory during these scans: {peak / 1e6:.1f} MB (file {size / 1e6:,.1f} MB)")
+
+        # A four-byte column through the stdlib: values are boxed one at a time, so this is the slow path
+        start = time.perf_counter()
+        days = reader.column("day")
+        first = min(days)
+        print(f"min(day) via memoryview   : {(time.perf_counter() - start) * 1000:8.2f} ms  {first}")
+
+        try:
+            import numpy
+        except ImportError:
+            print("NumPy not installed: skipping numpy() views")
+        else:
+            start = time.perf_counter()
+            areas = reader.numpy("areas")
+            per_area = [int(numpy.count_nonzero(areas & (1 << bit))) for bit in range(9)]
+            print(f"NumPy per-area counts     : {(time.perf_counter() - start) * 1000:8.2f} ms  {per_area}")
+            del areas
+        del days
+        reader.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000, sys.argv[2] if len(sys.argv) > 2 else None)
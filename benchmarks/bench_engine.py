@@ -0,0 +1,48 @@
+# -------------------- RECOMMENDATION ENGINE THROUGHPUT --------------------
+# Compares recommend() called in a Python loop against one recommend_batch() call.
+# Usage: python benchmarks/bench_engine.py [patients]
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.choices import ACTIVITIES, BODY_AREAS
+from rehab.engine import recommend, recommend_batch
+
+
+def synthetic_patients(n, seed=1):
+    rng = random.Random(seed)
+    pains = array("B", (rng.randint(0, 10) for _ in range(n)))
+    areas = [", ".join(rng.sample(BODY_AREAS, rng.randint(1, 3))) for _ in range(n)]
+    activities = [rng.choice(ACTIVITIES) for _ in range(n)]
+    return pains, areas, activities
+
+
+def main(n=100_000):
+    pains, areas, activities = synthetic_patients(n)
+
+    start = time.perf_counter()
+    scalar = [recommend(p, a, act) for p, a, act in zip(pains, areas, activities)]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = recommend_batch(pains, areas, activities)
+    exercises = batch.rec_exercise     # Materialise the text columns so the comparison is fair
+    statuses = batch.status
+    batch_s = time.perf_counter() - start
+
+    assert statuses == [r["status"] for r in scalar]
+    assert exercises == [r["rec_exercise"] for r in scalar]
+
+    print(f"patients: {n}")
+    print(f"scalar loop : {scalar_s * 1000:8.1f} ms  ({n / scalar_s:12,.0f} patients/s)")
+    print(f"batch call  : {batch_s * 1000:8.1f} ms  ({n / batch_s:12,.0f} patients/s)")
+    print(f"speed-up    : {scalar_s / batch_s:8.1f}x")
+    print(f"status counts: {batch.counts()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
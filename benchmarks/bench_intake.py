@@ -0,0 +1,88 @@
+# -------------------- STREAMING INTAKE THROUGHPUT & MEMORY --------------------
+# Writes a file of pain readings (about 1% invalid) and ingests it with save_session's bulk
+# mode, once into a sink that only counts (the intake itself must stay constant memory) and
+# once into a columnar SessionLog. Also feeds enter_pain_level a long run of bad answers,
+# which used to end in RecursionError.
+# Usage: python benchmarks/bench_intake.py [readings]
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iteration1FINAL import User, enter_pain_level, save_session
+from rehab.sessionlog import SessionLog
+
+
+class CountingSink:
+    # Stands in for a session list that writes elsewhere (e.g. a database): keeps nothing
+    def __init__(self):
+        self.count = 0
+
+    def append(self, session):
+        self.count += 1
+
+
+def write_readings(path, n, rng):
+    start = 1_700_000_000
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(n):
+            r = rng.random()
+            if r < 0.005:
+                file.write("n/a\n")
+            elif r < 0.01:
+                file.write(f"{rng.randint(11, 99)}\n")
+            elif r < 0.5:
+                file.write(f"{rng.randint(0, 10)}\n")
+            else:
+                file.write(f"{start + i * 60},{rng.randint(0, 10)}\n")
+
+
+def ingest(path, sink, user):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as readings, contextlib.redirect_stdout(io.StringIO()):
+        rejects = save_session(user, sink, readings)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, rejects
+
+
+def main(n=2_000_000):
+    user = User("Aminder", "Knee Strain")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "readings.txt")
+        write_readings(path, n, random.Random(3))
+        size = os.path.getsize(path)
+        print(f"{n:,} readings, {size / 1e6:.1f} MB")
+
+        sink = CountingSink()
+        elapsed, peak, rejects = ingest(path, sink, user)
+        print(f"counting sink: {sink.count:,} saved, {rejects.count:,} rejected, {n / elapsed:,.0f} readings/s, "
+              f"peak {peak / 1024:,.0f} KiB")
+        log = SessionLog()
+        elapsed, peak, rejects = ingest(path, log, user)
+        print(f"SessionLog   : {len(log):,} saved, {n / elapsed:,.0f} readings/s, "
+              f"peak {peak / 1e6:,.1f} MB ({log.nbytes() / 1e6:,.1f} MB of columns)")
+        print(f"first rejects: {rejects.kept[:3]}")
+
+    # Interactive path: many bad answers in a row, then a good one
+    bad = sys.getrecursionlimit() * 2
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO("x\n" * bad + "7\n")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            level = enter_pain_level()
+    finally:
+        sys.stdin = saved_stdin
+    print(f"enter_pain_level after {bad:,} bad answers: {level}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
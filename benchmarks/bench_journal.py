@@ -0,0 +1,105 @@
+# -------------------- WIZARD JOURNAL CHECKPOINT COST & RECOVERY --------------------
+# Times WizardJournal.checkpoint() as the wizard calls it (three steps and a finish per
+# patient, fsync batched in the background; the target is under 1 ms per step), including
+# the periodic compactions. Then checks recovery: the journal of a few sessions is cut at
+# every byte offset (a crash mid-append) and each cut must resume the last session whose
+# step records are whole, and a child process killed mid-session must resume its last step.
+# Usage: python benchmarks/bench_journal.py [sessions]
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rehab.journal import WizardJournal, replay
+from rehab.wal import scan
+
+STEPS = (
+    ("user_info", lambda rng: {"name": f"Student{rng.randrange(5000):05d}", "year": rng.choice(("Yr9", "Yr10"))}),
+    ("pain", lambda rng: {"pain_level": rng.randint(0, 10)}),
+    ("bodypart", lambda rng: {"body_area": "Knee, Back", "body_area_mask": 5, "activity": "Sports Player"}),
+)
+
+CHILD = """
+import os, sys
+sys.path.insert(0, {root!r})
+from rehab.journal import WizardJournal
+journal = WizardJournal({path!r})
+journal.checkpoint("user_info", {{"name": "Crash", "year": "Yr11"}})
+journal.checkpoint("pain", {{"pain_level": 9}})
+os._exit(1)   # Killed before the body-area step, without closing anything
+"""
+
+
+def timing(folder, sessions, rng):
+    path = os.path.join(folder, "timing.journal")
+    journal = WizardJournal(path)
+    steps, finishes = [], []
+    for _ in range(sessions):
+        for step, answers in STEPS:
+            data = answers(rng)
+            start = time.perf_counter()
+            journal.checkpoint(step, data)
+            steps.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        journal.finish()
+        finishes.append((time.perf_counter() - start) * 1000)
+    syncs, compactions = journal.syncs, journal.compactions
+    journal.close()
+    steps.sort()
+    finishes.sort()
+    print(f"{sessions:,} sessions: checkpoint median {statistics.median(steps) * 1000:.0f} us, "
+          f"p99 {steps[int(len(steps) * 0.99)] * 1000:.0f} us, max {steps[-1]:.3f} ms")
+    print(f"finish median {statistics.median(finishes) * 1000:.0f} us, max {finishes[-1]:.3f} ms "
+          f"(includes {compactions} compactions); {syncs:,} background fsyncs for {len(steps) + len(finishes):,} "
+          f"appends; journal left at {os.path.getsize(path):,} bytes")
+
+
+def torn_writes(folder, rng):
+    # A complete journal of three sessions, the last one left open after its second step
+    path = os.path.join(folder, "torn.journal")
+    with WizardJournal(path, sync=False) as journal:
+        for n in range(3):
+            for step, answers in STEPS[:2 if n == 2 else 3]:
+                journal.checkpoint(step, answers(rng))
+            if n < 2:
+                journal.finish()
+    with open(path, "rb") as file:
+        data = file.read()
+    cut_path = os.path.join(folder, "cut.journal")
+    start = time.perf_counter()
+    for cut in range(len(data) + 1):
+        with open(cut_path, "wb") as file:
+            file.write(data[:cut])
+        expected = replay(json.loads(payload) for _, payload in scan(data[:cut]))
+        with WizardJournal(cut_path, sync=False) as journal:
+            assert journal.recover() == expected, cut
+    per_open = (time.perf_counter() - start) / (len(data) + 1) * 1000
+    print(f"torn writes: all {len(data) + 1} cuts of a {len(data)}-byte journal resume correctly "
+          f"({per_open:.2f} ms per open)")
+
+
+def killed_process(folder):
+    path = os.path.join(folder, "killed.journal")
+    subprocess.run([sys.executable, "-c", CHILD.format(root=ROOT, path=path)])
+    with WizardJournal(path, sync=False) as journal:
+        state = journal.recover()
+    print(f"killed mid-session: resumes after step {state['step']!r} with {state['data']}")
+
+
+def main(sessions=5000):
+    rng = random.Random(8)
+    with tempfile.TemporaryDirectory() as folder:
+        timing(folder, sessions, rng)
+        torn_writes(folder, rng)
+        killed_process(folder)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
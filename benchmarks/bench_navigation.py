@@ -0,0 +1,89 @@
+# -------------------- STEP-SWITCH LATENCY & MEMORY BENCHMARK --------------------
+# Drives the single-root RehabApp (rehab/gui.py) through back-to-back sessions
+# without a mainloop, timing every frame swap and sampling memory with tracemalloc. The
+# sessions are recorded in a scratch folder (rehab.replay.scratch_app), not on the Desktop.
+# Needs a display (run under Xvfb on headless machines: xvfb-run python benchmarks/bench_navigation.py).
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.replay import close_app, scratch_app
+
+PATIENTS = 50   # Sessions cycle through this many students, so name and trend indexes stop growing
+
+
+def timed(app, action, timings):
+    # Run one navigation action and wait until Tk has laid out and drawn the new frame
+    start = time.perf_counter()
+    action()
+    app.root.update_idletasks()
+    timings.append((time.perf_counter() - start) * 1000)
+
+
+def run_session(app, n, timings):
+    # One complete patient: intro -> info -> pain -> body area -> final recommendations
+    timed(app, app.launch_intro_window, timings)
+    timed(app, app.launch_user_info, timings)
+    app.name_entry.insert(0, f"Student {n % PATIENTS}")
+    app.year_dropdown.set(f"Yr{9 + n % 5}")
+    timed(app, app.submit_user_info, timings)
+    app.pain_var.set(n % 11)
+    timed(app, app.submit_pain, timings)
+    app.body_areas["Knee"].set(True)
+    app.body_areas["Back"].set(n % 2 == 0)
+    app.activity_dropdown.set("Sports Player")
+    timed(app, app.submit_bodypart, timings)
+
+
+def settle(app):
+    # Let the writer thread finish its session commits and Tk run their callbacks (trend, chart),
+    # as the mainloop would between patients
+    while app.writer.outstanding:
+        app.root.update()
+        time.sleep(0.005)
+
+
+def measure(app, sessions):
+    timings = []
+
+    # Warm up so one-off Tcl allocations do not count as growth; every student is seen once
+    for n in range(max(20, PATIENTS)):
+        run_session(app, n, [])
+    settle(app)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    samples = []
+    for n in range(sessions):
+        run_session(app, n, timings)
+        if n % 100 == 99:
+            settle(app)
+            samples.append((n + 1, tracemalloc.get_traced_memory()[0] - baseline))
+    tracemalloc.stop()
+    return samples, timings
+
+
+def main(sessions=1000):
+    with tempfile.TemporaryDirectory() as folder:   # Sessions go to throwaway files, not the kiosk's Desktop
+        app = scratch_app(folder)
+        try:
+            samples, timings = measure(app, sessions)
+        finally:
+            close_app(app)
+
+    timings.sort()
+    print(f"sessions: {sessions}, step switches: {len(timings)}")
+    print(f"step switch latency: median {statistics.median(timings):.3f} ms, "
+          f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms, max {timings[-1]:.3f} ms")
+    print("python heap growth (tracemalloc):")
+    for count, growth in samples:
+        print(f"  after {count:5d} sessions: {growth / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
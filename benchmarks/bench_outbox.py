@@ -0,0 +1,120 @@
+# -------------------- OUTBOX SYNC THROUGHPUT & OUTAGE RECOVERY --------------------
+# Runs the session outbox against the stand-in clinic server (benchmarks/sync_server.py):
+#   1. healthy link: sessions queued one at a time (as the GUI does) while the background
+#      uploader sends them; end-to-end sessions/s and how the batch size adapted
+#   2. flaky link: 10% of requests fail and 5% of replies are lost after the server stored
+#      the batch; every session must arrive exactly once
+#   3. outage: the server drops every connection while a backlog builds up; time to drain
+#      the queue once it is back
+# Usage: python benchmarks/bench_outbox.py [sessions]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+from rehab.outbox import Outbox, Uploader
+from sync_server import ClinicServer
+
+LATENCY = 0.05          # Server round trip per request (WAN-like)
+PER_SESSION = 20e-6     # Server cost per session in a batch
+
+
+def session(rng, i):
+    return {"name": f"Student{rng.randrange(5000):05d}", "year": rng.choice(YEAR_LEVELS),
+            "pain": rng.randint(0, 10), "areas": rng.sample(BODY_AREAS, rng.choice((1, 1, 2))),
+            "activity": rng.choice(ACTIVITIES), "time": 1_700_000_000 + i * 60}
+
+
+def wait_for(condition, timeout=300):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("outbox did not drain")
+        time.sleep(0.005)
+
+
+def healthy(folder, n, rng):
+    server = ClinicServer(latency=LATENCY, per_session=PER_SESSION).start()
+    outbox = Outbox(os.path.join(folder, "healthy.db"))
+    uploader = Uploader(outbox, server.url)
+    uploader.start()
+    start = time.perf_counter()
+    for i in range(n):
+        outbox.put(session(rng, i))
+        uploader.wake()
+    wait_for(lambda: server.stored == n)
+    elapsed = time.perf_counter() - start
+    uploader.stop()
+    outbox.close()
+    server.shutdown()
+    sizes = server.batch_sizes
+    print(f"healthy: {n:,} sessions queued one by one and delivered in {elapsed:.2f} s "
+          f"({n / elapsed:,.0f} sessions/s end to end), {len(sizes):,} batches, "
+          f"largest {max(sizes):,}, gzip {server.bytes_raw / server.bytes_in:.1f}x")
+
+    # Upload rate alone, from a full queue (put_many: one commit)
+    server = ClinicServer(latency=LATENCY, per_session=PER_SESSION).start()
+    outbox = Outbox(os.path.join(folder, "backlog.db"))
+    outbox.put_many(session(rng, i) for i in range(n))
+    uploader = Uploader(outbox, server.url)
+    start = time.perf_counter()
+    uploader.drain()
+    elapsed = time.perf_counter() - start
+    print(f"backlog of {n:,}: drained in {elapsed:.2f} s ({n / elapsed:,.0f} sessions/s), "
+          f"batch sizes {' '.join(str(s) for s in server.batch_sizes[:8])} ... -> {uploader.batch_size:,}")
+    outbox.close()
+    server.shutdown()
+
+
+def flaky(folder, n, rng):
+    server = ClinicServer(latency=LATENCY, per_session=PER_SESSION, fail_rate=0.1, lost_replies=0.05,
+                          max_sessions=2000).start()
+    outbox = Outbox(os.path.join(folder, "flaky.db"))
+    outbox.put_many(session(rng, i) for i in range(n))
+    uploader = Uploader(outbox, server.url, base_delay=0.05, max_delay=1.0)
+    start = time.perf_counter()
+    uploader.drain()
+    elapsed = time.perf_counter() - start
+    assert server.stored == n and len(server.keys) == n, (server.stored, n)
+    print(f"flaky: {n:,} sessions in {elapsed:.2f} s; {server.requests:,} requests, {server.failed:,} failed, "
+          f"{server.duplicates:,} resent sessions ignored; stored exactly once: {server.stored == n}")
+    outbox.close()
+    server.shutdown()
+
+
+def outage(folder, n, rng, seconds=5.0):
+    server = ClinicServer(latency=LATENCY, per_session=PER_SESSION).start()
+    outbox = Outbox(os.path.join(folder, "outage.db"))
+    uploader = Uploader(outbox, server.url, max_delay=2.0)
+    uploader.start()
+    server.down = True
+    outbox.put_many(session(rng, i) for i in range(n))   # Backlog built up while the link is down
+    uploader.wake()
+    time.sleep(seconds)
+    queued = len(outbox)
+    server.down = False
+    start = time.perf_counter()
+    wait_for(lambda: server.stored == n)
+    elapsed = time.perf_counter() - start
+    uploader.stop()
+    print(f"outage: {seconds:.0f} s down, {queued:,} queued, {uploader.error_count:,} failed attempts; "
+          f"drained {elapsed:.2f} s after the server came back (retry delay capped at 2 s)")
+    outbox.close()
+    server.shutdown()
+
+
+def main(n=5000):
+    rng = random.Random(4)
+    with tempfile.TemporaryDirectory() as folder:
+        healthy(folder, n, rng)
+        flaky(folder, n * 4, rng)
+        outage(folder, n * 4, rng)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
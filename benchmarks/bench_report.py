@@ -0,0 +1,88 @@
+# -------------------- REPORT RENDERING --------------------
+# Renders a million reports with the previous one-f-string-per-report formatter, with the
+# cached ReportTemplate one dict at a time, and column-wise as the batch job does; prints
+# the cache hit/miss counters.
+# Usage: python benchmarks/bench_report.py [reports]
+# Each variant is checked against the f-string first, then timed best of 5.
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+from rehab.engine import recommend_batch
+from rehab.report import MOTIVATIONAL_QUOTES, format_report, report_template
+
+
+def format_report_uncached(r):
+    # The formatter before the template layer, kept here as the baseline
+    return (
+        f"Rehab Report for {r['name']} ({r['year']})\n"
+        + "-" * 40 + "\n"
+        f"Pain Level: {r['pain']} ({r['status']})\n"
+        f"Affected Area(s): {r['area']}\n"
+        f"Activity Type: {r['activity']}\n\n"
+        f"Recommended Exercises: {r['rec_exercise']}\n"
+        f"Diet Tips: {r['diet']}\n"
+        f"Recovery Advice: {r['tips']}\n\n"
+        f"Motivational Quote: {r['motivation']}\n"
+        + "-" * 40 + "\n"
+    )
+
+
+def make_reports(n, seed=5):
+    rng = random.Random(seed)
+    pains = [rng.randint(0, 10) for _ in range(n)]
+    areas = [rng.sample(BODY_AREAS, rng.randint(1, 2)) for _ in range(n)]
+    activities = [rng.choice(ACTIVITIES) for _ in range(n)]
+    recs = recommend_batch(pains, areas, activities)
+    reports = []
+    for i in range(n):
+        report = {"name": f"Student {i}", "year": rng.choice(YEAR_LEVELS), "pain": pains[i], "area": recs.labels[i],
+                  "activity": activities[i], "motivation": rng.choice(MOTIVATIONAL_QUOTES)}
+        report.update(recs[i])
+        reports.append(report)
+    return reports
+
+
+def best_of(repeat, func, *args):
+    # Fastest of a few runs with the collector off, as timeit does: each run builds a list of
+    # n strings, and a collection landing in one run but not another is noise, not rendering
+    times = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func(*args)
+            times.append(time.perf_counter() - start)
+            del result
+    finally:
+        gc.enable()
+    return min(times)
+
+
+def main(n=1_000_000, repeat=5):
+    reports = make_reports(n)
+    columns = {field: [r[field] for r in reports] for field in reports[0]}
+    old = list(map(format_report_uncached, reports))
+    assert old == list(map(format_report, reports)) == report_template.render_columns(columns)
+    del old
+    report_template.cache_clear()
+
+    t_old = best_of(repeat, lambda: list(map(format_report_uncached, reports)))
+    t_new = best_of(repeat, lambda: list(map(format_report, reports)))
+    t_columns = best_of(repeat, report_template.render_columns, columns)
+
+    info = report_template.cache_info()
+    print(f"{n:,} reports:")
+    for label, seconds in (("f-string per report", t_old), ("template, per dict", t_new),
+                           ("template, columns", t_columns)):
+        print(f"  {label:20s} {seconds:5.2f} s  {n / seconds:10,.0f}/s  {t_old / seconds:5.2f}x")
+    print(f"cache: {info.hits:,} hits, {info.misses:,} misses, {info.currsize:,}/{info.maxsize:,} entries")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,84 @@
+# -------------------- EVENT-LOOP LATENCY DURING A LARGE SAVE --------------------
+# Writes a ~50 MB export through ReportWriter while a 5 ms Tk timer measures how late
+# the event loop runs its callbacks. Needs a display (xvfb-run on headless machines).
+# Usage: python benchmarks/bench_save_latency.py [megabytes]
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.engine import recommend
+from rehab.report import format_report
+from rehab.writer import ReportWriter
+
+TICK_MS = 5
+
+
+def export_chunks(megabytes):
+    # A synthetic export: many formatted reports, streamed in ~64 KB chunks
+    sample = {"name": "Student", "year": "Yr10", "pain": 6, "area": "Knee, Back",
+              "activity": "Sports Player", "motivation": "Every bit of effort helps!"}
+    sample.update(recommend(6, "Knee, Back"))
+    target = megabytes * 1024 * 1024
+    written, buffer, size = 0, [], 0
+    n = 0
+    while written < target:
+        sample["name"] = f"Student {n}"
+        text = format_report(sample)
+        buffer.append(text)
+        size += len(text)
+        n += 1
+        if size >= 65536:
+            yield "".join(buffer)
+            written += size
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def main(megabytes=50):
+    root = tk.Tk()
+    root.withdraw()
+    writer = ReportWriter(root)
+    lateness = []
+    state = {"done": False, "expected": 0.0}
+
+    def tick():
+        now = time.perf_counter()
+        lateness.append((now - state["expected"]) * 1000)
+        if state["done"]:
+            root.quit()
+            return
+        state["expected"] = now + TICK_MS / 1000
+        root.after(TICK_MS, tick)
+
+    def finished(path, error):
+        state["done"] = True
+        state["elapsed"] = time.perf_counter() - state["start"]
+        state["error"] = error
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.txt")
+        state["start"] = time.perf_counter()
+        writer.save(path, lambda: export_chunks(megabytes), on_done=finished)
+        # Extra clicks while the first save is queued are coalesced, not written again
+        merged = sum(not writer.save(path, lambda: export_chunks(megabytes), on_done=finished) for _ in range(5))
+        state["expected"] = time.perf_counter() + TICK_MS / 1000
+        root.after(TICK_MS, tick)
+        root.mainloop()
+        size = os.path.getsize(path)
+    writer.close()
+    root.destroy()
+
+    lateness.sort()
+    print(f"export: {size / 1e6:.1f} MB in {state['elapsed']:.2f} s (error: {state['error']})")
+    print(f"coalesced clicks: {merged} of 5")
+    print(f"event-loop lateness over {len(lateness)} ticks: median {lateness[len(lateness) // 2]:.2f} ms, "
+          f"p99 {lateness[int(len(lateness) * 0.99)]:.2f} ms, max {lateness[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
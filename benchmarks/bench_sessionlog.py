@@ -0,0 +1,60 @@
+# -------------------- SESSION LOG MEMORY --------------------
+# Compares tracemalloc-measured memory of iteration 1's list of Session objects with the
+# columnar SessionLog holding the same sessions.
+# Usage: python benchmarks/bench_sessionlog.py [sessions]
+import datetime
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iteration1FINAL import Session, User
+from rehab.catalog import load_catalog
+from rehab.sessionlog import SessionLog
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+
+def main(n=1_000_000):
+    rng = random.Random(11)
+    exercises = load_catalog().exercises
+    users = [User(f"Student {i}", "Knee Strain") for i in range(1000)]
+    start = datetime.date(2024, 1, 1)
+    rows = [(rng.choice(users), (start + datetime.timedelta(days=rng.randrange(700))).isoformat(),
+             rng.choice(exercises), rng.randint(0, 10)) for _ in range(n)]
+
+    def as_objects():
+        sessions = []
+        for user, date, exercise, pain in rows:
+            session = Session(date, exercise, pain)
+            session.user = user
+            sessions.append(session)
+        return sessions
+
+    def as_columns():
+        log = SessionLog()
+        for user, date, exercise, pain in rows:
+            log.add(user, date, exercise, pain)
+        return log
+
+    objects, object_bytes = measure(as_objects)
+    del objects
+    log, log_bytes = measure(as_columns)
+    print(f"sessions: {n:,}")
+    print(f"list of Session objects: {object_bytes / 1e6:8.1f} MB ({object_bytes / n:6.1f} B/session)")
+    print(f"columnar SessionLog    : {log_bytes / 1e6:8.1f} MB ({log_bytes / n:6.1f} B/session)")
+    print(f"reduction              : {object_bytes / log_bytes:8.1f}x")
+    log[0].display_session()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,62 @@
+# -------------------- CLI STARTUP TIME --------------------
+# Times "python -m rehab recommend" from process start to its first line of output, and
+# breaks its imports down with "python -X importtime". The bare interpreter and the GUI
+# module (which pulls in tkinter) are timed the same way for comparison.
+# Usage: python benchmarks/bench_startup.py [runs]
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = [sys.executable, "-m", "rehab", "recommend", "6", "Knee, Back", "--activity", "Sports Player"]
+TARGETS = {
+    "python (empty)": [sys.executable, "-c", "print()"],
+    "rehab recommend": CLI,
+    "import rehab.gui": [sys.executable, "-c", "import rehab.gui; print()"],
+}
+
+
+def first_output_ms(cmd):
+    # Wall-clock time until the child has written its first line
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    proc.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    proc.communicate()
+    return elapsed
+
+
+def import_times():
+    # Parse -X importtime output: (self us, cumulative us, module) for every import
+    result = subprocess.run([sys.executable, "-X", "importtime"] + CLI[1:], cwd=ROOT,
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main(runs=20):
+    for label, cmd in TARGETS.items():
+        first_output_ms(cmd)   # Warm the OS file cache and __pycache__
+        times = [first_output_ms(cmd) for _ in range(runs)]
+        print(f"{label:18s} first output: min {min(times):6.1f} ms   median {statistics.median(times):6.1f} ms")
+
+    rows = import_times()
+    names = {name.strip() for _, _, name in rows}
+    top_level = [r for r in rows if not r[2].startswith("  ")]
+    print(f"\nrehab recommend imports {len(rows)} modules, "
+          f"{sum(r[1] for r in top_level) / 1000:.1f} ms cumulative (includes interpreter startup imports)")
+    print(f"tkinter imported: {'tkinter' in names}   random imported: {'random' in names}")
+    print("Slowest imports (self time):")
+    for self_us, cumulative_us, name in sorted(rows, reverse=True)[:8]:
+        print(f"  {self_us / 1000:6.2f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,55 @@
+# -------------------- SESSION STORE BENCHMARK --------------------
+# Loads synthetic sessions into a temporary SessionStore and times typical queries.
+# Usage: python benchmarks/bench_store.py [sessions]
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+from rehab.store import SessionStore, epoch_day
+
+
+def timed_query(label, fn, repeat=200):
+    fn()   # Warm the page cache
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    print(f"{label:48s} median {statistics.median(times):7.3f} ms  -> {result}")
+
+
+def main(n=1_000_000):
+    rng = random.Random(7)
+    today = epoch_day()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(os.path.join(tmp, "sessions.db"), batch_size=5000)
+        start = time.perf_counter()
+        for i in range(n):
+            store.add_session(f"Student {rng.randrange(20_000)}", rng.choice(YEAR_LEVELS),
+                              rng.randint(0, 10), rng.sample(BODY_AREAS, rng.randint(1, 2)),
+                              rng.choice(ACTIVITIES), day=today - rng.randrange(3 * 365))
+        store.flush()
+        load_s = time.perf_counter() - start
+        print(f"loaded {n:,} sessions in {load_s:.1f} s ({n / load_s:,.0f} sessions/s, batched commits)")
+
+        timed_query("count knee, pain >= 7, last 30 days",
+                    lambda: store.count(area="Knee", min_pain=7, since_days=30))
+        timed_query("query knee, pain >= 7, last 30 days (dicts)",
+                    lambda: len(store.query(area="Knee", min_pain=7, since_days=30)), repeat=20)
+        timed_query("query_rows knee, pain >= 7, last 30 days",
+                    lambda: len(store.query_rows(area="Knee", min_pain=7, since_days=30)), repeat=20)
+        timed_query("count neck, pain 10, last 7 days",
+                    lambda: store.count(area="Neck", min_pain=10, since_days=7))
+        timed_query("sessions for one student",
+                    lambda: len(store.query(user="Student 42", year="Yr9")))
+        store.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
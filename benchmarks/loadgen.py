@@ -0,0 +1,117 @@
+# -------------------- SERVICE LOAD GENERATOR --------------------
+# Starts "python -m rehab serve" on a free loopback port (or targets --url), then opens
+# many concurrent keep-alive clients that each send a series of POST /recommend requests.
+# Reports requests/s, p50/p99 latency, 503 rejections and the server's average batch size.
+# Usage: python benchmarks/loadgen.py [--clients 1000] [--requests 20] [--url http://host:port]
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rehab.choices import ACTIVITIES, BODY_AREAS
+
+
+def request_bytes(host, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    method = "POST" if payload is not None else "GET"
+    return (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ")[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, n, seed, latencies, statuses, start_gate):
+    rng = random.Random(seed)
+    # Pre-built requests, so the client measures the server rather than its own JSON encoding
+    requests = [request_bytes(host, "/recommend", {
+        "pain": rng.randint(0, 10),
+        "areas": rng.sample(BODY_AREAS, rng.randint(1, 3)),
+        "activity": rng.choice(ACTIVITIES)}) for _ in range(n)]
+    reader, writer = await asyncio.open_connection(host, port)
+    await start_gate.wait()
+    try:
+        for data in requests:
+            start = time.perf_counter()
+            writer.write(data)
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    except (ConnectionError, asyncio.IncompleteReadError):
+        statuses["error"] = statuses.get("error", 0) + 1
+    finally:
+        writer.close()
+
+
+async def fetch_json(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(request_bytes(host, path))
+    _, body = await read_response(reader)
+    writer.close()
+    return json.loads(body)
+
+
+async def run(host, port, clients, requests):
+    latencies, statuses = [], {}
+    start_gate = asyncio.Event()
+    tasks = [asyncio.create_task(client(host, port, requests, i, latencies, statuses, start_gate))
+             for i in range(clients)]
+    await asyncio.sleep(0.5)            # Let every client connect before the clock starts
+    start = time.perf_counter()
+    start_gate.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    stats = await fetch_json(host, port, "/health")
+
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"{clients} clients x {requests} requests: {len(ms):,} responses in {elapsed:.2f} s "
+          f"= {len(ms) / elapsed:,.0f} req/s")
+    print(f"latency p50 {statistics.median(ms):.1f} ms   p99 {ms[int(len(ms) * 0.99) - 1]:.1f} ms   "
+          f"max {ms[-1]:.1f} ms")
+    print(f"status counts: {dict(sorted(statuses.items(), key=str))}")
+    if stats.get("batches"):
+        print(f"server: {stats['batches']:,} batches, {stats['batched'] / stats['batches']:.1f} requests per batch, "
+              f"{stats['rejected']:,} rejected (503)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the recommendation service on loopback.")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client (keep-alive)")
+    parser.add_argument("--url", default=None, help="existing server, e.g. http://127.0.0.1:8080")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        host, port = args.url.split("//", 1)[-1].rstrip("/").rsplit(":", 1)
+    else:
+        server = subprocess.Popen([sys.executable, "-m", "rehab", "serve", "--port", "0"], cwd=ROOT,
+                                  stdout=subprocess.PIPE, text=True)
+        host, port = server.stdout.readline().strip().rsplit("//", 1)[1].rsplit(":", 1)
+    try:
+        asyncio.run(run(host, int(port), args.clients, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
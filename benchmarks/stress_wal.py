@@ -0,0 +1,129 @@
+# -------------------- MULTI-KIOSK WRITE STRESS TEST --------------------
+# Starts 32 writer processes (several threads each) that append sessions to one shared
+# WriteAheadLog, repeatedly replace one shared report with atomic_write and add sessions to
+# one shared SQLite SessionStore (half of them for a student every writer shares). One
+# writer also leaves a torn record behind, as a kiosk crashing mid-write would.
+# Checks that no record or stored session is lost, duplicated, reordered within a writer or
+# torn, that the shared student exists once, and that the shared report is always one
+# complete version; prints commit throughput.
+# Usage: python benchmarks/stress_wal.py [processes] [records per thread] [--no-fsync]
+import hashlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rehab.safeio import atomic_write, locked
+from rehab.store import SessionStore
+from rehab.wal import WriteAheadLog, encode_record
+
+THREADS = 4          # Threads per process, so group commit has something to group
+REPORT_WRITES = 20   # atomic_write calls per process on the shared report
+STORE_BATCH = 10     # Sessions per SessionStore commit, so the processes contend for the database
+
+
+def report_text(writer, n):
+    body = f"Rehab Report from writer {writer}, version {n}\n" + "x" * (2000 + 37 * writer)
+    return body + f"\nsha256 {hashlib.sha256(body.encode()).hexdigest()}\n"
+
+
+def report_ok(text):
+    body, _, footer = text.rpartition("\nsha256 ")
+    return footer.strip() == hashlib.sha256(body.encode()).hexdigest()
+
+
+def writer_process(index, folder, records, sync, start, results):
+    log = WriteAheadLog(os.path.join(folder, "sessions.wal"), sync=sync)
+    store = SessionStore(os.path.join(folder, "sessions.db"), batch_size=STORE_BATCH)
+    start.wait()
+
+    def append_records(thread):
+        for n in range(records):
+            log.append_json({"w": index, "t": thread, "n": n, "pad": "p" * (n % 50)})
+            if index == 0 and thread == 0 and n == records // 2:
+                # Simulated crash: half a record written straight to the file, no rollback
+                with locked(log.fd):
+                    os.write(log.fd, encode_record(b'{"torn": true}')[:-5])
+
+    threads = [threading.Thread(target=append_records, args=(t,)) for t in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for n in range(REPORT_WRITES):
+        atomic_write(os.path.join(folder, "rehab_report.txt"), report_text(index, n), durable=sync)
+    # The writer is in the activity column and n in the day, so every session can be identified
+    for n in range(records):
+        store.add_session("Shared Student" if n % 2 else f"Student {index}", "Yr10", n % 11, ["Knee"], str(index), n)
+    store.flush()
+    store.close()
+    for thread in threads:
+        thread.join()
+    results.put((index, log.commits, log.records))
+    log.close()
+
+
+def main(processes=32, records=200, sync=True):
+    with tempfile.TemporaryDirectory() as folder:
+        ctx = multiprocessing.get_context("spawn" if os.name == "nt" else "fork")
+        start, results = ctx.Event(), ctx.Queue()
+        workers = [ctx.Process(target=writer_process, args=(i, folder, records, sync, start, results))
+                   for i in range(processes)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.5)                 # Let every process open the log before the clock starts
+        began = time.perf_counter()
+        start.set()
+        stats = [results.get() for _ in workers]
+        elapsed = time.perf_counter() - began
+        for worker in workers:
+            worker.join()
+
+        log = WriteAheadLog(os.path.join(folder, "sessions.wal"), sync=False)
+        check = log.check()
+        rows = log.read_json()
+        log.close()
+        with SessionStore(os.path.join(folder, "sessions.db")) as store:
+            sessions = store.conn.execute("SELECT activity, day FROM sessions ORDER BY id").fetchall()
+            area_rows = store.conn.execute("SELECT COUNT(*) FROM session_areas").fetchone()[0]
+            shared = store.conn.execute("SELECT COUNT(*) FROM users WHERE name = 'Shared Student'").fetchone()[0]
+
+        # Every (writer, thread, n) exactly once, and in order within each writer thread
+        expected = processes * THREADS * records
+        seen, last, problems = set(), {}, 0
+        for row in rows:
+            key = (row["w"], row["t"], row["n"])
+            if key in seen or row["n"] != last.get(key[:2], -1) + 1:
+                problems += 1
+            seen.add(key)
+            last[key[:2]] = row["n"]
+        with open(os.path.join(folder, "rehab_report.txt")) as file:
+            report_complete = report_ok(file.read())
+        leftovers = [name for name in os.listdir(folder) if name.endswith(".tmp")]
+        stored = set(sessions)
+        store_ok = (stored == {(str(w), n) for w in range(processes) for n in range(records)}
+                    and len(sessions) == area_rows == processes * records and shared == 1)
+
+    commits = sum(c for _, c, _ in stats)
+    written = sum(r for _, _, r in stats)
+    print(f"{processes} processes x {THREADS} threads x {records} records, fsync {'on' if sync else 'off'}")
+    print(f"records: {len(rows):,} read / {expected:,} expected, lost {expected - len(seen):,}, "
+          f"duplicate or out of order {problems:,}")
+    print(f"stored sessions: {len(sessions):,} / {processes * records:,} expected, "
+          f"duplicates {len(sessions) - len(stored):,}, shared student rows {shared}, ok: {store_ok}")
+    print(f"torn bytes skipped: {check['damaged_bytes']} (one simulated crash), report complete: {report_complete}, "
+          f"leftover temp files: {len(leftovers)}")
+    print(f"{written / elapsed:,.0f} records/s, {commits / elapsed:,.0f} commits/s, "
+          f"{written / commits:.1f} records per commit, {elapsed:.2f} s")
+    ok = (len(seen) == expected == len(rows) and not problems and report_complete and not leftovers
+          and store_ok)
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sys.exit(main(int(args[0]) if args else 32, int(args[1]) if len(args) > 1 else 200,
+                  sync="--no-fsync" not in sys.argv))
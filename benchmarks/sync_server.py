@@ -0,0 +1,131 @@
+# -------------------- STAND-IN CLINIC SERVER --------------------
+# Local HTTP server that accepts the outbox's session batches (POST, gzip JSON) the way the
+# clinic server is expected to: sessions are stored once per idempotency key, so resent
+# batches are harmless. Faults can be injected to exercise the uploader:
+#   latency        seconds added to every request, plus per_session seconds per session
+#   fail_rate      fraction of requests answered 503 (with Retry-After if retry_after is set)
+#   lost_replies   fraction of requests whose sessions are stored but whose reply is dropped
+#   down           while True every connection is closed without a reply (an outage)
+#   max_sessions   batches larger than this are answered 413
+#   refuse         status every request is answered with (e.g. 401 for a kiosk without access)
+#   bad_keys       sessions with these keys are refused: any batch holding one is answered 422
+# Usage: python benchmarks/sync_server.py [--port 8099] [--latency 0.02] [--fail-rate 0.1]
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ClinicServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, per_session=0.0, fail_rate=0.0, lost_replies=0.0,
+                 retry_after=None, max_sessions=None, refuse=None, bad_keys=(), seed=1):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.latency = latency
+        self.per_session = per_session
+        self.fail_rate = fail_rate
+        self.lost_replies = lost_replies
+        self.retry_after = retry_after
+        self.max_sessions = max_sessions
+        self.refuse = refuse
+        self.bad_keys = set(bad_keys)
+        self.down = False
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.keys = set()          # Idempotency keys of stored sessions
+        self.stored = 0
+        self.duplicates = 0
+        self.requests = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_raw = 0
+        self.batch_sizes = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/sessions"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="clinic-server", daemon=True).start()
+        return self
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        if server.down:
+            self.close_connection = True   # No reply at all: the client sees a dropped connection
+            return
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests += 1
+            fail = server.rng.random() < server.fail_rate
+            lose = server.rng.random() < server.lost_replies
+        if server.refuse is not None:
+            return self.reply(server.refuse, {"error": "refused"})
+        if fail:
+            with server.lock:
+                server.failed += 1
+            headers = (("Retry-After", str(server.retry_after)),) if server.retry_after is not None else ()
+            return self.reply(503, {"error": "injected failure"}, headers)
+        raw = gzip.decompress(data) if self.headers.get("Content-Encoding") == "gzip" else data
+        sessions = json.loads(raw)["sessions"]
+        if server.max_sessions is not None and len(sessions) > server.max_sessions:
+            return self.reply(413, {"error": f"at most {server.max_sessions} sessions per request"})
+        if any(session["key"] in server.bad_keys for session in sessions):
+            return self.reply(422, {"error": "invalid session"})
+        time.sleep(server.latency + server.per_session * len(sessions))
+        new = 0
+        with server.lock:
+            server.bytes_in += len(data)
+            server.bytes_raw += len(raw)
+            server.batch_sizes.append(len(sessions))
+            for session in sessions:
+                if session["key"] in server.keys:
+                    server.duplicates += 1
+                else:
+                    server.keys.add(session["key"])
+                    new += 1
+            server.stored += new
+        if lose:
+            self.close_connection = True   # Stored, but the kiosk never hears so and sends it again
+            return
+        self.reply(200, {"stored": new, "duplicates": len(sessions) - new})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in clinic server for the session outbox.")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--lost-replies", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server = ClinicServer(args.port, args.latency, fail_rate=args.fail_rate, lost_replies=args.lost_replies)
+    print(f"listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nstored {server.stored:,} sessions, {server.duplicates:,} duplicates, {server.requests:,} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,13 @@
+# Exercise objects come from the shared catalog loaded from rehab/data/exercises.json
+from rehab.catalog import load_catalog
+# Columnar container that stores many sessions compactly (typed arrays instead of objects)
+from rehab.sessionlog import SessionLog
+# Session times are kept as epoch seconds (one small integer) instead of date strings
+from rehab.dates import epoch_seconds, format_timestamp
+# Iterative pain validation and streaming intake of many readings
+from rehab.intake import Rejects, parse_pain, read_readings
+
+
 # -----------------------------
 # Class to store user information
 # -----------------------------
@@ -13,100 +23,116 @@ class User:
         print(f"User: {self.name}, Injury: {self.injury_type}")
 
 
-# -----------------------------
-# Class for an exercise
-# -----------------------------
-class Exercise:
-    def __init__(self, name, target_area, description):
-        # Stores details about an exercise
-        # 'name' = exercise name, e.g., "Arm Circles"
-        # 'target_area' = body part worked on, e.g., "Shoulder"
-        # 'description' = short explanation of how to do the exercise
-        self.name = name
-        self.target_area = target_area
-        self.description = description
-
-    def show_details(self):
-        # Displays exercise details nicely formatted
-        print(f"{self.name} – Targets: {self.target_area}\nDescription: {self.description}")
-
-
 # -----------------------------
 # Class to store one rehabilitation session
 # -----------------------------
 class Session:
     def __init__(self, date, exercise, pain_level):
         # Stores details for a single rehab session
-        # 'date' = when the session occurred
+        # 'date' = when the session occurred, as epoch seconds (a date or ISO string is converted)
         # 'exercise' = which Exercise object was used
         # 'pain_level' = user’s self-reported pain level (0–10)
-        self.date = date
+        self.date = epoch_seconds(date)
         self.exercise = exercise
         self.pain_level = pain_level
 
     def display_session(self):
         # Displays key details of the session
-        print(f"{self.date}: {self.exercise.name}, Pain Level: {self.pain_level}")
+        print(f"{format_timestamp(self.date)}: {self.exercise.name}, Pain Level: {self.pain_level}")
 
 
 # -----------------------------
 # Function to select an exercise
 # -----------------------------
-def select_exercise():
-    # Create two example exercises (can be expanded later)
-    exercise1 = Exercise("Arm Circles", "Shoulder", "Rotate arms gently in circles.")
-    exercise2 = Exercise("Leg Raises", "Thigh", "Lift leg while lying down.")
-    
-    # Currently always returns exercise1 – this is a placeholder
-    # Later, you can add logic to let the user choose between multiple exercises
-    return exercise1
+def select_exercise(target_area="Shoulder", pain_level=0):
+    # Look up exercises for the body area that suit the current pain level
+    # The catalog is loaded from disk once and its indexes make this a dictionary lookup
+    suitable = load_catalog().exercises_for([target_area], pain_level)
+    if not suitable:
+        # Nothing suits this area/pain combination - fall back to any exercise for the area
+        suitable = load_catalog().by_area.get(target_area) or load_catalog().exercises
+    return suitable[0]
+
+
+def injury_area(user):
+    # Find the body area mentioned in the user's injury description, e.g. "Knee Strain" -> "Knee"
+    for word in user.injury_type.replace("-", " ").split():
+        if word.title() in load_catalog().by_area:
+            return word.title()
+    return "Shoulder"
 
 
 # -----------------------------
 # Function to enter pain level with input validation
 # -----------------------------
 def enter_pain_level():
-    try:
-        # Ask the user to input their pain level (integer expected)
-        level = int(input("Enter pain level (0–10): "))
-        
-        # Check if the entered number is within the valid range
-        if 0 <= level <= 10:
-            return level  # Valid input – return it
-        else:
-            # If the number is outside the range, print a warning and re-ask
-            print("Invalid – enter a number from 0 to 10.")
-            return enter_pain_level()  # Recursive call to re-prompt user
-
-    except ValueError:
-        # Handles case when user enters something that’s not a number (e.g., text)
-        print("Invalid – please enter a number.")
-        return enter_pain_level()  # Re-prompt user again
+    # Keep asking until a valid number is entered (a loop, so any number of bad entries is fine)
+    while True:
+        try:
+            # Ask the user to input their pain level (integer expected, from 0 to 10)
+            return parse_pain(input("Enter pain level (0–10): "))
+        except ValueError as e:
+            # Not a number, or outside the range - explain and ask again
+            print(e)
+
+
+# -----------------------------
+# Function to read many sessions from a file or pipe
+# -----------------------------
+def read_sessions(lines, user, rejects=None):
+    # Lazily turn pain readings ("7" or "2025-07-31,7", one per line) into Session objects
+    # Invalid lines are skipped and recorded in rejects with their line numbers
+    area = injury_area(user)
+    exercises = {}  # Pain level -> chosen exercise, so the catalog is searched once per level
+    for _, when, pain in read_readings(lines, rejects):
+        exercise = exercises.get(pain)
+        if exercise is None:
+            exercise = exercises[pain] = select_exercise(area, pain)
+        yield Session(when, exercise, pain)
 
 
 # -----------------------------
 # Function to save a session
 # -----------------------------
-def save_session(user, session_list):
-    # Allows recording one new rehab session for a user
-    
-    # Step 1: Select an exercise
-    exercise = select_exercise()
-    
-    # Step 2: Ask user to enter pain level with validation
+def save_session(user, session_list, readings=None):
+    # Records one new rehab session for a user, or (bulk mode) every reading in `readings`,
+    # an open file, pipe or other iterable of lines. Bulk mode reads one line at a time, so
+    # millions of readings never have to fit in memory; returns the Rejects of the bad lines.
+    if readings is not None:
+        rejects = Rejects()
+        count = 0
+        for session in read_sessions(readings, user, rejects):
+            add_session(session_list, session, user)
+            count += 1
+        print(f"{count} sessions saved, {rejects.count} lines rejected.")
+        for number, line, reason in rejects.kept[:10]:
+            print(f"  line {number}: {line!r} - {reason}")
+        return rejects
+
+    # Step 1: Ask user to enter pain level with validation
     pain = enter_pain_level()
+
+    # Step 2: Select an exercise for the injured area that suits this pain level
+    exercise = select_exercise(injury_area(user), pain)
     
-    # Step 3: Create a new Session object
-    # (In a full program, the date could be set automatically using datetime.today())
-    session = Session("2025-07-31", exercise, pain)
+    # Step 3: Create a new Session object, timestamped now
+    session = Session(epoch_seconds(), exercise, pain)
     
-    # Step 4: Add this session to the session list
-    session_list.append(session)
+    # Step 4: Add this session to the session list (a plain list or a columnar SessionLog)
+    add_session(session_list, session, user)
     
     # Step 5: Confirm to the user that the session was saved
     print("Session saved.")
 
 
+def add_session(session_list, session, user):
+    # A columnar SessionLog also records whose session it is
+    if isinstance(session_list, SessionLog):
+        session_list.append(session, user)
+    else:
+        session_list.append(session)
+
+
 # -----------------------------
 # Main program run logic (for testing)
 # -----------------------------
@@ -114,11 +140,20 @@ if __name__ == "__main__":
     # Create a user with name and injury type
     user1 = User("Aminder", "Knee Strain")
     
-    # Create an empty list to hold all session data
-    sessions = []
+    # Create an empty session log to hold all session data
+    sessions = SessionLog()
     
-    # Save one session (calls select_exercise + enter_pain_level)
-    save_session(user1, sessions)
+    # Readings in a file (named on the command line) or piped in are saved in bulk;
+    # otherwise save one session (calls enter_pain_level + select_exercise)
+    import sys
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8", errors="replace") as readings:
+            save_session(user1, sessions, readings)
+    elif not sys.stdin.isatty():
+        save_session(user1, sessions, sys.stdin)
+    else:
+        save_session(user1, sessions)
     
     # Display the first saved session to confirm it worked
-    sessions[0].display_session()
+    if len(sessions):
+        sessions[0].display_session()
@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from rehab.engine import recommend  # Shared recommendation rules (rehab/data/rules.json)
+
 # ==============================================================
 # Main App Class – controls navigation between windows and stores user info
 # ==============================================================
@@ -191,21 +193,11 @@ class FinalRecommendationWindow:
         area = user["body_area"]
 
         # Determine recovery category and advice based on pain severity
-        if pain <= 3:
-            status = "Minor"
-            rec_exercise = f"Gentle stretches and walking; light yoga targeting the {area.lower()}."
-            diet = "Drink water, eat anti-inflammatory foods and light protein."
-            tips = "Stay lightly active, monitor any pain changes, and rest well."
-        elif pain <= 7:
-            status = "Moderate"
-            rec_exercise = f"Controlled physio for {area.lower()} with resistance bands."
-            diet = "Add omega-3 foods, reduce sugar/salt, include leafy greens."
-            tips = "Rest between exercises, track progress, use heat/ice therapy."
-        else:
-            status = "Severe"
-            rec_exercise = f"Limit movement of {area.lower()}, and use support gear if needed."
-            diet = "Turmeric, berries, and greens to reduce inflammation."
-            tips = "Prioritize rest, focus on breathing techniques, and seek advice."
+        rec = recommend(pain, area)
+        status = rec["status"]
+        rec_exercise = rec["rec_exercise"]
+        diet = rec["diet"]
+        tips = rec["tips"]
 
         # Create window to display final report
         self.window = tk.Tk()
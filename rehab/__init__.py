@@ -0,0 +1,3 @@
+# -------------------- REHABILITATION ASSISTANT PACKAGE --------------------
+# Headless building blocks shared by the Tk wizard (rehab/gui.py) and batch tools.
+# Nothing is imported here, so "python -m rehab ..." only loads the modules a command uses.
@@ -0,0 +1,6 @@
+# -------------------- python -m rehab --------------------
+import sys
+
+from rehab.cli import main
+
+sys.exit(main())
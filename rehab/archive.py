@@ -0,0 +1,313 @@
+# -------------------- REPORT ARCHIVE --------------------
+# Compact store for saved reports. Most of a report (everything but the header, pain line
+# and quote) is the same for every patient with the same status, areas and activity, so
+# each report is split in two:
+#   block   the shared advice text, stored once under its content hash (BLAKE2b) and
+#           compressed with zlib or lzma
+#   record  the patient's own lines plus the hash of its block, compressed with zlib and a
+#           preset dictionary of the report's fixed wording (small texts compress poorly alone)
+# Blocks and records are appended to segment files (framed like the session WAL, so damage
+# is detected); a SQLite index finds a report by id, patient or date. Reading a report is
+# one index lookup and one read, plus one more for its block unless it is already cached.
+# Usage: python -m rehab archive find NAME [--year Yr10] [--since DATE] [--until DATE] | get ID | stats
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import sqlite3
+import sys
+import zlib
+from collections import OrderedDict
+
+from rehab.dates import epoch_seconds, format_timestamp
+from rehab.report import MOTIVATIONAL_QUOTES, report_template
+from rehab.safeio import locked
+from rehab.wal import HEADER, MAGIC, encode_record
+
+SEGMENT_SIZE = 64 << 20      # A new segment file is started once the current one reaches this size
+BATCH_SIZE = 1000            # Reports indexed per SQLite transaction
+BLOCK_CACHE = 256            # Decompressed blocks kept in memory
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    hash     BLOB PRIMARY KEY,
+    segment  INTEGER NOT NULL,
+    offset   INTEGER NOT NULL,
+    length   INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS patients (
+    id    INTEGER PRIMARY KEY,
+    name  TEXT NOT NULL,
+    year  TEXT NOT NULL,
+    UNIQUE (name, year)
+);
+CREATE TABLE IF NOT EXISTS reports (
+    id       INTEGER PRIMARY KEY,
+    patient  INTEGER NOT NULL REFERENCES patients (id),
+    time     INTEGER NOT NULL,
+    segment  INTEGER NOT NULL,
+    offset   INTEGER NOT NULL,
+    length   INTEGER NOT NULL,
+    raw      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_patient ON reports (patient, time);
+"""
+
+# Blocks are a few hundred bytes: lzma gets a small dictionary (preset 9 would allocate 64 MB per
+# block) and no checksum of its own, since every segment entry already carries a CRC
+LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 9, "dict_size": 1 << 16}]
+COMPRESSORS = {
+    "zlib": (b"z", lambda data: zlib.compress(data, 9)),
+    "lzma": (b"x", lambda data: lzma.compress(data, check=lzma.CHECK_NONE, filters=LZMA_FILTERS)),
+}
+DECOMPRESSORS = {b"z": zlib.decompress, b"x": lzma.decompress, b"-": bytes}
+
+
+def default_folder():
+    # Next to the saved reports and the session history, on the (possibly shared) Desktop
+    return os.path.join(os.path.expanduser("~"), "Desktop", "rehab_archive")
+
+
+def preset_dictionary():
+    # Wording every record repeats: the patient lines of a sample report for each quote.
+    # Stored in the archive when it is created, so later edits to the quotes cannot break it.
+    sample = {"name": "Student", "year": "Yr10", "pain": 5, "status": "Moderate", "area": "", "activity": "",
+              "rec_exercise": "", "diet": "", "tips": ""}
+    patient = [[text for is_patient, text in report_template.render_segments(dict(sample, motivation=quote))
+                if is_patient] for quote in MOTIVATIONAL_QUOTES]
+    return json.dumps(patient, ensure_ascii=False).encode("utf-8")
+
+
+class ReportArchive:
+    # Reports are indexed in batches and SQLite assigns the report and patient ids, so kiosks
+    # sharing the folder can write at the same time; the SQLite connection may be used from a
+    # thread other than its creator's
+    def __init__(self, folder=None, method="zlib", segment_size=SEGMENT_SIZE):
+        self.folder = folder or default_folder()
+        os.makedirs(self.folder, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.folder, "index.db"), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.segment_size = segment_size
+
+        # The compression method and preset dictionary are fixed when the archive is created
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if "zdict" not in meta:
+            meta = {"method": method.encode(), "zdict": preset_dictionary()}
+            with self.conn:
+                self.conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        self.tag, self.compress_block = COMPRESSORS[meta["method"].decode()]
+        self.zdict = meta["zdict"]
+
+        self.blocks = {h: (seg, off, length) for h, seg, off, length in
+                       self.conn.execute("SELECT hash, segment, offset, length FROM blocks")}
+        self.patients = set(self.conn.execute("SELECT name, year FROM patients"))   # Already in the index
+        self.block_cache = OrderedDict()   # hash -> shared segment texts, least recently used first
+        self.pending = []                  # Index rows waiting for the next commit
+        self.pending_blocks = []
+        self.pending_patients = []
+        self.readers = {}                  # segment number -> read-only file descriptor
+        last = self.conn.execute("SELECT MAX(segment) FROM reports").fetchone()[0]
+        self.segment = max([last or 1] + [seg for seg, _, _ in self.blocks.values()])
+        self.out = None                    # Segment file being appended to
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.flush()
+        if self.out is not None:
+            self.out.close()
+        for fd in self.readers.values():
+            os.close(fd)
+        self.readers = {}
+        self.conn.close()
+
+    def segment_path(self, number):
+        return os.path.join(self.folder, f"segment-{number:06d}.dat")
+
+    # -------------------- Writing --------------------
+    def _append(self, payload):
+        # Append one framed entry to the current segment; returns (segment, offset, length)
+        if self.out is None:
+            self.out = open(self.segment_path(self.segment), "ab")
+        elif self.out.tell() >= self.segment_size:
+            self.out.close()
+            self.segment += 1
+            self.out = open(self.segment_path(self.segment), "ab")
+        frame = encode_record(payload)
+        with locked(self.out.fileno()):    # Frames stay whole even if a second process appends
+            self.out.seek(0, os.SEEK_END)
+            offset = self.out.tell()
+            self.out.write(frame)
+            self.out.flush()
+        return self.segment, offset, len(frame)
+
+    def add(self, r, when=None):
+        """Archive the report for r (the values on the final screen); it is indexed with the next flush."""
+        when = epoch_seconds(when)
+        segments = report_template.render_segments(r)
+        shared = [text for is_patient, text in segments if not is_patient]
+        # The record keeps the patient's text in order; an int n stands for the block's n-th text
+        parts, n = [], 0
+        for is_patient, text in segments:
+            if is_patient:
+                parts.append(text)
+            else:
+                parts.append(n)
+                n += 1
+        block = json.dumps(shared, ensure_ascii=False).encode("utf-8")
+        digest = hashlib.blake2b(block, digest_size=16).digest()
+        if digest not in self.blocks:
+            location = self._append(self.tag + self.compress_block(block))
+            self.blocks[digest] = location
+            self.pending_blocks.append((digest,) + location)
+
+        packer = zlib.compressobj(9, zdict=self.zdict)
+        record = packer.compress(json.dumps(parts, ensure_ascii=False).encode("utf-8")) + packer.flush()
+        segment, offset, length = self._append(digest + record)
+        raw = sum(len(text.encode("utf-8")) for _, text in segments)
+        patient = (r["name"], r["year"])
+        if patient not in self.patients:
+            self.patients.add(patient)
+            self.pending_patients.append(patient)
+        self.pending.append((when, segment, offset, length, raw) + patient)
+        if len(self.pending) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        # Index everything appended since the last commit in one transaction
+        if not self.pending and not self.pending_blocks and not self.pending_patients:
+            return
+        if self.out is not None:
+            os.fsync(self.out.fileno())    # Segments reach the disk before the index points at them
+        pending = self.pending, self.pending_blocks, self.pending_patients
+        self.pending, self.pending_blocks, self.pending_patients = [], [], []
+        reports, blocks, patients = pending
+        try:
+            with self.conn:
+                # Another kiosk may have added the patient already; report ids come in the order added
+                self.conn.executemany("INSERT OR IGNORE INTO patients (name, year) VALUES (?, ?)", patients)
+                self.conn.executemany("INSERT OR IGNORE INTO blocks VALUES (?, ?, ?, ?)", blocks)
+                self.conn.executemany("INSERT INTO reports (patient, time, segment, offset, length, raw) "
+                                      "SELECT id, ?, ?, ?, ?, ? FROM patients WHERE name = ? AND year = ?", reports)
+        except sqlite3.OperationalError:
+            # Busy or locked past the timeout: the rows are indexed with the next flush
+            self.pending[:0], self.pending_blocks[:0], self.pending_patients[:0] = pending
+            raise
+        except sqlite3.Error:
+            # Not indexed after all: a later report with the same patient or advice adds them again
+            self.patients.difference_update(patients)
+            for digest, *_ in blocks:
+                self.blocks.pop(digest, None)
+            raise
+
+    # -------------------- Reading --------------------
+    def _read(self, segment, offset, length):
+        fd = self.readers.get(segment)
+        if fd is None:
+            fd = self.readers[segment] = os.open(self.segment_path(segment), os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        if hasattr(os, "pread"):
+            frame = os.pread(fd, length, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            frame = os.read(fd, length)
+        magic, size, crc = HEADER.unpack_from(frame)
+        payload = frame[HEADER.size:]
+        if magic != MAGIC or size != len(payload) or zlib.crc32(payload) != crc:
+            raise ValueError(f"archive entry at segment {segment}, offset {offset} is damaged")
+        return payload
+
+    def _block(self, digest):
+        shared = self.block_cache.get(digest)
+        if shared is not None:
+            self.block_cache.move_to_end(digest)
+            return shared
+        location = self.blocks.get(digest)
+        if location is None:               # Written by another kiosk since this archive was opened
+            location = self.blocks[digest] = self.conn.execute(
+                "SELECT segment, offset, length FROM blocks WHERE hash = ?", (digest,)).fetchone()
+        payload = self._read(*location)
+        shared = self.block_cache[digest] = json.loads(DECOMPRESSORS[payload[:1]](payload[1:]))
+        if len(self.block_cache) > BLOCK_CACHE:
+            self.block_cache.popitem(last=False)
+        return shared
+
+    def get(self, report_id):
+        """Return the text of one archived report."""
+        self.flush()
+        row = self.conn.execute("SELECT segment, offset, length FROM reports WHERE id = ?", (report_id,)).fetchone()
+        if row is None:
+            raise KeyError(report_id)
+        payload = self._read(*row)
+        unpacker = zlib.decompressobj(zdict=self.zdict)
+        parts = json.loads(unpacker.decompress(payload[16:]) + unpacker.flush())
+        shared = self._block(payload[:16])
+        return "".join(shared[part] if isinstance(part, int) else part for part in parts)
+
+    def find(self, name, year=None, start=None, end=None):
+        """Return [(id, name, year, epoch seconds)] of a patient's reports from start to end (dates), newest first."""
+        self.flush()
+        low = epoch_seconds(start) if start is not None else 0
+        high = epoch_seconds(end) + 86399 if end is not None else 2 ** 63 - 1   # Through the end of that day
+        clauses, params = ["p.name = ?", "r.time BETWEEN ? AND ?"], [name, low, high]
+        if year is not None:
+            clauses.append("p.year = ?")
+            params.append(year)
+        return self.conn.execute("SELECT r.id, p.name, p.year, r.time FROM patients p JOIN reports r ON r.patient = p.id "
+                                 "WHERE " + " AND ".join(clauses) + " ORDER BY r.time DESC, r.id DESC", params).fetchall()
+
+    def stats(self):
+        """Report and block counts, and the size of the reports as text vs. on disk."""
+        self.flush()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")   # Count the index, not its pending log
+        reports, raw = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(raw), 0) FROM reports").fetchone()
+        stored = sum(os.path.getsize(os.path.join(self.folder, f)) for f in os.listdir(self.folder)
+                     if f.startswith("segment-"))
+        index = sum(os.path.getsize(os.path.join(self.folder, f)) for f in os.listdir(self.folder)
+                    if f.startswith("index.db"))
+        return {"reports": reports, "blocks": len(self.blocks), "raw_bytes": raw, "segment_bytes": stored,
+                "index_bytes": index, "ratio": raw / (stored + index) if stored + index else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab archive", description="Look up archived reports.")
+    parser.add_argument("--folder", help="archive folder (default: rehab_archive on the Desktop)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    find = commands.add_parser("find", help="list a patient's reports")
+    find.add_argument("name")
+    find.add_argument("--year")
+    find.add_argument("--since", help="first date (YYYY-MM-DD)")
+    find.add_argument("--until", help="last date (YYYY-MM-DD)")
+    get = commands.add_parser("get", help="print one report")
+    get.add_argument("id", type=int)
+    commands.add_parser("stats", help="sizes and compression ratio")
+    args = parser.parse_args(argv)
+
+    with ReportArchive(args.folder) as archive:
+        if args.command == "find":
+            for report_id, name, year, when in archive.find(args.name, args.year, args.since, args.until):
+                print(f"{report_id:8d}  {format_timestamp(when)}  {name} ({year})")
+        elif args.command == "get":
+            try:
+                print(archive.get(args.id), end="")
+            except KeyError:
+                print(f"no report {args.id}", file=sys.stderr)
+                return 1
+        else:
+            for key, value in archive.stats().items():
+                print(f"{key:14s} {value:,.2f}" if isinstance(value, float) else f"{key:14s} {value:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
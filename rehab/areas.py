@@ -0,0 +1,139 @@
+# -------------------- BODY AREA BITMASKS --------------------
+# Each body area is one bit (in checkbutton order), so a session's selection is a small
+# integer. AreaBitmapIndex keeps one bitset per area over a column of session masks,
+# which turns "Knee AND Back" or per-area counts into bitwise operations.
+import sys
+from array import array
+
+from rehab.choices import BODY_AREAS
+
+AREA_BITS = {area: 1 << i for i, area in enumerate(BODY_AREAS)}   # "Knee" -> 1, "Shoulder" -> 2, ...
+ALL_AREAS = (1 << len(BODY_AREAS)) - 1
+MASK_TYPECODE = "H"                                                 # uint16 column holds up to 16 areas
+
+# Every possible mask decoded once: mask -> tuple of area names in screen order.
+# Built by doubling (masks with bit i = masks below bit i plus that area), which keeps import cheap.
+_NAMES = [()]
+for _area in BODY_AREAS:
+    _NAMES += [names + (_area,) for names in _NAMES]
+del _area
+_LABELS = [", ".join(names) for names in _NAMES]
+
+
+def to_mask(areas):
+    """Encode area names (a list, or the wizard's "Knee, Back" text) as a bitmask."""
+    if isinstance(areas, int):
+        return areas
+    if isinstance(areas, str):
+        areas = [a.strip() for a in areas.split(",") if a.strip()]
+    mask = 0
+    for area in areas:
+        try:
+            mask |= AREA_BITS[area]
+        except KeyError:
+            raise ValueError(f"unknown body area {area!r}") from None
+    return mask
+
+
+def from_mask(mask):
+    return _NAMES[mask]
+
+
+def label(mask):
+    # Display text for a mask, e.g. 5 -> "Knee, Back"
+    return _LABELS[mask]
+
+
+# -------------------- Bitmap index --------------------
+def _flag_table(bit):
+    # bytes.translate table: mask byte -> "1" if it has this bit, else "0"
+    return bytes(0x31 if m & bit else 0x30 for m in range(256))
+
+
+_FLAG_TABLES = [_flag_table(1 << b) for b in range(8)]
+
+
+def _bitsets_from_masks(masks, n_areas=len(BODY_AREAS)):
+    # Build one Python-int bitset per area (bit i = row i) without a per-row Python loop:
+    # the mask bytes are translated to "0"/"1" text, reversed and parsed with int(text, 2)
+    if not masks:
+        return [0] * n_areas
+    if not isinstance(masks, array) or masks.typecode != MASK_TYPECODE:
+        masks = array(MASK_TYPECODE, masks)
+    raw = memoryview(masks).cast("B")
+    # Each uint16 mask is two bytes: one holds areas 0–7, the other areas 8–15
+    low, high = raw[0::2].tobytes(), raw[1::2].tobytes()
+    if sys.byteorder == "big":
+        low, high = high, low
+    bitsets = []
+    for area in range(n_areas):
+        column = low if area < 8 else high
+        flags = column.translate(_FLAG_TABLES[area % 8])
+        bitsets.append(int(flags[::-1], 2))
+    return bitsets
+
+
+class AreaBitmapIndex:
+    def __init__(self, masks=()):
+        masks = array(MASK_TYPECODE, masks)
+        self.bitsets = _bitsets_from_masks(masks)   # area index -> int with bit i set if row i has the area
+        self.size = len(masks)                      # Rows already folded into the bitsets
+        self.tail = array(MASK_TYPECODE)            # Appended rows waiting to be folded in
+
+    def __len__(self):
+        return self.size + len(self.tail)
+
+    def append(self, mask):
+        # O(1): new rows are folded into the bitsets in bulk at the next query
+        self.tail.append(to_mask(mask))
+
+    def extend(self, masks):
+        self.tail.extend(masks)
+
+    def _sync(self):
+        if self.tail:
+            for area, bits in enumerate(_bitsets_from_masks(self.tail)):
+                self.bitsets[area] |= bits << self.size
+            self.size += len(self.tail)
+            self.tail = array(MASK_TYPECODE)
+
+    # -------------------- Queries (results are bitsets) --------------------
+    def rows_with(self, area):
+        self._sync()
+        return self.bitsets[BODY_AREAS.index(area)]
+
+    def all_of(self, areas):
+        """Bitset of rows that reported every one of the areas."""
+        self._sync()
+        result = (1 << self.size) - 1
+        for area in areas:
+            result &= self.bitsets[BODY_AREAS.index(area)]
+        return result
+
+    def any_of(self, areas):
+        """Bitset of rows that reported at least one of the areas."""
+        self._sync()
+        result = 0
+        for area in areas:
+            result |= self.bitsets[BODY_AREAS.index(area)]
+        return result
+
+    def area_counts(self, within=None):
+        # Sessions per area, optionally restricted to a bitset from another query
+        self._sync()
+        if within is None:
+            return {area: bits.bit_count() for area, bits in zip(BODY_AREAS, self.bitsets)}
+        return {area: (bits & within).bit_count() for area, bits in zip(BODY_AREAS, self.bitsets)}
+
+
+def count(bitset):
+    return bitset.bit_count()
+
+
+def rows(bitset):
+    """Yield the row numbers set in a bitset, in increasing order."""
+    text = bin(bitset)[:1:-1]          # Binary digits, least significant (row 0) first
+    row = text.find("1")
+    while row != -1:
+        yield row
+        row = text.find("1", row + 1)
@@ -0,0 +1,58 @@
+# -------------------- NAME AUTOCOMPLETE --------------------
+# Prefix index behind the type-ahead list under the name field. Names live in a sorted
+# list of keys, one per word, so "smi" finds "Jane Smith" as well as "Smith, J". A lookup
+# is one bisect plus a short forward scan; adding a new student is one insort, so the
+# index never has to be rebuilt.
+from bisect import bisect_left, insort
+
+SEP = "\0"   # Separates a key from the folded name it belongs to; sorts before any name character
+
+
+def fold(text):
+    # Comparison form of a name: case-insensitive, runs of spaces collapsed
+    return " ".join(text.split()).casefold()
+
+
+class NameIndex:
+    def __init__(self, names=()):
+        self.names = {}     # folded name -> name as first entered (the spelling that is suggested)
+        self.keys = []      # sorted "key\0folded name" strings; key = the folded name from one word onwards
+        for name in names:
+            self._add(name, self.keys.append)
+        self.keys.sort()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return fold(name) in self.names
+
+    def _add(self, name, insert):
+        folded = fold(name)
+        if not folded or folded in self.names:
+            return False
+        self.names[folded] = " ".join(name.split())
+        words = folded.split(" ")
+        for i in range(len(words)):
+            insert(" ".join(words[i:]) + SEP + folded)   # One entry per word
+        return True
+
+    def add(self, name):
+        """Add a new student; returns False if the name (ignoring case and spacing) is already known."""
+        return self._add(name, lambda entry: insort(self.keys, entry))
+
+    def suggest(self, prefix, limit=8):
+        """Known names with a word starting with prefix, in alphabetical order of that word."""
+        prefix = fold(prefix)
+        if not prefix:
+            return []
+        keys = self.keys
+        i = bisect_left(keys, prefix)
+        found = {}                          # Ordered set: a name can match on several words
+        while i < len(keys) and len(found) < limit:
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+            found[key[key.index(SEP) + 1:]] = None
+            i += 1
+        return [self.names[folded] for folded in found]
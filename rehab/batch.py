@@ -0,0 +1,198 @@
+# -------------------- BATCH ROSTER REPORTS --------------------
+# Headless mode: stream a CSV or JSONL roster through the recommendation logic and write
+# one report per student (same layout as "Save Report"), spread over a process pool.
+# Usage: python -m rehab.batch roster.csv out_dir [--workers N] [--chunk-size N]
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from rehab.areas import from_mask, to_mask
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+from rehab.engine import recommend_batch
+from rehab.report import MOTIVATIONAL_QUOTES, report_template
+
+FILES_PER_DIR = 10_000   # Reports are sharded into sub-folders so no directory holds a million files
+MAX_KEPT_ERRORS = 100    # Only this many rejected rows are kept for the summary; the rest are counted
+
+
+# -------------------- Reading the roster --------------------
+def parse_areas(value):
+    # Body areas may be a JSON list or a "Knee, Back" / "Knee;Back" string
+    if isinstance(value, str):
+        value = [a.strip() for a in re.split(r"[;,]", value) if a.strip()]
+    elif not isinstance(value, list) or not all(isinstance(a, str) for a in value):
+        raise ValueError(f"body areas {value!r} are not text")
+    return tuple(a.strip().title() for a in value)
+
+
+def text_field(row, key):
+    value = row.get(key) or ""
+    if not isinstance(value, str):
+        raise ValueError(f"{key} {value!r} is not text")
+    return value.strip()
+
+
+def validate_row(row):
+    # Turn one raw roster row into (name, year, pain, areas, activity) or raise ValueError
+    if isinstance(row, Exception):     # A line read_roster could not parse
+        raise row
+    if not isinstance(row, dict):
+        raise ValueError(f"expected an object with the roster fields, got {type(row).__name__}")
+    name = text_field(row, "name")
+    year = text_field(row, "year")
+    activity = text_field(row, "activity")
+    try:
+        pain = int(row.get("pain_level"))
+    except (TypeError, ValueError):
+        raise ValueError(f"pain_level {row.get('pain_level')!r} is not a number")
+    areas = parse_areas(row.get("body_areas") or row.get("body_area") or "")
+    if not name:
+        raise ValueError("name is empty")
+    if year not in YEAR_LEVELS:
+        raise ValueError(f"unknown year {year!r}")
+    if not 0 <= pain <= 10:
+        raise ValueError(f"pain_level {pain} is outside 0–10")
+    if not areas or any(a not in BODY_AREAS for a in areas):
+        raise ValueError(f"unknown body areas {areas!r}")
+    areas = from_mask(to_mask(areas))   # Screen order, as the wizard records them
+    if activity not in ACTIVITIES:
+        raise ValueError(f"unknown activity {activity!r}")
+    return name, year, pain, areas, activity
+
+
+def read_roster(path):
+    """Yield roster rows as dictionaries, one at a time (CSV header row or JSON lines).
+
+    A JSON line that cannot be parsed is yielded as a ValueError, so only that row is rejected.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith((".jsonl", ".json")):
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        yield ValueError(f"line {number} is not valid JSON ({e})")
+        else:
+            yield from csv.DictReader(file)
+
+
+def chunked(rows, size):
+    # Group the row stream into lists of `size` rows: (index of first row, rows)
+    chunk, start = [], 0
+    for index, row in enumerate(rows):
+        if not chunk:
+            start = index
+        chunk.append(row)
+        if len(chunk) == size:
+            yield start, chunk
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+# -------------------- Worker --------------------
+def report_filename(index, name, year):
+    safe = re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_") or "student"
+    return os.path.join(f"{index // FILES_PER_DIR:04d}", f"{index:07d}_{safe}_{year}.txt")
+
+
+def process_chunk(out_dir, start, rows):
+    # Runs in a worker process: validate, recommend for the whole chunk at once, write reports
+    good, errors = [], []
+    for offset, row in enumerate(rows):
+        try:
+            good.append((start + offset,) + validate_row(row))
+        except (ValueError, TypeError, AttributeError) as e:   # One bad row never stops the batch
+            errors.append((start + offset, str(e)))
+    if not good:
+        return 0, errors, (0, 0)
+
+    import random   # Only workers pick quotes, so the CLI does not pay for importing it
+    indices, names, years, pains, areas, activities = zip(*good)
+    recs = recommend_batch(pains, areas, activities)
+    hits, misses = report_template.hits, report_template.misses
+    # The whole chunk is rendered at once: the advice part comes from the template cache and
+    # only each patient's header and quote are filled in
+    texts = report_template.render_columns({
+        "name": names, "year": years, "pain": pains, "area": recs.labels, "activity": activities,
+        "status": recs.status, "rec_exercise": recs.rec_exercise, "diet": recs.diet, "tips": recs.tips,
+        "motivation": random.choices(MOTIVATIONAL_QUOTES, k=len(good))})
+    made_dirs = set()
+    for index, name, year, text in zip(indices, names, years, texts):
+        path = os.path.join(out_dir, report_filename(index, name, year))
+        folder = os.path.dirname(path)
+        if folder not in made_dirs:
+            os.makedirs(folder, exist_ok=True)
+            made_dirs.add(folder)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+    # Report cache hits/misses for this chunk (the cache itself lives in the worker)
+    return len(good), errors, (report_template.hits - hits, report_template.misses - misses)
+
+
+# -------------------- Driver --------------------
+def run_batch(roster_path, out_dir, workers=None, chunk_size=2000, progress=None):
+    """Write a report per valid roster row; returns a summary dictionary."""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2        # Bounds memory: at most this many chunks are held at once
+    summary = {"written": 0, "rejected": 0, "errors": [], "cache_hits": 0, "cache_misses": 0}
+    start_time = time.perf_counter()
+
+    def collect(future):
+        count, errs, (hits, misses) = future.result()
+        summary["written"] += count
+        summary["cache_hits"] += hits
+        summary["cache_misses"] += misses
+        summary["rejected"] += len(errs)
+        summary["errors"] += errs[:MAX_KEPT_ERRORS - len(summary["errors"])]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        for start, rows in chunked(read_roster(roster_path), chunk_size):
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+                if progress:
+                    progress(summary["written"], time.perf_counter() - start_time)
+            in_flight.add(pool.submit(process_chunk, out_dir, start, rows))
+        for future in in_flight:
+            collect(future)
+
+    summary["errors"].sort()
+    summary["seconds"] = elapsed = time.perf_counter() - start_time
+    summary["rows_per_second"] = (summary["written"] + summary["rejected"]) / elapsed if elapsed else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write rehab reports for every student in a roster.")
+    parser.add_argument("roster", help="CSV (with header) or JSONL roster: name, year, pain_level, body_areas, activity")
+    parser.add_argument("out_dir", help="folder to write the reports into")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="rows handed to a worker at a time")
+    args = parser.parse_args(argv)
+
+    def progress(done, seconds):
+        print(f"\r{done:,} reports, {done / seconds:,.0f} rows/s", end="", file=sys.stderr)
+
+    summary = run_batch(args.roster, args.out_dir, args.workers, args.chunk_size, progress)
+    print(file=sys.stderr)
+    for index, message in summary["errors"]:
+        print(f"row {index + 1}: {message}", file=sys.stderr)
+    if summary["rejected"] > len(summary["errors"]):
+        print(f"... and {summary['rejected'] - len(summary['errors']):,} more rejected rows", file=sys.stderr)
+    print(f"{summary['written']:,} reports written, {summary['rejected']:,} rows rejected "
+          f"in {summary['seconds']:.1f} s ({summary['rows_per_second']:,.0f} rows/s)")
+    print(f"report cache: {summary['cache_hits']:,} hits, {summary['cache_misses']:,} misses", file=sys.stderr)
+    return 0 if not summary["rejected"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# -------------------- EXERCISE CATALOG --------------------
+# Loads the exercise list once from rehab/data/exercises.json and keeps prebuilt
+# indexes so "exercises for Knee + Back at pain 6" never rescans the list.
+import json
+import os
+from functools import lru_cache
+
+from rehab.choices import BODY_AREAS, PAIN_MAX, PAIN_MIN
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "exercises.json")
+
+
+# -----------------------------
+# Class for an exercise
+# -----------------------------
+class Exercise:
+    # __slots__ keeps each instance small (no per-object __dict__); thousands are held in memory
+    __slots__ = ("name", "target_area", "description", "min_pain", "max_pain")
+
+    def __init__(self, name, target_area, description, min_pain=PAIN_MIN, max_pain=PAIN_MAX):
+        self.name = name                    # Exercise name, e.g. "Arm Circles"
+        self.target_area = target_area      # Body part worked on, e.g. "Shoulder"
+        self.description = description      # Short explanation of how to do the exercise
+        self.min_pain = min_pain            # Lowest pain level the exercise is suitable for
+        self.max_pain = max_pain            # Highest pain level the exercise is suitable for
+
+    def show_details(self):
+        # Displays exercise details nicely formatted
+        print(f"{self.name} – Targets: {self.target_area}\nDescription: {self.description}")
+
+    def __repr__(self):
+        return f"Exercise({self.name!r}, {self.target_area!r}, pain {self.min_pain}–{self.max_pain})"
+
+
+class ExerciseCatalog:
+    def __init__(self, exercises, cache_size=512):
+        self.exercises = tuple(exercises)
+
+        # Prebuilt indexes: by area and by (area, pain level) for exact suitability
+        by_area = {area: [] for area in BODY_AREAS}
+        by_area_pain = {}
+        for ex in self.exercises:
+            by_area.setdefault(ex.target_area, []).append(ex)
+            for pain in range(ex.min_pain, ex.max_pain + 1):
+                by_area_pain.setdefault((ex.target_area, pain), []).append(ex)
+        self.by_area = {area: tuple(items) for area, items in by_area.items()}
+        self.by_area_pain = {key: tuple(items) for key, items in by_area_pain.items()}
+
+        # Frequent (area combination, pain) requests are answered from an LRU cache
+        self._lookup = lru_cache(maxsize=cache_size)(self._exercises_for)
+
+    def __len__(self):
+        return len(self.exercises)
+
+    def _exercises_for(self, areas, pain):
+        # areas is a canonical tuple; each area is a single dict lookup
+        if len(areas) == 1:
+            return self.by_area_pain.get((areas[0], pain), ())
+        found = []
+        for area in areas:
+            found.extend(self.by_area_pain.get((area, pain), ()))
+        return tuple(found)
+
+    def exercises_for(self, areas, pain):
+        """Return the exercises for the given area(s) that are suitable at this pain level."""
+        if isinstance(areas, str):
+            areas = [a.strip() for a in areas.split(",")]
+        wanted = set(areas)
+        # Canonical (screen) order, so "Back, Knee" and "Knee, Back" share one cache entry
+        return self._lookup(tuple(a for a in BODY_AREAS if a in wanted), pain)
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+
+def read_exercises(path):
+    # Build Exercise objects from a JSON list of {name, target_area, description, min_pain, max_pain}
+    with open(path, encoding="utf-8") as file:
+        return [Exercise(item["name"], item["target_area"], item["description"],
+                         item.get("min_pain", PAIN_MIN), item.get("max_pain", PAIN_MAX))
+                for item in json.load(file)]
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path=DEFAULT_PATH):
+    """Load the catalog from disk once per path; later calls return the same object."""
+    return ExerciseCatalog(read_exercises(path))
@@ -0,0 +1,137 @@
+# -------------------- PAIN HISTORY CHART --------------------
+# Pain-over-time line for the final screen, drawn on a tk.Canvas from a downsampled series
+# (rehab/downsample.py): about one point per pixel column whatever the length of the
+# history. Drag to pan, mouse wheel to zoom, double-click to show everything again.
+# The canvas items are created once; a redraw only moves the line and changes the labels.
+import time
+import tkinter as tk
+
+from rehab.choices import PAIN_MAX
+from rehab.downsample import BucketCache
+
+
+class PainChart:
+    PAD_LEFT, PAD_RIGHT, PAD_TOP, PAD_BOTTOM = 26, 8, 8, 18
+
+    def __init__(self, parent, width=380, height=120, bg="white", fg="black", line="#c0392b",
+                 format_x=str, min_span=7):
+        self.width, self.height = width, height
+        self.format_x = format_x              # x value -> axis label
+        self.min_span = min_span              # Narrowest view, in x units (a week of day numbers)
+        self.series = None                    # BucketCache over the current patient's history
+        self.full = self.view = (0, 1)        # x range of the whole series / of what is on screen
+        self.drag = None                      # (pointer x, view) when a drag started
+        self.pending = None                   # after_idle id of a queued redraw
+        self.draw_ms = 0.0                    # Time taken by the last redraw
+
+        self.canvas = canvas = tk.Canvas(parent, width=width, height=height, bg=bg, highlightthickness=0)
+        left, top, right, bottom = self.plot_box()
+        self.line = canvas.create_line(0, 0, 0, 0, fill=line, width=2)
+        # Background strips over the margins hide the parts of the line just outside the view
+        canvas.create_rectangle(0, 0, left - 1, height, fill=bg, width=0)
+        canvas.create_rectangle(right + 1, 0, width, height, fill=bg, width=0)
+        canvas.create_rectangle(left, top, right, bottom, outline=fg)
+        for pain in (0, PAIN_MAX // 2, PAIN_MAX):
+            y = self.y_to_px(pain)
+            canvas.create_line(left - 3, y, left, y, fill=fg)
+            canvas.create_text(left - 5, y, text=str(pain), anchor="e", fill=fg, font=("Calibri", 8))
+        self.first_label = canvas.create_text(left, bottom + 2, anchor="nw", fill=fg, font=("Calibri", 8))
+        self.last_label = canvas.create_text(right, bottom + 2, anchor="ne", fill=fg, font=("Calibri", 8))
+        self.empty_label = canvas.create_text((left + right) / 2, (top + bottom) / 2, fill=fg,
+                                              font=("Calibri", 9), text="")
+
+        canvas.bind("<ButtonPress-1>", self.start_drag)
+        canvas.bind("<B1-Motion>", self.on_drag)
+        canvas.bind("<ButtonRelease-1>", lambda event: setattr(self, "drag", None))
+        canvas.bind("<Double-Button-1>", lambda event: self.set_view(*self.full))
+        canvas.bind("<MouseWheel>", lambda event: self.zoom(event.x, 0.8 if event.delta > 0 else 1.25))
+        canvas.bind("<Button-4>", lambda event: self.zoom(event.x, 0.8))     # X11 wheel up
+        canvas.bind("<Button-5>", lambda event: self.zoom(event.x, 1.25))    # X11 wheel down
+
+    def pack(self, **options):
+        self.canvas.pack(**options)
+
+    # -------------------- Coordinates --------------------
+    def plot_box(self):
+        return self.PAD_LEFT, self.PAD_TOP, self.width - self.PAD_RIGHT, self.height - self.PAD_BOTTOM
+
+    def y_to_px(self, pain):
+        _, top, _, bottom = self.plot_box()
+        return bottom - pain * (bottom - top) / PAIN_MAX
+
+    def px_to_x(self, px):
+        left, _, right, _ = self.plot_box()
+        x0, x1 = self.view
+        return x0 + (px - left) * (x1 - x0) / (right - left)
+
+    # -------------------- Data and view --------------------
+    def set_series(self, xs, ys):
+        """Show a new history: xs sorted ascending (e.g. day numbers), ys pain levels."""
+        self.series = BucketCache(xs, ys)
+        if len(xs):
+            margin = max((xs[-1] - xs[0]) * 0.02, 1)
+            self.full = (xs[0] - margin, xs[-1] + margin)
+        else:
+            self.full = (0, 1)
+        self.set_view(*self.full)
+
+    def set_view(self, x0, x1):
+        # Keep the view inside the data and no narrower than min_span
+        lo, hi = self.full
+        span = min(max(x1 - x0, self.min_span), hi - lo)
+        x0 = min(max(x0, lo), hi - span)
+        self.view = (x0, x0 + span)
+        self.schedule()
+
+    def zoom(self, px, factor):
+        # Zoom around the pointer: the x value under it stays where it is
+        x0, x1 = self.view
+        anchor = self.px_to_x(px)
+        self.set_view(anchor - (anchor - x0) * factor, anchor + (x1 - anchor) * factor)
+
+    def start_drag(self, event):
+        self.drag = (event.x, self.view)
+
+    def on_drag(self, event):
+        if self.drag is None:
+            return
+        start_px, (x0, x1) = self.drag
+        left, _, right, _ = self.plot_box()
+        shift = (start_px - event.x) * (x1 - x0) / (right - left)
+        self.set_view(x0 + shift, x1 + shift)
+
+    # -------------------- Drawing --------------------
+    def schedule(self):
+        # Motion and wheel events arrive faster than the screen refreshes: draw once when Tk is idle
+        if self.pending is None:
+            self.pending = self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        self.pending = None
+        start = time.perf_counter()
+        canvas = self.canvas
+        left, top, right, bottom = self.plot_box()
+        xs, ys = (self.series.xs, self.series.ys) if self.series else ((), ())
+        if not len(xs):
+            canvas.coords(self.line, 0, 0, 0, 0)
+            canvas.itemconfigure(self.empty_label, text="No sessions yet")
+            canvas.itemconfigure(self.first_label, text="")
+            canvas.itemconfigure(self.last_label, text="")
+            return
+        canvas.itemconfigure(self.empty_label, text="")
+
+        x0, x1 = self.view
+        sx = (right - left) / (x1 - x0)
+        sy = (bottom - top) / PAIN_MAX
+        coords = []
+        for i in self.series.points(x0, x1, (right - left) // 2):   # Two points (min, max) per 2 px
+            coords.append(left + (xs[i] - x0) * sx)
+            coords.append(bottom - ys[i] * sy)
+        if len(coords) == 2:
+            coords += coords   # A single session: a dot-sized line
+            coords[0] -= 1
+            coords[2] += 1
+        canvas.coords(self.line, *coords)
+        canvas.itemconfigure(self.first_label, text=self.format_x(round(x0)))
+        canvas.itemconfigure(self.last_label, text=self.format_x(round(x1)))
+        self.draw_ms = (time.perf_counter() - start) * 1000
@@ -0,0 +1,13 @@
+# -------------------- WIZARD CHOICES --------------------
+# Options offered by the wizard screens; shared by the GUI and the headless modules
+
+YEAR_LEVELS = tuple(f"Yr{n}" for n in range(9, 14))   # Year level dropdown (Yr9–Yr13)
+
+# Body areas offered as checkbuttons, in the order they are shown on screen
+BODY_AREAS = ("Knee", "Shoulder", "Back", "Wrist", "Ankle", "Thigh", "Neck", "Hand", "Hamstring")
+
+# Activity type dropdown
+ACTIVITIES = ("Sports Player", "Casual Exerciser", "Post-Injury Recovery")
+
+PAIN_MIN = 0    # Lowest value on the pain scale
+PAIN_MAX = 10   # Highest value on the pain scale
@@ -0,0 +1,107 @@
+# -------------------- COMMAND LINE --------------------
+# Headless entry point: python -m rehab <command> ...
+# Each command imports what it needs only when it runs, so "recommend" never loads
+# tkinter, the batch process pool, or anything else it does not use.
+import sys
+from types import SimpleNamespace
+
+# Commands that already have their own argument parser: "python -m rehab batch ..." is
+# handed straight to rehab.batch.main() with the remaining arguments
+DELEGATED = {
+    "batch": "rehab.batch",
+    "serve": "rehab.service",
+    "leakcheck": "rehab.leakcheck",
+    "replay": "rehab.replay",
+    "intake": "rehab.intake",
+    "columns": "rehab.colfile",
+    "archive": "rehab.archive",
+    "sync": "rehab.outbox",
+    "cohort": "rehab.cohort",
+}
+
+
+def cmd_recommend(args):
+    from rehab.areas import label, to_mask
+    from rehab.engine import recommend
+    try:
+        areas = label(to_mask(args.areas))       # Validates names, puts them in screen order
+        rec = recommend(args.pain, areas, args.activity)
+    except ValueError as e:
+        sys.exit(f"rehab recommend: {e}")
+    if args.json:
+        import json
+        print(json.dumps(rec))
+        return 0
+    print(f"Status: {rec['status']}")
+    print(f"Exercise: {rec['rec_exercise']}")
+    print(f"Diet: {rec['diet']}")
+    print(f"Tips: {rec['tips']}")
+    return 0
+
+
+def cmd_gui(args):
+    from rehab.gui import RehabApp    # The only command that imports tkinter
+    RehabApp()
+    return 0
+
+
+def quick_recommend_args(argv):
+    # Fast path for the common "recommend PAIN AREAS [--activity X] [--json]" call: importing
+    # argparse (with gettext, locale and shutil) takes longer than the recommendation itself.
+    # Anything else returns None and goes through the full parser, which also reports errors.
+    if not argv or argv[0] != "recommend":
+        return None
+    positional, activity, as_json = [], None, False
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == "--json":
+            as_json = True
+        elif arg == "--activity":
+            activity = next(args, None)
+            if activity is None:
+                return None
+        elif arg.startswith("--activity="):
+            activity = arg.split("=", 1)[1]
+        elif arg.startswith("-"):
+            return None
+        else:
+            positional.append(arg)
+    if len(positional) != 2 or not positional[0].isdigit():
+        return None
+    from rehab.choices import ACTIVITIES   # No dependencies, cheap to import
+    if activity is not None and activity not in ACTIVITIES:
+        return None                       # The full parser lists the valid choices
+    return SimpleNamespace(func=cmd_recommend, pain=int(positional[0]), areas=positional[1],
+                           activity=activity, json=as_json)
+
+
+def build_parser():
+    import argparse
+    from rehab.choices import ACTIVITIES
+    parser = argparse.ArgumentParser(prog="rehab", description="Rehabilitation assistant.")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    rec = commands.add_parser("recommend", help="print the recommendation for one patient")
+    rec.add_argument("pain", type=int, help="pain level 0–10")
+    rec.add_argument("areas", help='body areas, e.g. "Knee, Back"')
+    rec.add_argument("--activity", default=None, choices=ACTIVITIES,
+                     help='activity type, e.g. "Sports Player"')
+    rec.add_argument("--json", action="store_true", help="print the result as JSON")
+    rec.set_defaults(func=cmd_recommend)
+
+    gui = commands.add_parser("gui", help="start the Tk wizard")
+    gui.set_defaults(func=cmd_gui)
+
+    for name, module in DELEGATED.items():
+        commands.add_parser(name, help=f"see: python -m {module} --help", add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in DELEGATED:
+        import importlib
+        return importlib.import_module(DELEGATED[argv[0]]).main(argv[1:])
+    args = quick_recommend_args(argv) or build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,213 @@
+# -------------------- COHORT ANALYTICS --------------------
+# Pain distributions, severity bands and the body areas that hurt together, per year level
+# and activity. Every figure is derived from one small table of counts per
+# (year, activity, pain, areas mask) cell, which is built by a single group-by over the
+# session history:
+#   column file   Counter over zip() of the memory-mapped columns (C loops, no per-session
+#                 Python code), a block at a time
+#   SQLite store  GROUP BY in SQLite
+# The table remembers how far into the history it has read, so a refresh only folds in the
+# sessions added since; with --state it is kept between runs.
+# Usage: python -m rehab cohort [--columns sessions.rhc | --db rehab_sessions.db]
+#                               [--by year|activity|both] [--top 3] [--state cohort.json]
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from itertools import combinations
+
+from rehab.areas import from_mask, to_mask
+from rehab.choices import ACTIVITIES, PAIN_MAX, YEAR_LEVELS
+from rehab.rules import default_rules
+from rehab.safeio import atomic_write
+
+STATE_VERSION = 1
+BLOCK = 1 << 22             # Sessions counted per block of a column file
+FIELDS = ("year", "activity", "pain", "areas")
+GROUPINGS = {"year": ("year",), "activity": ("activity",), "both": ("year", "activity")}
+
+_pairs_cache = {}
+
+
+def area_pairs(mask):
+    # Every pair of areas selected together in one session, e.g. 5 -> [("Knee", "Back")]
+    pairs = _pairs_cache.get(mask)
+    if pairs is None:
+        pairs = _pairs_cache[mask] = list(combinations(from_mask(mask), 2))
+    return pairs
+
+
+def group_order(key):
+    # Groups in dropdown order (Yr9 before Yr10, activities as on screen); unknown values last
+    return tuple((0, YEAR_LEVELS.index(v)) if v in YEAR_LEVELS else
+                 (1, ACTIVITIES.index(v)) if v in ACTIVITIES else (2, str(v)) for v in key)
+
+
+class CohortStats:
+    def __init__(self):
+        self.cells = Counter()   # (year, activity, pain, areas mask) -> sessions
+        self.source = None       # What the counts were read from (column file or database path)
+        self.position = 0        # Sessions (column file) or last session id (database) folded in so far
+
+    def __len__(self):
+        return sum(self.cells.values())
+
+    def _start(self, source, position):
+        # Continue from the saved position only if it is the same, still valid history
+        if self.source != source or position < self.position:
+            self.cells.clear()
+            self.position = 0
+            self.source = source
+
+    # -------------------- Refresh --------------------
+    def refresh_columns(self, reader, stop=None):
+        """Fold in the sessions of a column file (rehab/colfile.py) not counted yet; returns how many."""
+        stop = len(reader) if stop is None else min(stop, len(reader))
+        self._start(("columns", os.path.abspath(reader.path)), stop)
+        start = self.position
+        if start >= stop:
+            return 0
+        # The user column holds ids into the (name, year) dictionary; only the year is kept
+        year_of = [user[1] if isinstance(user, tuple) else None for user in reader.users]
+        users, activities = reader.column("user"), reader.column("activity")
+        pains, areas = reader.column("pain"), reader.column("areas")
+        counts = Counter()
+        for low in range(start, stop, BLOCK):
+            high = min(low + BLOCK, stop)
+            counts.update(zip(map(year_of.__getitem__, users[low:high]), activities[low:high],
+                              pains[low:high], areas[low:high]))
+        for (year, activity, pain, mask), n in counts.items():
+            self.cells[year, reader.activities[activity], pain, mask] += n
+        self.position = stop
+        return stop - start
+
+    def refresh_store(self, store):
+        """Fold in the sessions of a SessionStore added since the last refresh; returns how many."""
+        store.flush()
+        last = store.conn.execute("SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0]
+        self._start(("store", os.path.abspath(store.path)), last)
+        masks, added = {}, 0
+        for year, activity, pain, areas, n in store.conn.execute(
+                "SELECT u.year, s.activity, s.pain, s.areas, COUNT(*) FROM sessions s JOIN users u ON u.id = s.user_id "
+                "WHERE s.id > ? AND s.id <= ? GROUP BY u.year, s.activity, s.pain, s.areas",
+                (self.position, last)):
+            mask = masks.get(areas)
+            if mask is None:
+                mask = masks[areas] = to_mask(areas)
+            self.cells[year, activity, pain, mask] += n
+            added += n
+        self.position = last
+        return added
+
+    # -------------------- Figures --------------------
+    def groups(self, by=("year",)):
+        """{group key: [(cell, sessions)]}, where a group key is a tuple of the by fields."""
+        fields = [FIELDS.index(name) for name in by]
+        grouped = {}
+        for cell, n in self.cells.items():
+            grouped.setdefault(tuple(cell[i] for i in fields), []).append((cell, n))
+        return {key: grouped[key] for key in sorted(grouped, key=group_order)}
+
+    def pain_distribution(self, by=("year",)):
+        """{group: [sessions at pain 0, 1, ... PAIN_MAX]}"""
+        result = {}
+        for key, cells in self.groups(by).items():
+            counts = result[key] = [0] * (PAIN_MAX + 1)
+            for cell, n in cells:
+                counts[cell[2]] += n
+        return result
+
+    def severity(self, by=("year",), rules=None):
+        """{group: [sessions per band]} with the bands and thresholds of the final screen (Minor, Moderate, Severe)."""
+        table = (rules or default_rules()).current()
+        result = {}
+        for key, cells in self.groups(by).items():
+            counts = result[key] = [0] * len(table.statuses)
+            for cell, n in cells:
+                counts[table.band(cell[2])] += n
+        return result
+
+    def co_occurring(self, by=("year",), top=3):
+        """{group: [((area, area), sessions), ...]}, the top pairs of areas reported together."""
+        result = {}
+        for key, cells in self.groups(by).items():
+            pairs = Counter()
+            for cell, n in cells:
+                for pair in area_pairs(cell[3]):
+                    pairs[pair] += n
+            result[key] = pairs.most_common(top)
+        return result
+
+    # -------------------- Saved state --------------------
+    def save(self, path):
+        data = {"version": STATE_VERSION, "source": self.source, "position": self.position,
+                "cells": [list(cell) + [n] for cell, n in self.cells.items()]}
+        atomic_write(path, json.dumps(data, separators=(",", ":")))
+
+    @classmethod
+    def load(cls, path):
+        """Counts saved by save(); a missing or unreadable file gives empty counts (a full rebuild)."""
+        stats = cls()
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") != STATE_VERSION:
+                return stats
+            stats.source = tuple(data["source"]) if data["source"] else None
+            stats.position = data["position"]
+            stats.cells = Counter({tuple(row[:4]): row[4] for row in data["cells"]})
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return cls()
+        return stats
+
+
+def report(stats, by=("year",), top=3, rules=None):
+    """The cohort summary as text, one block per group."""
+    statuses = (rules or default_rules()).current().statuses
+    distribution, bands, pairs = stats.pain_distribution(by), stats.severity(by, rules), stats.co_occurring(by, top)
+    lines = [f"{len(stats):,} sessions, grouped by {' and '.join(by)}", ""]
+    for key, counts in distribution.items():
+        total = sum(counts)
+        mean = sum(p * n for p, n in enumerate(counts)) / total
+        lines.append(f"{' / '.join(str(v or '(none)') for v in key)}: {total:,} sessions, mean pain {mean:.2f}")
+        lines.append("  pain   " + " ".join(f"{p}:{n}" for p, n in enumerate(counts) if n))
+        lines.append("  bands  " + ", ".join(f"{status} {n:,} ({n / total:.0%})"
+                                             for status, n in zip(statuses, bands[key])))
+        if pairs[key]:
+            lines.append("  areas  " + ", ".join(f"{a} + {b} {n:,}" for (a, b), n in pairs[key]))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab cohort", description="Pain figures per year level and activity.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--columns", help="column file to read (see 'rehab columns export')")
+    source.add_argument("--db", help="SQLite history to read (default: the one on the Desktop)")
+    parser.add_argument("--by", choices=sorted(GROUPINGS), default="year", help="grouping (default: year)")
+    parser.add_argument("--top", type=int, default=3, help="area pairs shown per group (default: 3)")
+    parser.add_argument("--state", help="keep the counts in this file and only read new sessions next time")
+    args = parser.parse_args(argv)
+
+    stats = CohortStats.load(args.state) if args.state else CohortStats()
+    if args.columns:
+        from rehab.colfile import ColumnReader
+        with ColumnReader(args.columns) as reader:
+            added = stats.refresh_columns(reader)
+    else:
+        from rehab.store import SessionStore
+        with SessionStore(args.db) as store:
+            added = stats.refresh_store(store)
+    if args.state:
+        stats.save(args.state)
+        print(f"{added:,} new sessions counted")
+    if not len(stats):
+        print("no sessions recorded yet")
+        return 0
+    print(report(stats, GROUPINGS[args.by], args.top), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+# -------------------- COLUMNAR SESSION FILES --------------------
+# Versioned binary export of the session history that can be loaded back and analysed at
+# scale. Each field is one fixed-width little-endian column, stored contiguously and aligned
+# to 64 bytes, so a reader can memory-map the file and hand out zero-copy memoryview (or
+# NumPy) views of whole columns; users and activities are stored once, in string
+# dictionaries in the footer, and the columns hold their ids.
+#
+#   header   MAGIC (8 bytes), version (uint16), 6 reserved bytes
+#   columns  pain uint8 | day int32 (days since 1970-01-01) | user uint32 | areas uint16 | activity uint8
+#   footer   JSON: row count, column names/types/offsets, first/last day, user and activity dictionaries
+#   trailer  footer offset (uint64), footer length (uint32), footer CRC32 (uint32), MAGIC
+#
+# The writer streams: sessions are buffered in chunks and spilled to one temporary file per
+# column, which are joined into the final file (written atomically) on close.
+# Usage: python -m rehab columns export sessions.rhc [--db rehab_sessions.db]
+#        python -m rehab columns info sessions.rhc
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+
+from rehab.areas import MASK_TYPECODE, to_mask
+from rehab.dates import parse_day
+from rehab.safeio import atomic_write
+from rehab.sessionlog import Interner
+
+MAGIC = b"RHCOLS\r\n"           # The CR/LF pair catches files mangled by text-mode transfers
+VERSION = 1
+HEADER = struct.Struct("<8sH6x")
+TRAILER = struct.Struct("<QII8s")
+ALIGN = 64                      # Column start alignment (cache line; what NumPy's SIMD loops like)
+CHUNK_ROWS = 1 << 16            # Sessions buffered before they are spilled to disk
+
+# name, array typecode, NumPy dtype (explicitly little-endian)
+COLUMNS = (
+    ("pain", "B", "<u1"),
+    ("day", "i", "<i4"),
+    ("user", "I", "<u4"),
+    ("areas", MASK_TYPECODE, "<u2"),
+    ("activity", "B", "<u1"),
+)
+
+
+def _little_endian(column):
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def _pad(size):
+    return -size % ALIGN
+
+
+class ColumnWriter:
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.days = None                # (first, last) day written, kept in the footer
+        self.users = Interner()
+        self.activities = Interner()
+        self.activities.intern(None)    # Id 0: no activity recorded
+        self.buffers = {name: array(code) for name, code, _ in COLUMNS}
+        # Spill files sit next to the target, so the final copy stays on one filesystem
+        folder = os.path.dirname(os.path.abspath(path))
+        self.spills = {name: tempfile.TemporaryFile(dir=folder) for name, _, _ in COLUMNS}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def add(self, user, day, pain, areas=0, activity=None):
+        """Append one session; user is a hashable JSON-able key such as (name, year); day a day number, date or ISO string."""
+        buffers = self.buffers
+        buffers["pain"].append(pain)
+        buffers["day"].append(parse_day(day))
+        buffers["user"].append(self.users.intern(user))
+        buffers["areas"].append(to_mask(areas))
+        buffers["activity"].append(self.activities.intern(activity))
+        if len(buffers["pain"]) >= self.chunk_rows:
+            self.spill()
+
+    def spill(self):
+        self.rows += len(self.buffers["pain"])
+        days = self.buffers["day"]
+        if days:
+            low, high = min(days), max(days)
+            self.days = (low, high) if self.days is None else (min(low, self.days[0]), max(high, self.days[1]))
+        for name, column in self.buffers.items():
+            _little_endian(column).tofile(self.spills[name])
+            del column[:]
+
+    def _chunks(self, layout, footer_offset, footer):
+        # The file's bytes in order: header, each column at its aligned offset, footer, trailer
+        yield HEADER.pack(MAGIC, VERSION)
+        position = HEADER.size
+        for column in layout:
+            yield bytes(column["offset"] - position)
+            spill = self.spills[column["name"]]
+            spill.seek(0)
+            while True:
+                block = spill.read(1 << 20)
+                if not block:
+                    break
+                yield block
+            position = column["offset"] + spill.tell()
+        yield bytes(footer_offset - position)
+        yield footer
+        yield TRAILER.pack(footer_offset, len(footer), zlib.crc32(footer), MAGIC)
+
+    def close(self):
+        # Lay the spilled columns out one after another and write the whole file atomically
+        self.spill()
+        offset, layout = HEADER.size, []
+        for name, code, dtype in COLUMNS:
+            offset += _pad(offset)
+            layout.append({"name": name, "type": code, "dtype": dtype, "offset": offset})
+            offset += self.spills[name].tell()
+        footer_offset = offset + _pad(offset)
+        footer = json.dumps({"version": VERSION, "rows": self.rows, "columns": layout, "days": self.days,
+                             "users": self.users.values, "activities": self.activities.values},
+                            separators=(",", ":")).encode("utf-8")
+        atomic_write(self.path, self._chunks(layout, footer_offset, footer), binary=True)
+        self.discard()
+
+    def discard(self):
+        for spill in self.spills.values():
+            spill.close()
+
+
+class ColumnReader:
+    # Memory-maps a session file; columns are zero-copy views, nothing is decoded up front
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                  # An empty file cannot be mapped
+            self.file.close()
+            raise ValueError(f"{path}: not a session column file") from None
+        self.views = []                     # Handed-out memoryviews, released on close
+        try:
+            self._read_footer()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_footer(self):
+        data = self.map
+        if len(data) < HEADER.size + TRAILER.size or data[:8] != MAGIC or data[-8:] != MAGIC:
+            raise ValueError(f"{self.path}: not a session column file")
+        _, version = HEADER.unpack_from(data, 0)
+        if version > VERSION:
+            raise ValueError(f"{self.path}: format version {version} is newer than this reader ({VERSION})")
+        offset, length, crc, _ = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+        footer = data[offset:offset + length]
+        if len(footer) != length or zlib.crc32(footer) != crc:
+            raise ValueError(f"{self.path}: footer is damaged")
+        meta = json.loads(footer)
+        self.version = version
+        self.rows = meta["rows"]
+        # Unknown columns (from a newer writer with the same major layout) are kept but not required
+        self.columns = {c["name"]: c for c in meta["columns"]}
+        self.users = [tuple(u) if isinstance(u, list) else u for u in meta["users"]]
+        self.activities = meta["activities"]
+        self.days = tuple(meta["days"]) if meta.get("days") else None   # First and last day, without a scan
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in reversed(self.views):   # Casts before the views they were made from
+            view.release()
+        self.views = []
+        self.map.close()
+        self.file.close()
+
+    # -------------------- Column views --------------------
+    def column(self, name):
+        """Zero-copy memoryview of a whole column (e.g. column("pain")[i]); valid until close()."""
+        info = self.columns[name]
+        size = array(info["type"]).itemsize
+        raw = memoryview(self.map)[info["offset"]:info["offset"] + self.rows * size]
+        self.views.append(raw)
+        if sys.byteorder == "big" and size > 1:
+            return _little_endian(array(info["type"], raw))   # Copy: the file is little-endian
+        view = raw.cast(info["type"])
+        self.views.append(view)
+        return view
+
+    def numpy(self, name):
+        """Zero-copy NumPy array of a whole column (needs NumPy; read-only)."""
+        import numpy
+        info = self.columns[name]
+        return numpy.frombuffer(self.map, dtype=info["dtype"], count=self.rows, offset=info["offset"])
+
+    def counts(self, name, values=256, block=1 << 24):
+        """Sessions per value 0..values-1 of a one-byte column (pain, activity), counted a block at a time."""
+        view = self.column(name)
+        if view.itemsize != 1:
+            raise ValueError(f"{name} is not a one-byte column")
+        counts = [0] * values
+        for start in range(0, self.rows, block):
+            data = view[start:start + block].tobytes()   # Bounded copy; bytes.count runs at memchr speed
+            for value in range(values):
+                counts[value] += data.count(bytes((value,)))
+        return counts
+
+    def row(self, index):
+        # One session decoded (for spot checks; scans should use the columns)
+        if not 0 <= index < self.rows:
+            raise IndexError("session index out of range")
+        values = {}
+        for name, info in self.columns.items():
+            size = array(info["type"]).itemsize
+            start = info["offset"] + index * size
+            values[name] = int.from_bytes(self.map[start:start + size], "little", signed=info["type"].islower())
+        values["user"] = self.users[values["user"]]
+        values["activity"] = self.activities[values["activity"]]
+        return values
+
+
+# -------------------- Export --------------------
+def export_store(store, path, chunk_rows=CHUNK_ROWS):
+    """Write every session in a SessionStore to a column file; returns the number of sessions."""
+    names = store.user_names()
+    masks = {}   # areas text ("Knee, Back") -> bitmask; there are few distinct combinations
+    with ColumnWriter(path, chunk_rows) as writer:
+        for user_id, day, pain, areas, activity in store.iter_sessions():
+            mask = masks.get(areas)
+            if mask is None:
+                mask = masks[areas] = to_mask([a.strip() for a in areas.split(",") if a.strip()])
+            writer.add(names[user_id], day, pain, mask, activity)
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab columns", description="Columnar session history files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="export the session history")
+    export.add_argument("path", help="column file to write (e.g. sessions.rhc)")
+    export.add_argument("--db", help="SQLite history to export (default: the one on the Desktop)")
+    info = commands.add_parser("info", help="summarise a column file")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        from rehab.store import SessionStore
+        with SessionStore(args.db) as store:
+            rows = export_store(store, args.path)
+        print(f"exported {rows:,} sessions to {args.path} ({os.path.getsize(args.path):,} bytes)")
+        return 0
+
+    from rehab.areas import AreaBitmapIndex
+    from rehab.choices import BODY_AREAS, PAIN_MAX
+    from rehab.dates import day_to_date
+    with ColumnReader(args.path) as reader:
+        print(f"{args.path}: format version {reader.version}, {len(reader):,} sessions, "
+              f"{len(reader.users):,} users, columns {', '.join(reader.columns)}")
+        if not len(reader):
+            return 0
+        print(f"dates: {day_to_date(reader.days[0])} to {day_to_date(reader.days[1])}")
+        pain = reader.counts("pain", PAIN_MAX + 1)
+        print("pain: " + " ".join(f"{p}:{n:,}" for p, n in enumerate(pain) if n))
+        activities = reader.counts("activity", len(reader.activities))
+        print("activity: " + ", ".join(f"{reader.activities[a] or '(none)'} {n:,}"
+                                       for a, n in enumerate(activities) if n))
+        areas = AreaBitmapIndex(reader.column("areas")).area_counts()
+        print("areas: " + ", ".join(f"{area} {areas[area]:,}" for area in BODY_AREAS if areas.get(area)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# -------------------- DATE HELPERS --------------------
+# Session dates are stored as whole days since 1970-01-01 (compact integers); session
+# times as whole seconds since 1970-01-01 UTC (epoch seconds, fit in a uint32 until 2106).
+import datetime
+import time
+
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+
+def epoch_day(date=None):
+    # Convert a date (or today) into the integer day number used by the stores
+    return (date or datetime.date.today()).toordinal() - EPOCH
+
+
+def day_to_date(day):
+    return datetime.date.fromordinal(day + EPOCH)
+
+
+def parse_day(value):
+    # Accept a day number, a datetime.date or an ISO "2025-07-31" string
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    return epoch_day(value)
+
+
+def epoch_seconds(value=None):
+    # Accept epoch seconds, a datetime, a date or ISO string (local midnight), or nothing (now)
+    if value is None:
+        return int(time.time())
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return int(value.timestamp())
+
+
+def timestamp_day(seconds):
+    # Local day number of a session time
+    return epoch_day(datetime.date.fromtimestamp(seconds))
+
+
+def format_timestamp(seconds):
+    return datetime.datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M")
@@ -0,0 +1,70 @@
+# -------------------- SERIES DOWNSAMPLING --------------------
+# Reduces a long (x, y) series to about as many points as a chart has pixels, so years of
+# daily sessions can be drawn in a few milliseconds. x values must be sorted. Everything
+# works on an index range, so only the visible part of a series is ever looked at.
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+def visible_range(xs, x0, x1):
+    # Indices of the points inside [x0, x1], plus one neighbour each side so lines reach the edges
+    return max(bisect_left(xs, x0) - 1, 0), min(bisect_right(xs, x1) + 1, len(xs))
+
+
+def _extremes(ys, i, j):
+    # Indices of the min and max of ys[i:j] in x order (one index if they coincide)
+    segment = ys[i:j]
+    low, high = i + segment.index(min(segment)), i + segment.index(max(segment))
+    if low == high:
+        return (low,)
+    return (low, high) if low < high else (high, low)
+
+
+class BucketCache:
+    # Min/max downsampling on fixed-width x buckets (widths are powers of two). Buckets are
+    # remembered per width, so panning only computes the buckets that scroll into view and
+    # zooming back to an earlier level reuses its buckets; appending a point drops only the
+    # bucket it lands in.
+    def __init__(self, xs, ys, levels=8):
+        self.xs, self.ys = xs, ys
+        self.levels = OrderedDict()   # width -> {bucket number: indices of its min/max}, least recently used first
+        self.max_levels = levels
+        self.computed = 0             # Buckets computed so far (cache misses)
+
+    def append(self, x, y):
+        self.xs.append(x)
+        self.ys.append(y)
+        for width, buckets in self.levels.items():
+            buckets.pop(x // width, None)
+
+    def points(self, x0, x1, buckets):
+        """Indices to draw for the view [x0, x1] at about `buckets` buckets across, oldest first."""
+        xs, ys = self.xs, self.ys
+        lo, hi = visible_range(xs, x0, x1)
+        if hi - lo <= 2 * buckets:
+            return list(range(lo, hi))     # Few enough to draw every point
+        width = 1
+        while width * buckets < x1 - x0:
+            width *= 2
+        cache = self.levels.pop(width, None)
+        if cache is None:
+            cache = {}
+            if len(self.levels) >= self.max_levels:
+                self.levels.popitem(last=False)
+        self.levels[width] = cache
+
+        picked = []
+        for k in range(int(x0 // width), int(x1 // width) + 1):
+            extremes = cache.get(k)
+            if extremes is None:
+                # The whole bucket, not just its visible part: the view's edge buckets are cached too
+                i, j = bisect_left(xs, k * width), bisect_left(xs, (k + 1) * width)
+                extremes = cache[k] = _extremes(ys, i, j) if i < j else ()
+                self.computed += 1
+            picked.extend(extremes)
+        # Neighbours outside the view, unless an edge bucket already reaches past them
+        if xs[lo] < x0 and (not picked or lo < picked[0]):
+            picked.insert(0, lo)
+        if xs[hi - 1] > x1 and (not picked or hi - 1 > picked[-1]):
+            picked.append(hi - 1)
+        return picked
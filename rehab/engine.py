@@ -0,0 +1,187 @@
+# -------------------- RECOMMENDATION ENGINE --------------------
+# GUI-free version of the pain -> status/exercise/diet/tips logic from
+# RehabApp.launch_final_recommendations, with a scalar and a batch (vectorized) API.
+# Thresholds and advice text come from the rules file (see rehab/rules.py).
+import sys
+from itertools import repeat
+from operator import itemgetter
+
+from rehab.areas import label as mask_label, to_mask
+from rehab.choices import PAIN_MAX, PAIN_MIN
+from rehab.rules import INVALID_BAND, default_rules
+
+
+def pain_band(pain, rules=None):
+    # Map one pain level to its severity band index (0 = Minor, 1 = Moderate, 2 = Severe)
+    return (rules or default_rules()).current().band(pain)
+
+
+def area_label(areas):
+    # Accept the wizard's "Knee, Back" string, an area bitmask or any iterable of area names;
+    # known areas are put in screen order, so the advice does not depend on how they were listed
+    if isinstance(areas, int):
+        return mask_label(areas)
+    key = areas if isinstance(areas, str) else tuple(areas)
+    label = _label_cache.get(key)
+    if label is None:
+        label = _label_cache[key] = _canonical_label(key)
+    return label
+
+
+_label_cache = {}   # Cached because batches repeat the same few area combinations
+
+
+def _canonical_label(areas):
+    try:
+        return mask_label(to_mask(areas))
+    except ValueError:                 # Not one of the listed areas: the rules' fallback applies
+        return areas if isinstance(areas, str) else ", ".join(areas)
+
+
+def advice(table, band, label, activity=None):
+    """Return (status, exercise, diet, tips, color) for one band, area label and activity.
+
+    Rules are looked up for each selected area. Areas that share an exercise template share
+    its sentence ({area} lists them); different diet and tips texts are all kept, in area order.
+    """
+    areas = [area.strip() for area in label.split(",")]
+    rows = [table.lookup(band, area, activity) for area in areas]
+    exercise = {}   # template -> the areas it applies to
+    for area, row in zip(areas, rows):
+        exercise.setdefault(row[1], []).append(area)
+    status, color = rows[0][0], rows[0][4]
+    return (status,
+            " ".join(template.format(area=", ".join(group).lower()) for template, group in exercise.items()),
+            " ".join(dict.fromkeys(row[2] for row in rows)),
+            " ".join(dict.fromkeys(row[3] for row in rows)),
+            color)
+
+
+# -------------------- Scalar API --------------------
+def recommend(pain, areas, activity=None, rules=None):
+    """Return the status, advice and colour shown on the final screen for one patient."""
+    table = (rules or default_rules()).current()
+    status, exercise, diet, tips, color = _resolved_rows(table)[table.band(pain), area_label(areas), activity]
+    return {
+        "status": status,
+        "rec_exercise": exercise,
+        "diet": diet,
+        "tips": tips,
+        "color": color,
+    }
+
+
+# -------------------- Batch API --------------------
+class _Resolved(dict):
+    # (band, area label, activity) -> finished (status, exercise, diet, tips, color) row.
+    # Filled on first use, so the rows of a batch are mostly plain dict hits.
+    def __init__(self, table):
+        super().__init__()
+        self.table = table
+
+    def __missing__(self, key):
+        row = self[key] = advice(self.table, *key)
+        return row
+
+
+_resolved = None
+
+
+def _resolved_rows(table):
+    # The row cache belongs to one compiled table; a hot reload starts a fresh one
+    global _resolved
+    if _resolved is None or _resolved.table is not table:
+        _resolved = _Resolved(table)
+    return _resolved
+
+
+INT_FORMATS = frozenset("bBhHiIlLqQnNc")   # struct codes of integer buffer items
+
+
+def pain_bytes(pain_levels):
+    # Turn pain levels into one byte per patient without a Python-level loop where possible
+    if isinstance(pain_levels, (bytes, bytearray)):
+        return bytes(pain_levels)
+    try:
+        view = memoryview(pain_levels)        # array.array, NumPy arrays, mmap slices...
+    except TypeError:
+        return bytes(pain_levels)             # Plain list/iterable of ints (bytes() checks 0–255)
+    order, code = (view.format[0], view.format[1:]) if view.format[0] in "@=<>!" else ("@", view.format)
+    if code not in INT_FORMATS:
+        return bytes(view.tolist())           # Floats etc.: bytes() rejects them as it would a list
+    raw = view.tobytes()                      # Also copies strided views (e.g. NumPy a[::2]) into C order
+    size = view.itemsize
+    if size == 1:
+        return raw
+    # Wider integers (e.g. NumPy int64): keep the low byte of each item by slicing, after checking
+    # that every other byte is zero, i.e. each value is 0–255 (negative values have 0xFF bytes)
+    little = order == "<" or (order in "@=" and sys.byteorder == "little")
+    low = raw[0::size] if little else raw[size - 1::size]
+    if raw.count(0) != low.count(0) + (size - 1) * len(low):
+        raise ValueError("bytes must be in range(0, 256)")
+    return low
+
+
+class RecommendationBatch:
+    # Column-oriented result of recommend_batch()
+    def __init__(self, bands, labels, activities, rows, statuses):
+        self.bands = bands              # bytes, one severity band code per patient
+        self.labels = labels            # list of area labels ("Knee, Back")
+        self.activities = activities    # list of activity names (or None)
+        self.rows = rows                # list of (status, exercise, diet, tips, color) tuples
+        self.statuses = statuses        # Status name for each band code
+
+    def __len__(self):
+        return len(self.bands)
+
+    def _column(self, i):
+        return list(map(itemgetter(i), self.rows))
+
+    @property
+    def status(self):
+        return self._column(0)
+
+    @property
+    def rec_exercise(self):
+        return self._column(1)
+
+    @property
+    def diet(self):
+        return self._column(2)
+
+    @property
+    def tips(self):
+        return self._column(3)
+
+    @property
+    def color(self):
+        return self._column(4)
+
+    def counts(self):
+        # Number of patients per status, counted in C by bytes.count
+        return {status: self.bands.count(band) for band, status in enumerate(self.statuses)}
+
+    def __getitem__(self, i):
+        status, exercise, diet, tips, color = self.rows[i]
+        return {"status": status, "rec_exercise": exercise, "diet": diet, "tips": tips, "color": color}
+
+
+def recommend_batch(pain_levels, areas, activities=None, rules=None):
+    """Recommend for many patients at once; inputs are parallel sequences or buffers."""
+    table = (rules or default_rules()).current()
+    bands = pain_bytes(pain_levels).translate(table.band_table)
+    bad = bands.find(INVALID_BAND)
+    if bad != -1:
+        raise ValueError(f"Pain level at index {bad} is outside {PAIN_MIN}–{PAIN_MAX}.")
+
+    labels = list(map(area_label, areas))
+    if len(labels) != len(bands):
+        raise ValueError("pain_levels and areas must have the same length.")
+    if activities is not None:
+        activities = list(activities)
+        if len(activities) != len(bands):
+            raise ValueError("activities must have the same length as pain_levels.")
+
+    resolved = _resolved_rows(table)
+    rows = list(map(resolved.__getitem__, zip(bands, labels, repeat(None) if activities is None else activities)))
+    return RecommendationBatch(bands, labels, activities, rows, table.statuses)
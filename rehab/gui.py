@@ -0,0 +1,615 @@
+# -------------------- TK WIZARD --------------------
+# The iteration 3 rehabilitation assistant. Only imported when the GUI is started
+# ("iteration 3FINAL.py" or "python -m rehab gui"), so headless tools never load tkinter.
+import tkinter as tk                      # Import the Tkinter module for creating graphical user interfaces
+from tkinter import ttk, messagebox        # Import themed widgets (ttk) and popup message boxes
+import os                                  # File names for the saved-report message
+import sqlite3                             # Errors from the session history and report archive
+import sys                                 # Archive errors are logged to stderr
+import time                                # Session times sent to the clinic server
+import uuid                                # Idempotency keys of sessions sent to the clinic server
+from datetime import date                  # Today's date for progress tracking
+
+from rehab.archive import ReportArchive                           # Compressed copy of every saved report
+from rehab.areas import from_mask, to_mask                        # Body area selections as bitmasks
+from rehab.autocomplete import NameIndex                         # Type-ahead for student names
+from rehab.chart import PainChart                                 # Pain-over-time chart on the final screen
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS   # Options shown in the dropdowns/checkbuttons
+from rehab.dates import day_to_date                              # Chart axis labels
+from rehab.engine import recommend                               # GUI-free recommendation logic
+from rehab.instrument import perf_ns, trace_file, traced, tracer  # Opt-in step timing (REHAB_TRACE=1)
+from rehab.journal import WizardJournal                           # Crash-safe answers of the session in progress
+from rehab.outbox import URL_VARIABLE, Outbox, Uploader           # Offline-first upload to the clinic server
+from rehab.report import MOTIVATIONAL_QUOTES, format_report, report_path, session_report_name   # Saved reports
+from rehab.store import SessionStore                             # Persistent history of every session
+from rehab.trends import TrendTracker, describe                  # Incremental progress figures
+from rehab.wal import WriteAheadLog                              # Shared, lock-protected session log
+from rehab.writer import ReportWriter                            # Background file writes
+
+
+# -------------------- CLASS-BASED REHABILITATION ASSISTANT --------------------
+class RehabApp:
+    # Ordered list of the wizard steps; each one is a pre-built frame inside the single root window
+    STEPS = ("intro", "user_info", "pain", "bodypart", "final")
+
+    def __init__(self, run=True, store=None, history=None, archive=None, outbox=None, journal=None):
+        # -------------------- Global Data --------------------
+        self.user_data = {}  # Dictionary used to store user inputs across all steps (name, pain, etc.)
+        self.report = {}     # Values shown on the final screen (reused by save_data_to_file)
+        # Session history; profiling and replay tools pass their own so the kiosk's files are untouched
+        self.store = store or SessionStore()  # SQLite session history (Desktop/rehab_sessions.db)
+        self.history = history or WriteAheadLog()  # Append-only log shared by every kiosk (Desktop/rehab_sessions.wal)
+        self.archive = archive or ReportArchive()  # Every saved report, deduplicated (Desktop/rehab_archive)
+        self.archived = set()    # Report files already in the archive (only touched on the writer thread)
+        self.journal = journal or WizardJournal()  # Each step's answers, so a crash resumes where it stopped
+        self.outbox = outbox or Outbox()  # Sessions waiting to be sent to the clinic server (Desktop/rehab_outbox.db)
+        # Sessions are always queued; they are only sent when a server is configured
+        self.uploader = Uploader(self.outbox, os.environ[URL_VARIABLE]) if os.environ.get(URL_VARIABLE) else None
+        if self.uploader is not None:
+            self.uploader.start()
+        self.report_file = None  # Per-session report path, so kiosks never write the same file
+        self.known_names = NameIndex(name for name, _ in self.store.students())  # Name suggestions
+        self.trends = TrendTracker()  # Per-patient progress, updated as each session completes
+
+        # -------------------- Theme & UI Styling --------------------
+        # Define background colors for different windows to maintain a consistent modern design
+        self.BG1 = "#332F2C"  # Dark coffee brown background (used in intro and info windows)
+        self.BG2 = "#bba691"  # Tan brown background (used in pain input window)
+        self.BG3 = "#9f9f9f"  # Warm grey (used in body area selection window)
+        self.BG4 = "#85756d"  # Darker brown (used in final recommendation screen)
+
+        # Define fonts and widget colors for uniform styling
+        self.FONT_HEADER = ("Arial", 14, "bold")   # Font for headers and titles
+        self.FONT_BODY = ("Calibri", 11)           # Font for regular text and labels
+        self.BUTTON_BG = "#A0DD4C"                 # Button background color (soft green)
+        self.BUTTON_FG = "black"                   # Button text color
+        self.ENTRY_BG = "#f4f1ee"                  # Entry field background (light beige)
+        self.ENTRY_FG = "black"                    # Entry field text color
+
+        # Title, background and size used when each step is shown
+        self.STEP_META = {
+            "intro": ("Rehabilitation Assistant - Introduction", self.BG1, "420x520"),
+            "user_info": ("Step 1: Student Info", self.BG1, "420x520"),
+            "pain": ("Step 2: Pain Level", self.BG2, "420x520"),
+            "bodypart": ("Step 3: Body Area & Activity", self.BG3, "420x520"),
+            "final": ("Final Recommendations", self.BG4, "440x660"),
+        }
+
+        # -------------------- Motivational Quotes --------------------
+        # A list of positive reinforcement messages randomly shown at the end of the program
+        self.MOTIVATIONAL_QUOTES = MOTIVATIONAL_QUOTES
+
+        # -------------------- Single Root Window --------------------
+        # One Tk interpreter lives for the whole run; steps swap frames instead of creating new windows
+        self.root = tk.Tk()
+        self.root.config(bg=self.BG1)
+        self.current_step = None
+        self.writer = ReportWriter(self.root)  # Saves reports off the event loop
+
+        # Shared progress header, packed above the step frames for steps 1-4
+        self.progress_frame = tk.Frame(self.root, bg=self.BG1)
+        self.progress = ttk.Progressbar(self.progress_frame, length=250, mode="determinate")
+        self.progress.pack(pady=5)
+        self.progress_label = tk.Label(self.progress_frame, bg=self.BG1, fg="white")
+        self.progress_label.pack()
+
+        # Build every step frame once; they are reused for every patient
+        self.frames = {
+            "intro": self.build_intro_frame(),
+            "user_info": self.build_user_info_frame(),
+            "pain": self.build_pain_frame(),
+            "bodypart": self.build_bodypart_frame(),
+            "final": self.build_final_frame(),
+        }
+
+        # Start the app by showing the introduction screen first (or the unfinished session, after a crash)
+        if run:
+            if not self.resume_session():
+                self.launch_intro_window()
+            self.root.mainloop()  # The only mainloop; it runs until the root window is closed
+            self.writer.close()
+            try:
+                self.store.close()
+            except sqlite3.Error as error:   # Sessions still queued after a busy commit; they are in the session log
+                print(f"rehab: could not commit the last sessions to the history: {error}", file=sys.stderr)
+            self.history.close()
+            self.archive.close()
+            self.close_outbox()
+            self.journal.close()
+            if tracer.enabled:
+                tracer.export(trace_file())
+
+    # -------------------- FRAME SWITCHING --------------------
+    @traced(category="navigation")
+    def show_step(self, step):
+        # Hide the frame currently on screen and show the requested one in its place
+        if self.current_step is not None:
+            self.frames[self.current_step].pack_forget()
+        title, bg, geometry = self.STEP_META[step]
+        self.root.title(title)
+        self.root.geometry(geometry)
+        self.root.config(bg=bg)
+
+        # The progress header is only shown for the numbered steps
+        if step == "intro":
+            self.progress_frame.pack_forget()
+        else:
+            self.update_progress(self.STEPS.index(step), 4, bg)
+            if not self.progress_frame.winfo_manager():  # Empty string means it is not packed yet
+                self.progress_frame.pack(side="top", fill="x")
+
+        self.frames[step].pack(fill="both", expand=True)
+
+        if tracer.enabled:
+            # Time the user spends on each step, and how long until Tk has drawn the new frame
+            if self.current_step is not None:
+                tracer.end("dwell:" + self.current_step, "dwell")
+            tracer.begin("dwell:" + step)
+            shown = perf_ns()
+            self.root.after_idle(lambda: tracer.record("first_paint:" + step, "paint", shown, perf_ns() - shown))
+        self.current_step = step
+
+    # -------------------- PROGRESS BAR FUNCTION --------------------
+    @traced(category="widget")
+    def update_progress(self, step, total_steps, bg):
+        # Update the shared progress bar that shows how far along the user is in the 4-step process
+        self.progress["value"] = (step / total_steps) * 100  # Calculate completion percentage
+        # Display the step number under the progress bar
+        self.progress_label.config(text=f"Step {step} of {total_steps}", bg=bg)
+        self.progress_frame.config(bg=bg)
+
+    def reset_session(self):
+        # Clear every input so the pre-built frames can be reused for the next patient
+        self.finish_journal()   # An unfinished session is abandoned, not resumed later
+        self.user_data = {}
+        self.report = {}
+        self.name_entry.delete(0, "end")
+        self.hide_name_suggestions()
+        self.year_dropdown.set("Select Year")
+        self.pain_var.set(0)
+        for var in self.body_areas.values():
+            var.set(False)
+        self.activity_dropdown.set("Select Activity")
+
+    def checkpoint(self, step, data):
+        # Journal a completed step; if the Desktop cannot be written the wizard carries on without crash recovery
+        try:
+            self.journal.checkpoint(step, data)
+        except OSError as error:
+            messagebox.showerror("Error", f"Could not save your progress (it cannot be resumed after a crash):\n{error}")
+
+    def finish_journal(self):
+        try:
+            self.journal.finish()
+        except OSError as error:
+            messagebox.showerror("Error", f"Could not close the session in the journal:\n{error}")
+
+    def resume_session(self):
+        # Refill the wizard from the journal and show the step after the last completed one
+        state = self.journal.recover()
+        if state is None:
+            return False
+        data = state["data"]
+        self.user_data = dict(data)
+        self.name_entry.insert(0, data.get("name", ""))
+        self.year_dropdown.set(data.get("year", "Select Year"))
+        self.pain_var.set(data.get("pain_level", 0))
+        for area in from_mask(data.get("body_area_mask", 0)):
+            self.body_areas[area].set(True)
+        self.activity_dropdown.set(data.get("activity", "Select Activity"))
+        {"user_info": self.launch_pain_window, "pain": self.launch_bodypart_window,
+         "bodypart": self.launch_final_recommendations}[state["step"]]()
+        return True
+
+    # -------------------- STEP 0: INTRO WINDOW --------------------
+    @traced(category="build")
+    def build_intro_frame(self):
+        # Function to create the introductory screen of the application
+        frame = tk.Frame(self.root, bg=self.BG1)
+
+        # Create title label
+        tk.Label(frame, text="Welcome to the Rehabilitation Assistant!",
+                 font=self.FONT_HEADER, bg=self.BG1, fg="white",
+                 relief="ridge", bd=3, padx=5, pady=5).pack(pady=20)
+
+        # Create a short description under the title
+        tk.Label(frame, text="Your personal guide to recovery and progress tracking.",
+                 bg=self.BG1, font=self.FONT_BODY, wraplength=360, fg="white").pack(pady=10)
+
+        # Button to start a new session
+        tk.Button(frame, text="Start New Session", width=20, command=self.launch_user_info,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=10)
+
+        # Button to exit the application
+        tk.Button(frame, text="Close", width=20, command=self.root.destroy,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=10)
+        return frame
+
+    @traced()
+    def launch_intro_window(self):
+        # Show the introductory screen, ready for a new patient
+        self.reset_session()
+        self.show_step("intro")
+
+    # -------------------- STEP 1: STUDENT INFO WINDOW --------------------
+    @traced(category="build")
+    def build_user_info_frame(self):
+        # Function to build the screen that collects the user's name and school year
+        frame = tk.Frame(self.root, bg=self.BG1)
+
+        # Labels and entry widgets
+        tk.Label(frame, text="Welcome to the Rehabilitation Assistant", font=self.FONT_HEADER,
+                 bg=self.BG1, fg="white", relief="ridge", bd=3, padx=5, pady=5).pack(pady=5)
+
+        tk.Label(frame, text="Enter your name:", bg=self.BG1, font=self.FONT_BODY, fg="white").pack()
+        self.name_entry = tk.Entry(frame, bg=self.ENTRY_BG, fg=self.ENTRY_FG, relief="groove", bd=2)
+        self.name_entry.pack(pady=5)
+        self.name_entry.bind("<KeyRelease>", self.update_name_suggestions)
+        self.name_entry.bind("<Down>", lambda event: self.focus_name_suggestions())
+
+        # Type-ahead list of known students; only packed while there is something to suggest
+        self.name_suggestions = tk.Listbox(frame, height=5, bg=self.ENTRY_BG, fg=self.ENTRY_FG,
+                                           activestyle="dotbox", exportselection=False)
+        self.name_suggestions.bind("<ButtonRelease-1>", lambda event: self.choose_name_suggestion())
+        self.name_suggestions.bind("<Return>", lambda event: self.choose_name_suggestion())
+        self.name_suggestions.bind("<Escape>", lambda event: self.hide_name_suggestions())
+
+        tk.Label(frame, text="Select your year level:", bg=self.BG1, font=self.FONT_BODY, fg="white").pack(pady=5)
+        self.year_var = tk.StringVar()
+        # Dropdown menu for year selection
+        self.year_dropdown = ttk.Combobox(frame, textvariable=self.year_var,
+                                          values=YEAR_LEVELS, state="readonly")
+        self.year_dropdown.set("Select Year")
+        self.year_dropdown.pack()
+
+        # Button to move to next step
+        tk.Button(frame, text="Next", command=self.submit_user_info,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=10)
+        return frame
+
+    @traced()
+    def launch_user_info(self):
+        self.show_step("user_info")
+        self.name_entry.focus_set()
+
+    @traced(category="input")
+    def update_name_suggestions(self, event=None):
+        # Refresh the type-ahead list after each keystroke in the name field
+        if event is not None and event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            if event.keysym == "Escape":
+                self.hide_name_suggestions()
+            return
+        matches = self.known_names.suggest(self.name_entry.get())
+        if not matches or matches == [self.name_entry.get()]:
+            self.hide_name_suggestions()
+            return
+        self.name_suggestions.delete(0, "end")
+        self.name_suggestions.insert("end", *matches)
+        self.name_suggestions.config(height=len(matches))
+        if not self.name_suggestions.winfo_manager():
+            self.name_suggestions.pack(after=self.name_entry)
+
+    def focus_name_suggestions(self):
+        if self.name_suggestions.winfo_manager():
+            self.name_suggestions.focus_set()
+            self.name_suggestions.selection_set(0)
+            self.name_suggestions.activate(0)
+
+    def choose_name_suggestion(self):
+        # Copy the picked spelling into the name field, so sessions share one spelling per student
+        picked = self.name_suggestions.curselection()
+        if picked:
+            self.name_entry.delete(0, "end")
+            self.name_entry.insert(0, self.name_suggestions.get(picked[0]))
+        self.hide_name_suggestions()
+        self.name_entry.focus_set()
+        self.name_entry.icursor("end")
+
+    def hide_name_suggestions(self):
+        self.name_suggestions.pack_forget()
+
+    @traced(category="input")
+    def submit_user_info(self):
+        # Function called when "Next" button is clicked
+        name = self.name_entry.get()        # Get user name input
+        year = self.year_var.get()          # Get selected year from dropdown
+        # Validate that both fields are filled in
+        if not name or year == "Select Year":
+            messagebox.showerror("Missing Info", "Please enter your name and select a year level.")
+            return
+        # Store collected data and move on to the next step
+        self.hide_name_suggestions()
+        self.known_names.add(name)   # New students are suggested from the next session on
+        self.user_data["name"] = name
+        self.user_data["year"] = year
+        self.checkpoint("user_info", {"name": name, "year": year})
+        self.launch_pain_window()
+
+    # -------------------- STEP 2: PAIN LEVEL WINDOW --------------------
+    @traced(category="build")
+    def build_pain_frame(self):
+        # Function to build the screen that collects the user's current pain level on a scale of 0–10
+        frame = tk.Frame(self.root, bg=self.BG2)
+
+        # Instruction label
+        tk.Label(frame, text="Rate your pain (0–10):", font=self.FONT_BODY, bg=self.BG2, fg="white").pack(pady=10)
+
+        # Horizontal scale for pain rating
+        self.pain_var = tk.IntVar(value=0)
+        tk.Scale(frame, from_=0, to=10, orient="horizontal", variable=self.pain_var,
+                 bg=self.BG2, troughcolor="#d1c4b2", highlightbackground=self.BG2).pack(pady=5)
+
+        # Button to proceed
+        tk.Button(frame, text="Next", command=self.submit_pain,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=10)
+        return frame
+
+    @traced()
+    def launch_pain_window(self):
+        self.show_step("pain")
+
+    @traced(category="input")
+    def submit_pain(self):
+        pain = self.pain_var.get()              # Get value from scale
+        self.user_data["pain_level"] = pain     # Store pain level in dictionary
+        self.checkpoint("pain", {"pain_level": pain})
+        self.launch_bodypart_window()           # Move to next step
+
+    # -------------------- STEP 3: BODY AREA & ACTIVITY --------------------
+    @traced(category="build")
+    def build_bodypart_frame(self):
+        # Function to build the screen for selecting affected body areas and type of physical activity
+        frame = tk.Frame(self.root, bg=self.BG3)
+
+        # Label for body area selection
+        tk.Label(frame, text="Which parts of your body hurt?", font=self.FONT_BODY, bg=self.BG3, fg="white").pack(pady=5)
+
+        # Dictionary to hold BooleanVars for each body area
+        self.body_areas = {}
+        for area in BODY_AREAS:
+            var = tk.BooleanVar()
+            # Each area is represented as a checkbox
+            tk.Checkbutton(frame, text=area, variable=var, bg=self.BG3, fg="white", selectcolor="#bba691").pack(anchor="w")
+            self.body_areas[area] = var  # Save variable in dictionary
+
+        # Dropdown for activity type
+        tk.Label(frame, text="Select activity type:", font=self.FONT_BODY, bg=self.BG3, fg="white").pack(pady=10)
+        self.activity_var = tk.StringVar()
+        self.activity_dropdown = ttk.Combobox(frame, textvariable=self.activity_var,
+                                              values=ACTIVITIES,
+                                              state="readonly")
+        self.activity_dropdown.set("Select Activity")
+        self.activity_dropdown.pack()
+
+        # Next button
+        tk.Button(frame, text="Next", command=self.submit_bodypart,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=15)
+        return frame
+
+    @traced()
+    def launch_bodypart_window(self):
+        self.show_step("bodypart")
+
+    @traced(category="input")
+    def submit_bodypart(self):
+        # Collect checked body areas
+        selected_areas = [area for area, var in self.body_areas.items() if var.get()]
+        # Validate that at least one is selected
+        if not selected_areas:
+            messagebox.showerror("Missing Info", "Please select at least one body area.")
+            return
+
+        # Get activity selection
+        activity = self.activity_var.get()
+        if activity == "Select Activity":
+            messagebox.showerror("Missing Info", "Please select your activity type.")
+            return
+
+        # Store data and move to final recommendations
+        self.user_data["body_area"] = ", ".join(selected_areas)       # Display text
+        self.user_data["body_area_mask"] = to_mask(selected_areas)    # One bit per area, for storage and queries
+        self.user_data["activity"] = activity
+        # The outbox key is journaled too, so a session resumed after a crash is not queued twice
+        self.user_data["key"] = uuid.uuid4().hex
+        self.checkpoint("bodypart", {"body_area": self.user_data["body_area"],
+                                     "body_area_mask": self.user_data["body_area_mask"], "activity": activity,
+                                     "key": self.user_data["key"]})
+        self.launch_final_recommendations()
+
+    # -------------------- STEP 4: FINAL RECOMMENDATIONS --------------------
+    @traced(category="build")
+    def build_final_frame(self):
+        # Function to build the screen that displays personalized recommendations
+        frame = tk.Frame(self.root, bg=self.BG4)
+
+        # Labels are created once and their text is filled in for each patient
+        self.final_labels = {}
+        self.final_labels["header"] = tk.Label(frame, font=self.FONT_HEADER, bg=self.BG4, fg="white",
+                                               relief="ridge", bd=3, padx=5, pady=5)
+        self.final_labels["header"].pack(pady=10)
+
+        # Show all calculated results and suggestions
+        self.final_labels["pain"] = tk.Label(frame, font=self.FONT_BODY, bg=self.BG4)
+        self.final_labels["pain"].pack()
+        self.final_labels["area"] = tk.Label(frame, font=self.FONT_BODY, bg=self.BG4, fg="white")
+        self.final_labels["area"].pack()
+        self.final_labels["activity"] = tk.Label(frame, font=self.FONT_BODY, bg=self.BG4, fg="white")
+        self.final_labels["activity"].pack(pady=5)
+
+        tk.Label(frame, text="🏃‍♀️ Exercises:", font=self.FONT_BODY, bg=self.BG4, fg="white").pack()
+        self.final_labels["exercise"] = tk.Label(frame, wraplength=380, bg=self.BG4, fg="white")
+        self.final_labels["exercise"].pack()
+
+        tk.Label(frame, text="🥗 Diet Tips:", font=self.FONT_BODY, bg=self.BG4, fg="white").pack(pady=5)
+        self.final_labels["diet"] = tk.Label(frame, wraplength=380, bg=self.BG4, fg="white")
+        self.final_labels["diet"].pack()
+
+        tk.Label(frame, text="🛌 Recovery Advice:", font=self.FONT_BODY, bg=self.BG4, fg="white").pack(pady=5)
+        self.final_labels["tips"] = tk.Label(frame, wraplength=380, bg=self.BG4, fg="white")
+        self.final_labels["tips"].pack()
+
+        # Display motivational quote at the end
+        self.final_labels["motivation"] = tk.Label(frame, font=self.FONT_BODY, bg=self.BG4,
+                                                   wraplength=380, fg="yellow")
+        self.final_labels["motivation"].pack(pady=10)
+
+        # Progress across this patient's previous sessions
+        self.final_labels["trend"] = tk.Label(frame, font=self.FONT_BODY, bg=self.BG4, wraplength=380, fg="white")
+        self.final_labels["trend"].pack()
+
+        # Pain over time (drag to pan, mouse wheel to zoom, double-click to reset)
+        self.pain_chart = PainChart(frame, width=380, height=120, bg=self.BG4, fg="white", line="yellow",
+                                    format_x=lambda day: day_to_date(day).isoformat())
+        self.pain_chart.pack(pady=5)
+
+        # Button to save the rehab data
+        tk.Button(frame, text="Save Report", command=self.save_data_to_file,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=10)
+
+        # Button to start over with the next patient, reusing the same window
+        tk.Button(frame, text="New Session", command=self.launch_intro_window,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=5)
+
+        # Button to close the program
+        tk.Button(frame, text="Close", command=self.root.destroy,
+                  bg=self.BUTTON_BG, fg=self.BUTTON_FG, relief="raised", bd=3).pack(pady=5)
+        return frame
+
+    @traced()
+    def launch_final_recommendations(self):
+        # Function to display personalized recommendations based on user inputs
+
+        # Retrieve data from dictionary
+        name = self.user_data["name"]
+        year = self.user_data["year"]
+        pain = self.user_data["pain_level"]
+        area = self.user_data["body_area"]
+        areas = from_mask(self.user_data["body_area_mask"])
+        activity = self.user_data["activity"]
+
+        # Generate recommendations based on pain level (see rehab/engine.py)
+        rec = recommend(pain, area, activity)
+        status = rec["status"]
+        rec_exercise = rec["rec_exercise"]
+        diet = rec["diet"]
+        tips = rec["tips"]
+        color = rec["color"]
+
+        # Randomly select a motivational quote
+        import random   # Imported on first use; only the final screen needs it
+        motivation = random.choice(self.MOTIVATIONAL_QUOTES)
+
+        # Keep the values so the report can be saved later
+        self.report = {"name": name, "year": year, "pain": pain, "status": status, "area": area,
+                       "activity": activity, "rec_exercise": rec_exercise, "diet": diet,
+                       "tips": tips, "motivation": motivation}
+
+        # Record the completed session in the history. The commit can wait up to 30 s for another kiosk's
+        # lock, so it runs on the writer thread, followed by the reads for the trend and the chart
+        patient = (name, year)
+        first_seen = patient not in self.trends   # Their stored history is read only the first time they are seen
+        report = self.report
+        self.writer.run(lambda: self.record_session(name, year, pain, areas, activity, first_seen),
+                        on_done=lambda result, error: self.session_recorded(report, patient, pain, areas, result, error))
+        session = {"name": name, "year": year, "pain": pain, "areas": list(areas),
+                   "activity": activity, "time": int(time.time())}
+        if self.user_data.get("key"):   # Missing only in journals written before keys were kept
+            session["key"] = self.user_data["key"]
+        try:
+            self.outbox.put(session)
+        except (OSError, sqlite3.Error) as error:
+            messagebox.showerror("Error", f"Could not queue the session for the clinic server:\n{error}")
+        # Handed to the history and in the outbox: a crash from here on must not record the session again
+        self.finish_journal()
+        try:
+            self.history.append_json({"name": name, "year": year, "pain": pain,
+                                      "areas": self.user_data["body_area_mask"],
+                                      "activity": activity, "date": date.today().isoformat()})
+        except OSError as error:
+            messagebox.showerror("Error", f"Could not add the session to the session log:\n{error}")
+        if self.uploader is not None:
+            self.uploader.wake()
+        self.report_file = report_path(session_report_name(name, year))
+
+        # Update the patient's trend figures; a first-seen patient's come with their history (session_recorded)
+        if not first_seen:
+            self.trends.add(patient, date.today(), pain, areas)
+
+        # Fill in the pre-built labels with the personalized summary
+        labels = self.final_labels
+        labels["header"].config(text=f"🧾 Rehab Report for {name} ({year})")
+        labels["pain"].config(text=f"Pain Level: {pain} ({status})", fg=color)
+        labels["area"].config(text=f"Affected Area(s): {area}")
+        labels["activity"].config(text=f"Activity: {activity}")
+        labels["exercise"].config(text=rec_exercise)
+        labels["diet"].config(text=diet)
+        labels["tips"].config(text=tips)
+        labels["motivation"].config(text=f"💡 Motivation: {motivation}")
+        labels["trend"].config(text="📈 Progress: loading…" if first_seen else
+                               f"📈 Progress: {describe(self.trends.summary(patient))}")
+        self.pain_chart.set_series([], [])   # Until this patient's history has been read
+
+        self.show_step("final")
+
+    def record_session(self, name, year, pain, areas, activity, first_seen):
+        # Runs on the writer thread. A commit that fails (busy past the timeout) raises before any
+        # read, so the history is not waited on twice; the session stays queued for the next commit
+        self.store.add_session(name, year, pain, areas, activity)
+        self.store.flush()
+        past = self.store.query(user=name, year=year) if first_seen else None
+        return past, self.store.pain_history(name, year)
+
+    def session_recorded(self, report, patient, pain, areas, result, error):
+        # Called on the Tk thread once record_session has finished
+        on_screen = self.report is report   # Otherwise the wizard has moved on to the next patient
+        if error is not None:
+            if on_screen and patient not in self.trends:
+                self.final_labels["trend"].config(text="📈 Progress: not available (the history is busy)")
+            messagebox.showerror("Error", f"Could not add the session to the history:\n{error}")
+            return
+        past, history = result
+        if past is not None:
+            if patient in self.trends:   # Filled in meanwhile by the read of their previous session
+                self.trends.add(patient, date.today(), pain, areas)
+            else:
+                for session in reversed(past):
+                    self.trends.add(patient, session["date"], session["pain_level"], session["body_area"])
+        if on_screen:
+            self.final_labels["trend"].config(text=f"📈 Progress: {describe(self.trends.summary(patient))}")
+            self.pain_chart.set_series(*history)   # Includes this session
+
+    # -------------------- Save Data Function --------------------
+    def save_data_to_file(self):
+        """Save all rehab report details into a text file (written in the background)."""
+        report = dict(self.report)  # Snapshot, so the next patient cannot change what gets written
+        if tracer.enabled:
+            tracer.begin("save_report")
+        # Repeated clicks while a save is still queued are merged into that save
+        path = self.report_file
+        self.writer.save(path, lambda: self.render_report(path, report), on_done=self.report_saved)
+
+    def render_report(self, path, report):
+        # Runs on the writer thread; a report saved again (same file) is archived only once
+        if path not in self.archived:
+            try:
+                self.archive.add(report)
+                self.archive.flush()
+                self.archived.add(path)
+            except (OSError, sqlite3.Error) as error:   # The report file is still written
+                print(f"rehab: could not archive {os.path.basename(path)}: {error}", file=sys.stderr)
+        return format_report(report)
+
+    def close_outbox(self):
+        # Whatever is still queued stays in the outbox and goes out on the next start
+        if self.uploader is not None:
+            self.uploader.stop(timeout=2)
+        self.outbox.close()
+
+    def report_saved(self, path, error):
+        # Called on the Tk thread (via after()) once the background write has finished
+        if tracer.enabled:
+            tracer.end("save_report", "io", {"ok": error is None})
+        if error is None:
+            messagebox.showinfo("Saved", f"Your report has been saved to '{os.path.basename(path)}'.")
+        else:
+            messagebox.showerror("Error", f"Could not save file:\n{error}")
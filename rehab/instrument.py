@@ -0,0 +1,127 @@
+# -------------------- WIZARD INSTRUMENTATION --------------------
+# Opt-in timing of the wizard steps (set REHAB_TRACE=1, optionally REHAB_TRACE_FILE=path).
+# Events go into a fixed-size ring buffer and can be exported as JSON lines or in the
+# Chrome trace format (open in chrome://tracing or https://ui.perfetto.dev).
+# When tracing is off, @traced returns the original function, so there is no overhead.
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+perf_ns = time.perf_counter_ns
+
+
+class Tracer:
+    def __init__(self, capacity=8192, enabled=False):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.buffer = [None] * capacity   # Preallocated ring; old events are overwritten
+        self.slots = itertools.count()    # Hands out ring slots; next() is atomic under the GIL
+        self.next = 0                     # Total events ever recorded (next slot = next % capacity)
+        self.open = {}                    # name -> start time for spans started/ended in different calls
+
+    # -------------------- Recording --------------------
+    def record(self, name, category, start_ns, duration_ns, args=None):
+        # Store one complete event; cheap enough to call from Tk callbacks and worker threads
+        slot = next(self.slots)
+        self.buffer[slot % self.capacity] = (name, category, start_ns, duration_ns, threading.get_ident(), args)
+        if slot >= self.next:
+            self.next = slot + 1
+
+    def begin(self, name):
+        # Start a span that is finished later by end(name), e.g. time spent on a step
+        self.open[name] = perf_ns()
+
+    def end(self, name, category, args=None):
+        start = self.open.pop(name, None)
+        if start is not None:
+            self.record(name, category, start, perf_ns() - start, args)
+
+    def span(self, name, category="span", args=None):
+        return _Span(self, name, category, args) if self.enabled else _NO_SPAN
+
+    def events(self):
+        # Recorded events, oldest first
+        if self.next <= self.capacity:
+            return self.buffer[:self.next]
+        split = self.next % self.capacity
+        return self.buffer[split:] + self.buffer[:split]
+
+    # -------------------- Export --------------------
+    def export_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            for name, category, start, duration, tid, args in self.events():
+                file.write(json.dumps({"name": name, "cat": category, "ts_us": start / 1000,
+                                       "dur_us": duration / 1000, "tid": tid, "args": args or {}}) + "\n")
+
+    def export_chrome_trace(self, path):
+        pid = os.getpid()
+        events = [{"name": name, "cat": category, "ph": "X", "ts": start / 1000, "dur": duration / 1000,
+                   "pid": pid, "tid": tid, "args": args or {}}
+                  for name, category, start, duration, tid, args in self.events()]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def export(self, path):
+        # Pick the format from the file name: .jsonl -> JSON lines, anything else -> Chrome trace
+        if path.endswith(".jsonl"):
+            self.export_jsonl(path)
+        else:
+            self.export_chrome_trace(path)
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer, self.name, self.category, self.args = tracer, name, category, args
+
+    def __enter__(self):
+        self.start = perf_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.category, self.start, perf_ns() - self.start, self.args)
+
+
+class _NoSpan:
+    # Shared do-nothing context manager returned while tracing is off
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+# The process-wide tracer used by the wizard
+tracer = Tracer(int(os.environ.get("REHAB_TRACE_CAPACITY", "8192")),
+                enabled=os.environ.get("REHAB_TRACE", "") not in ("", "0"))
+
+
+def traced(name=None, category="step", tracer=tracer):
+    """Decorator timing every call of a function; a no-op unless tracing is enabled at import."""
+    def decorate(fn):
+        if not tracer.enabled:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = perf_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.record(label, category, start, perf_ns() - start)
+        return wrapper
+    return decorate
+
+
+def trace_file():
+    # Where the wizard writes its trace on exit
+    return os.environ.get("REHAB_TRACE_FILE") or os.path.join(os.path.expanduser("~"), "rehab_trace.json")
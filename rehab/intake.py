@@ -0,0 +1,134 @@
+# -------------------- PAIN READING INTAKE --------------------
+# Reads pain readings one line at a time from stdin, a file or a pipe and validates them in
+# a loop (no recursion, so a long run of bad lines cannot hit the recursion limit). Each line
+# is "7" or "when,7", where when is epoch seconds or an ISO date/time. Readings are yielded
+# lazily and rejected lines are counted with their line numbers, so any amount of input is
+# processed in constant memory.
+# Usage: python -m rehab intake [readings.txt | -] [--rejects rejects.txt]
+import argparse
+import sys
+
+from rehab.choices import PAIN_MAX, PAIN_MIN
+from rehab.dates import epoch_seconds, format_timestamp
+
+MAX_KEPT_REJECTS = 100   # Only this many rejected lines are kept for the summary; the rest are counted
+MAX_TIME = 2 ** 32       # Session times are stored as uint32 epoch seconds (see rehab/sessionlog.py)
+LEVELS = {str(p): p for p in range(PAIN_MIN, PAIN_MAX + 1)}   # Fast path for well-formed input
+
+
+def parse_pain(text):
+    """Return text as a pain level, or raise ValueError with the message shown to the user."""
+    level = LEVELS.get(text)
+    if level is not None:
+        return level
+    try:
+        level = int(text)
+    except ValueError:
+        raise ValueError("Invalid – please enter a number.") from None
+    if not PAIN_MIN <= level <= PAIN_MAX:
+        raise ValueError(f"Invalid – enter a number from {PAIN_MIN} to {PAIN_MAX}.")
+    return level
+
+
+class Rejects:
+    # Lines that failed validation: all are counted, the first few kept (and all optionally written out)
+    def __init__(self, keep=MAX_KEPT_REJECTS, out=None):
+        self.count = 0
+        self.kept = []        # (line number, line, reason)
+        self.keep = keep
+        self.out = out        # Open text file that receives every reject, or None
+
+    def __len__(self):
+        return self.count
+
+    def add(self, number, line, reason):
+        self.count += 1
+        if len(self.kept) < self.keep:
+            self.kept.append((number, line, reason))
+        if self.out is not None:
+            self.out.write(f"{number}\t{line}\t{reason}\n")
+
+
+def parse_when(text, default):
+    # Epoch seconds ("1754100000") or an ISO date/time ("2025-07-31", "2025-07-31 09:30"); empty -> default
+    if not text:
+        return default
+    try:
+        if text.isdigit():
+            seconds = int(text)
+        elif text.replace(".", "", 1).isdigit():
+            seconds = int(float(text))
+        else:
+            seconds = epoch_seconds(text)
+    except ValueError:
+        raise ValueError(f"Invalid – {text!r} is not a date or time.") from None
+    if not 0 <= seconds < MAX_TIME:
+        raise ValueError(f"Invalid – {text!r} is outside the supported time range.")
+    return seconds
+
+
+def read_readings(lines, rejects=None, when=None):
+    """Yield (line number, epoch seconds, pain) for every valid line; bad lines go to rejects."""
+    default_when = epoch_seconds(when)   # Readings without a time are stamped with the start of the run
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        level = LEVELS.get(line)
+        if level is not None:            # Just a pain level: the common case, no further parsing
+            yield number, default_when, level
+            continue
+        if not line or line.startswith("#"):
+            continue
+        stamp, _, pain = line.rpartition(",")
+        try:
+            reading = number, parse_when(stamp.strip(), default_when), parse_pain(pain.strip())
+        except ValueError as e:
+            if rejects is not None:
+                rejects.add(number, line, str(e))
+            continue
+        yield reading
+
+
+def open_source(path):
+    # "-" (or nothing) reads standard input, so readings can be piped in
+    if path in (None, "-"):
+        return sys.stdin
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab intake", description="Validate a stream of pain readings.")
+    parser.add_argument("source", nargs="?", default="-", help="file of readings, or - for stdin (default)")
+    parser.add_argument("--rejects", help="write every rejected line (number, line, reason) to this file")
+    args = parser.parse_args(argv)
+
+    out = open(args.rejects, "w", encoding="utf-8") if args.rejects else None
+    rejects = Rejects(out=out)
+    counts = [0] * (PAIN_MAX + 1)
+    first = last = None
+    source = open_source(args.source)
+    try:
+        for _, when, pain in read_readings(source, rejects):
+            counts[pain] += 1
+            first = when if first is None else min(first, when)
+            last = when if last is None else max(last, when)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not None:
+            out.close()
+
+    total = sum(counts)
+    print(f"accepted {total:,} readings, rejected {rejects.count:,}")
+    if total:
+        print(f"from {format_timestamp(first)} to {format_timestamp(last)}, "
+              f"mean pain {sum(p * n for p, n in enumerate(counts)) / total:.2f}")
+        print("pain  " + " ".join(f"{p}:{n}" for p, n in enumerate(counts) if n))
+    for number, line, reason in rejects.kept[:10]:
+        print(f"  line {number}: {line!r} - {reason}")
+    if rejects.count > 10:
+        print(f"  ... {rejects.count - 10:,} more" + (f" (all in {args.rejects})" if args.rejects else ""))
+    return 1 if rejects.count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
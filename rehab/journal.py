@@ -0,0 +1,152 @@
+# -------------------- WIZARD JOURNAL --------------------
+# Crash-safe checkpoints of the session being entered. Each completed wizard step appends
+# one small record (framed like the session WAL, so a torn last write is detected) holding
+# that step's answers; finishing or abandoning the session appends a closing record. After
+# a crash, power cut or closed window, recover() replays the journal and returns the last
+# completed step with the answers so far, and the wizard carries on from there.
+#
+# Appends go straight to the file (os.write, so they survive the process dying); the fsync
+# that makes them survive a power cut is done by a background thread, which batches every
+# append made within SYNC_INTERVAL into one fsync, so a checkpoint never waits for the disk.
+# Once the journal holds more than COMPACT_RECORDS records and no session is open it is
+# rewritten (atomically) as an empty file.
+# One journal per kiosk (the host name is in the file name), so shared Desktops are fine.
+import json
+import os
+import socket
+import threading
+
+from rehab.safeio import atomic_write
+from rehab.wal import HEADER, encode_record, scan
+
+SYNC_INTERVAL = 0.05     # Seconds an append may wait for its fsync (grouped with any others)
+COMPACT_RECORDS = 256    # Records kept before the journal is rewritten
+
+
+def default_path():
+    return os.path.join(os.path.expanduser("~"), "Desktop", f"rehab_wizard-{socket.gethostname()}.journal")
+
+
+def replay(records):
+    """Fold journal records into the open session: {"step": last completed step, "data": answers}, or None."""
+    state = None
+    for record in records:
+        if record.get("op") == "step":
+            state = {"step": record["step"], "data": dict(state["data"] if state else {}, **record["data"])}
+        else:                                # "end": the session was finished or abandoned
+            state = None
+    return state
+
+
+class WizardJournal:
+    def __init__(self, path=None, sync=True):
+        self.path = path or default_path()
+        self.sync = sync                     # fsync in the background (off only for tests/benchmarks)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Condition()
+        self.fd = None
+        self.dirty = False                   # Appended since the last fsync
+        self.syncing = False                 # The sync thread is in fsync (the descriptor must stay open)
+        self.closing = False
+        self.syncs = 0
+        self.compactions = 0
+        self.state = self._open()
+        self.thread = None
+        if sync:
+            self.thread = threading.Thread(target=self._sync_loop, name="rehab-journal", daemon=True)
+            self.thread.start()
+
+    def _open(self):
+        # Read what the last run left, cut off a torn final record, and position for appending
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+        data = os.read(self.fd, os.fstat(self.fd).st_size) if os.fstat(self.fd).st_size else b""
+        records, end = [], 0
+        for offset, payload in scan(data):
+            try:
+                records.append(json.loads(payload))
+            except ValueError:
+                continue
+            end = offset + HEADER.size + len(payload)
+        if end < len(data):
+            os.ftruncate(self.fd, end)
+        self.records = len(records)
+        return replay(records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.closing = True
+            self.lock.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+        with self.lock:
+            if self.dirty and self.sync:
+                os.fsync(self.fd)
+            os.close(self.fd)
+            self.fd = None
+
+    # -------------------- Writing --------------------
+    def _append(self, record):
+        frame = encode_record(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+        with self.lock:
+            os.write(self.fd, frame)
+            self.records += 1
+            if not self.dirty:
+                self.dirty = True
+                self.lock.notify_all()       # Wake the sync thread
+
+    def checkpoint(self, step, data):
+        """Record that step was completed with these answers (JSON-able values)."""
+        self._append({"op": "step", "step": step, "data": data})
+        self.state = {"step": step, "data": dict(self.state["data"] if self.state else {}, **data)}
+
+    def finish(self):
+        """Close the open session (saved, or abandoned for a new one); nothing is resumed after this."""
+        if self.state is None:
+            return
+        self._append({"op": "end"})
+        self.state = None
+        if self.records >= COMPACT_RECORDS:
+            self.compact()
+
+    def recover(self):
+        """The session left open by the last run: {"step": ..., "data": {...}}, or None."""
+        return self.state
+
+    def compact(self):
+        # Rewrite the journal as just the open session (usually nothing) and swap it in atomically
+        records = [] if self.state is None else [{"op": "step", "step": self.state["step"], "data": self.state["data"]}]
+        data = b"".join(encode_record(json.dumps(r, separators=(",", ":")).encode("utf-8")) for r in records)
+        with self.lock:
+            while self.syncing:
+                self.lock.wait()
+            atomic_write(self.path, data, binary=True, durable=self.sync)
+            os.close(self.fd)
+            self.fd = os.open(self.path, os.O_RDWR | os.O_APPEND | getattr(os, "O_BINARY", 0))
+            self.records = len(records)
+            self.dirty = False               # atomic_write synced the new file
+            self.compactions += 1
+
+    # -------------------- Background fsync --------------------
+    def _sync_loop(self):
+        with self.lock:
+            while not self.closing:
+                if not self.dirty:
+                    self.lock.wait()
+                    continue
+                # Let more appends join this fsync, then sync without blocking the appenders
+                self.lock.wait(SYNC_INTERVAL)
+                self.dirty, self.syncing = False, True
+                self.lock.release()
+                try:
+                    os.fsync(self.fd)
+                finally:
+                    self.lock.acquire()
+                    self.syncing = False
+                    self.lock.notify_all()
+                self.syncs += 1
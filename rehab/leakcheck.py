@@ -0,0 +1,214 @@
+# -------------------- LEAK CHECK MODE --------------------
+# Runs the wizard through N simulated sessions and looks for memory that grows with the
+# session count: tracemalloc snapshots at every step boundary, live Tk widgets and Tcl
+# commands (each Python callback registered with Tk is one), and live Python objects per
+# class. Anything whose count or size rises in a straight line across sessions is flagged.
+# Needs a display (xvfb-run on headless machines).
+# Usage: python -m rehab leakcheck [--sessions 50] [--report leak_report.txt]
+import argparse
+import gc
+import sys
+import tempfile
+import tracemalloc
+
+from rehab.replay import close_app, play, scratch_app
+
+WARMUP = 3   # Sessions ignored while caches, fonts and the SQLite connection settle
+
+# Growth per session below these is noise, not a leak
+MIN_OBJECTS = 0.5       # objects of one class
+MIN_BYTES = 256         # bytes allocated at one source line
+MIN_WIDGETS = 0.2       # Tk widgets / Tcl commands
+MIN_R2 = 0.8            # how straight the line must be
+
+
+def fit_line(values):
+    """Least-squares slope and r² of values against 0, 1, 2, ... (r² is 0 for a flat series)."""
+    n = len(values)
+    if n < 2:
+        return 0.0, 0.0
+    mean_x, mean_y = (n - 1) / 2, sum(values) / n
+    sxx = sum((x - mean_x) ** 2 for x in range(n))
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    syy = sum((y - mean_y) ** 2 for y in values)
+    if not syy:
+        return 0.0, 0.0
+    slope = sxy / sxx
+    return slope, (sxy * sxy) / (sxx * syy)
+
+
+def class_counts():
+    # Live objects tracked by the garbage collector, per class (module.qualname). Counted here
+    # rather than with Counter so the count ints are allocated in this (filtered-out) file.
+    counts = {}
+    for obj in gc.get_objects():
+        cls = type(obj)
+        counts[cls] = counts.get(cls, 0) + 1
+    return {f"{cls.__module__}.{cls.__qualname__}": count for cls, count in counts.items()}
+
+
+def widget_count(widget):
+    return 1 + sum(widget_count(child) for child in widget.winfo_children())
+
+
+class LeakProfiler:
+    # Samples are kept as flat lists of str -> int dicts: the garbage collector does not track
+    # those, so the profiler's own bookkeeping never shows up as a growing class
+    def __init__(self, root=None, frames=1):
+        self.root = root                # Tk root whose widgets and Tcl commands are counted
+        self.frames = frames            # Traceback depth kept by tracemalloc
+        self.traced = []                # Per session: traced bytes
+        self.objects = []               # Per session: live objects per class
+        self.lines = []                 # Per session: bytes allocated per source line
+        self.tk = {"widgets": [], "tcl_commands": []}   # Per session: Tk counts
+        self.first_step = {}            # step -> (bytes, blocks per line) in the first session after warm-up
+        self.last_step = {}             # step -> the same, at the latest boundary
+        self.session = 0
+        # Our own files never count as leaks
+        self.filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                        tracemalloc.Filter(False, __file__)]
+
+    def start(self):
+        gc.collect()
+        tracemalloc.start(self.frames)
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def line_stats(self):
+        stats = tracemalloc.take_snapshot().filter_traces(self.filters).statistics("lineno")
+        return ({str(stat.traceback[0]): stat.size for stat in stats},
+                {str(stat.traceback[0]): stat.count for stat in stats})
+
+    def step_boundary(self, step):
+        # Called each time the wizard switches step
+        if self.session >= WARMUP:
+            stats = self.line_stats()
+            self.first_step.setdefault(step, stats)
+            self.last_step[step] = stats
+
+    def end_session(self):
+        # Called once per simulated session, after its last step
+        self.session += 1
+        gc.collect()   # Only objects that are really still reachable are counted
+        sizes, _ = self.line_stats()
+        self.traced.append(sum(sizes.values()))
+        self.lines.append(sizes)
+        self.objects.append(class_counts())
+        if self.root is not None:
+            self.tk["widgets"].append(widget_count(self.root))
+            self.tk["tcl_commands"].append(len(self.root.tk.call("info", "commands")))
+
+    # -------------------- Analysis --------------------
+    def growth(self):
+        """Return [(kind, name, per-session slope, r², first, last)] for linearly growing series."""
+        if self.session - WARMUP < 3:
+            return []
+        flagged = []
+
+        def check(kind, name, values, minimum):
+            slope, r2 = fit_line(values)
+            if slope >= minimum and r2 >= MIN_R2:
+                flagged.append((kind, name, slope, r2, values[0], values[-1]))
+
+        for name, values in self.tk.items():
+            if values:
+                check("tk", name, values[WARMUP:], MIN_WIDGETS)
+        for kind, series, minimum in (("objects", self.objects, MIN_OBJECTS), ("memory", self.lines, MIN_BYTES)):
+            series = series[WARMUP:]
+            for name in set().union(*series):
+                check(kind, name, [sample.get(name, 0) for sample in series], minimum)
+        flagged.sort(key=lambda row: (row[0], -row[2]))
+        return flagged
+
+    def step_growth(self, step, top=10):
+        # [(line, bytes, blocks)] that grew most at this step between the first and last session
+        (first_size, first_count), (last_size, last_count) = self.first_step[step], self.last_step[step]
+        grown = [(line, size - first_size.get(line, 0), last_count[line] - first_count.get(line, 0))
+                 for line, size in last_size.items() if size > first_size.get(line, 0)]
+        grown.sort(key=lambda row: -row[1])
+        return grown[:top]
+
+    def report(self, top=10):
+        lines = [f"Leak check: {self.session} sessions (first {WARMUP} ignored as warm-up)", ""]
+        if self.session > WARMUP:
+            traced = self.traced[WARMUP:]
+            slope, r2 = fit_line(traced)
+            lines.append(f"Traced memory: {traced[0] / 1024:,.0f} KiB -> {traced[-1] / 1024:,.0f} KiB "
+                         f"({slope:+,.0f} B/session, r² {r2:.2f})")
+            for name, values in self.tk.items():
+                if values:
+                    lines.append(f"Tk {name.replace('_', ' ')}: {values[WARMUP]} -> {values[-1]}")
+        lines.append("")
+
+        flagged = self.growth()
+        if flagged:
+            lines.append("Growing linearly with the session count:")
+            units = {"memory": " B"}
+            for kind, name, slope, r2, first, last in flagged:
+                lines.append(f"  [{kind:7s}] {name:60s} {slope:+10,.1f}{units.get(kind, '')}/session "
+                             f"(r² {r2:.2f}, {first:,} -> {last:,})")
+        else:
+            lines.append("Nothing grows linearly with the session count.")
+        lines.append("")
+
+        lines.append(f"Largest growth per step (first session after warm-up vs last, top {top}):")
+        for step in self.last_step:
+            grown = self.step_growth(step, top)
+            lines.append(f"  {step}:")
+            if not grown:
+                lines.append("    (none)")
+            for line, size, blocks in grown:
+                lines.append(f"    {line:60s} {size:+10,} B  {blocks:+6,} blocks")
+        return "\n".join(lines) + "\n"
+
+
+# -------------------- Driving the wizard --------------------
+def run_session(app, n, patients=5):
+    # One complete patient: intro -> info -> pain -> body area -> final recommendations.
+    # A small pool of patients is reused so per-patient history (trends, names) stops growing.
+    play(app, {"name": f"Student {n % patients}", "year": f"Yr{9 + n % patients}", "pain": n % 11,
+               "areas": ["Knee", "Back"] if n % 2 == 0 else ["Knee"], "activity": "Sports Player"})
+    app.root.update()
+
+
+def run(sessions=50, report_path=None):
+    """Run the wizard for that many sessions under the profiler and return the leak report."""
+    with tempfile.TemporaryDirectory() as folder:
+        app = scratch_app(folder)
+        profiler = LeakProfiler(app.root)
+        show_step = app.show_step
+
+        def show_step_and_sample(step):
+            show_step(step)
+            profiler.step_boundary(step)
+
+        app.show_step = show_step_and_sample
+        profiler.start()
+        try:
+            for n in range(sessions):
+                run_session(app, n)
+                profiler.end_session()
+        finally:
+            profiler.stop()
+            close_app(app)
+
+    text = profiler.report()
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as file:
+            file.write(text)
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab leakcheck", description="Look for memory growing per session.")
+    parser.add_argument("--sessions", type=int, default=50, help="simulated sessions to run")
+    parser.add_argument("--report", default="leak_report.txt", help="where to write the report")
+    args = parser.parse_args(argv)
+    print(run(args.sessions, args.report), end="")
+    print(f"Report written to {args.report}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
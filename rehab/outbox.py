@@ -0,0 +1,329 @@
+# -------------------- SESSION OUTBOX --------------------
+# Offline-first upload of completed sessions to a central clinic server. Each session is
+# committed to a local SQLite outbox (Desktop/rehab_outbox.db) the moment it completes, with
+# its own idempotency key, so nothing is lost while the network is down or the kiosk restarts.
+# A background uploader sends the oldest sessions in gzip-compressed JSON batches:
+#   POST <url>  {"kiosk": "...", "sessions": [{"key": "...", "name": ..., ...}, ...]}
+# and deletes them once the server answers 2xx. The server must ignore keys it has already
+# stored, so a batch that was saved but whose reply was lost can simply be sent again.
+#   - network errors, timeouts, 408, 429 and 5xx: retry with jittered exponential backoff,
+#     honouring Retry-After
+#   - 400, 413 and 422 (the payload itself is refused): the batch is halved until the offending
+#     session is sent alone, which is then set aside as rejected instead of blocking the queue
+#   - 401, 403, 404 and any other 4xx: the URL or the kiosk's access is wrong, not the sessions;
+#     back off like a server error and keep the whole queue until someone fixes it
+#   - batch size follows the measured throughput, aiming for uploads of TARGET_SECONDS
+# Rejected sessions stay in the outbox; --requeue-rejected queues them again (e.g. after a
+# server fix).
+# Usage: python -m rehab sync [--url URL] [--db rehab_outbox.db] [--once | --status] [--requeue-rejected]
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+URL_VARIABLE = "REHAB_SYNC_URL"   # Where the GUI's uploader sends sessions; unset means queue only
+MIN_BATCH = 1
+MAX_BATCH = 5000
+FIRST_BATCH = 50
+TARGET_SECONDS = 1.0      # Batch size is chosen so one upload takes about this long
+BASE_DELAY = 0.5          # First retry delay (seconds); doubles with each failure in a row
+MAX_DELAY = 300.0
+IDLE_POLL = 30.0          # An idle uploader looks for sessions this often even if nobody wakes it
+TIMEOUT = 15.0
+MAX_KEPT_ERRORS = 100     # Only this many upload errors are kept for the status; the rest are counted
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+BISECT_STATUSES = {400, 413, 422}   # Refusals of the payload; every other 4xx is a configuration error
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id        INTEGER PRIMARY KEY,
+    key       TEXT NOT NULL UNIQUE,       -- Idempotency key
+    body      TEXT NOT NULL,              -- The session as JSON, key included
+    queued    INTEGER NOT NULL,           -- Epoch seconds
+    rejected  TEXT                        -- Why the server refused it; NULL while queued
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_rejected ON outbox (rejected) WHERE rejected IS NOT NULL;
+"""
+
+
+def default_path():
+    # Next to the session history on the Desktop
+    return os.path.join(os.path.expanduser("~"), "Desktop", "rehab_outbox.db")
+
+
+class Outbox:
+    # Thread-safe: the GUI queues sessions while the uploader thread takes them out
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")    # A queued session survives a power cut
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def put(self, session):
+        """Queue one session (a JSON-able dict); returns its idempotency key.
+
+        A session that brings its own "key" is queued at most once under that key.
+        """
+        return self.put_many([session])[0]
+
+    def put_many(self, sessions):
+        rows, keys, now = [], [], int(time.time())
+        for session in sessions:
+            key = session.get("key") or uuid.uuid4().hex
+            keys.append(key)
+            rows.append((key, json.dumps(dict(session, key=key), separators=(",", ":")), now))
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO outbox (key, body, queued) VALUES (?, ?, ?)", rows)
+        return keys
+
+    def peek(self, limit):
+        # The oldest queued sessions: [(id, key, body)]
+        with self.lock:
+            return self.conn.execute("SELECT id, key, body FROM outbox WHERE rejected IS NULL ORDER BY id LIMIT ?",
+                                     (limit,)).fetchall()
+
+    def remove(self, ids):
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM outbox WHERE id = ?", ((i,) for i in ids))
+
+    def reject(self, ids, reason):
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE outbox SET rejected = ? WHERE id = ?", ((reason, i) for i in ids))
+
+    def requeue_rejected(self):
+        """Queue every rejected session again; returns how many there were."""
+        with self.lock, self.conn:
+            return self.conn.execute("UPDATE outbox SET rejected = NULL WHERE rejected IS NOT NULL").rowcount
+
+    def counts(self):
+        """(queued, rejected) session counts."""
+        with self.lock:
+            queued, rejected = self.conn.execute(
+                "SELECT COUNT(*) - COUNT(rejected), COUNT(rejected) FROM outbox").fetchone()
+        return queued, rejected
+
+    def __len__(self):
+        return self.counts()[0]
+
+
+class UploadError(Exception):
+    def __init__(self, message, retry=True, status=None, retry_after=None):
+        super().__init__(message)
+        self.retry = retry                # False: the server refused this batch's payload (BISECT_STATUSES)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def post_batch(url, keys, bodies, kiosk, timeout=TIMEOUT):
+    """Send one batch of session JSON texts; raises UploadError unless the server answers 2xx."""
+    payload = ('{"kiosk":' + json.dumps(kiosk) + ',"sessions":[' + ",".join(bodies) + "]}").encode("utf-8")
+    # Also identifies the batch as a whole, for servers that deduplicate whole requests
+    batch_key = hashlib.sha256("".join(keys).encode()).hexdigest()[:32]
+    request = urllib.request.Request(url, data=gzip.compress(payload, 6), method="POST", headers={
+        "Content-Type": "application/json", "Content-Encoding": "gzip", "Idempotency-Key": batch_key})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        retry_after = e.headers.get("Retry-After") if e.headers else None
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:                # An HTTP date; the backoff delay is used instead
+            retry_after = None
+        raise UploadError(f"HTTP {e.code} {e.reason}", retry=e.code not in BISECT_STATUSES,
+                          status=e.code, retry_after=retry_after) from None
+    except (urllib.error.URLError, OSError) as e:   # Refused, reset, DNS, timeout
+        raise UploadError(str(getattr(e, "reason", e))) from None
+
+
+class Uploader:
+    # Drains an Outbox to url, on a background thread (start/stop) or one step at a time (step)
+    def __init__(self, outbox, url, batch_size=FIRST_BATCH, target_seconds=TARGET_SECONDS,
+                 base_delay=BASE_DELAY, max_delay=MAX_DELAY, timeout=TIMEOUT, kiosk=None):
+        self.outbox = outbox
+        self.url = url
+        self.batch_size = batch_size
+        self.target_seconds = target_seconds
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.kiosk = kiosk or socket.gethostname()
+        self.rate = None          # Smoothed sessions/second of successful uploads
+        self.failures = 0         # Failed attempts in a row (sets the backoff delay)
+        self.delay = 0.0          # Wait before the next attempt
+        self.sent = 0
+        self.batches = 0
+        self.error_count = 0
+        self.errors = []          # The first MAX_KEPT_ERRORS (time, message)
+        self.last_error = None    # UploadError of the last failed attempt, None after a delivery
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    # -------------------- One attempt --------------------
+    def step(self):
+        """Send the next batch; returns how many sessions were delivered (0 if none or on failure)."""
+        rows = self.outbox.peek(self.batch_size)
+        if not rows:
+            return 0
+        start = time.perf_counter()
+        try:
+            post_batch(self.url, [key for _, key, _ in rows], [body for _, _, body in rows], self.kiosk, self.timeout)
+        except UploadError as e:
+            self._failed(rows, e)
+            return 0
+        elapsed = time.perf_counter() - start
+        self.outbox.remove([i for i, _, _ in rows])
+        self.sent += len(rows)
+        self.batches += 1
+        self.failures = 0
+        self.delay = 0.0
+        self.last_error = None
+        self._resize(len(rows), elapsed)
+        return len(rows)
+
+    def _resize(self, count, elapsed):
+        # Aim for uploads of target_seconds at the measured rate; at most double or halve per batch
+        if count < self.batch_size:       # The queue ran short; says nothing about the link
+            return
+        sample = count / max(elapsed, 1e-6)
+        self.rate = sample if self.rate is None else 0.7 * self.rate + 0.3 * sample
+        wanted = int(self.rate * self.target_seconds)
+        self.batch_size = max(MIN_BATCH, min(MAX_BATCH, self.batch_size * 2, max(self.batch_size // 2, wanted)))
+
+    def _failed(self, rows, error):
+        self.error_count += 1
+        self.last_error = error
+        if len(self.errors) < MAX_KEPT_ERRORS:
+            self.errors.append((time.time(), str(error)))
+        if not error.retry:
+            if len(rows) == 1:            # The session itself is refused: set it aside, carry on
+                self.outbox.reject([rows[0][0]], str(error))
+            else:                         # Find the session the server refused by halving the batch
+                self.batch_size = max(MIN_BATCH, len(rows) // 2)
+            return
+        # The network or server is in trouble, or the kiosk is misconfigured (see config_error):
+        # back off, and send less once it recovers
+        self.failures += 1
+        self.batch_size = max(MIN_BATCH, self.batch_size // 2)
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        self.delay = random.uniform(delay / 2, delay)   # Jitter, so kiosks do not retry in step
+        if error.retry_after is not None:
+            self.delay = max(self.delay, min(self.max_delay, error.retry_after))
+
+    @property
+    def config_error(self):
+        """True while the last attempt got a 4xx that no retry will fix (wrong URL or access)."""
+        error = self.last_error
+        return error is not None and error.status is not None and 400 <= error.status < 500 \
+            and error.status not in RETRY_STATUSES and error.status not in BISECT_STATUSES
+
+    # -------------------- Background thread --------------------
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="rehab-outbox", daemon=True)
+        self.thread.start()
+
+    def wake(self):
+        # New sessions were queued: send now instead of at the next poll (ignored while backing off)
+        self.wakeup.set()
+
+    def run(self):
+        while not self.stopping.is_set():
+            errors = self.error_count
+            delivered = self.step()
+            if not self.delay and (delivered or self.error_count != errors):
+                continue                  # Keep draining; a refused batch is retried at once, halved or set aside
+            self.wakeup.clear()
+            if self.delay:
+                self.stopping.wait(self.delay)
+            else:
+                self.wakeup.wait(IDLE_POLL)
+
+    def stop(self, timeout=None):
+        self.stopping.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def drain(self, deadline=None):
+        """Send until the outbox is empty (retrying as needed) or the deadline (monotonic seconds) passes.
+
+        Stops early on a configuration error (see config_error), which waiting cannot fix.
+        """
+        while len(self.outbox):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self.step()
+            if self.config_error:
+                return False
+            if self.delay:
+                time.sleep(self.delay if deadline is None else
+                           max(0.0, min(self.delay, deadline - time.monotonic())))
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab sync", description="Upload queued sessions to the clinic server.")
+    parser.add_argument("--url", default=os.environ.get(URL_VARIABLE),
+                        help=f"server endpoint (default: ${URL_VARIABLE})")
+    parser.add_argument("--db", help="outbox to drain (default: the one on the Desktop)")
+    parser.add_argument("--once", action="store_true", help="send one batch and stop")
+    parser.add_argument("--status", action="store_true", help="only show what is queued")
+    parser.add_argument("--requeue-rejected", action="store_true",
+                        help="queue the sessions the server rejected again before sending")
+    args = parser.parse_args(argv)
+
+    with Outbox(args.db) as outbox:
+        if args.requeue_rejected:
+            print(f"{outbox.requeue_rejected():,} rejected sessions queued again")
+        queued, rejected = outbox.counts()
+        print(f"{queued:,} sessions queued, {rejected:,} rejected by the server")
+        if args.status or (args.requeue_rejected and not args.url):
+            return 0
+        if not args.url:
+            print(f"rehab sync: no server; pass --url or set {URL_VARIABLE}", file=sys.stderr)
+            return 2
+        uploader = Uploader(outbox, args.url)
+        try:
+            if args.once:
+                uploader.step()
+            else:
+                uploader.drain()
+        except KeyboardInterrupt:
+            pass
+        left = len(outbox)
+        print(f"sent {uploader.sent:,} in {uploader.batches:,} batches, {left:,} left")
+        if uploader.config_error:
+            print(f"rehab sync: {uploader.last_error}; check the URL and the kiosk's access to the server",
+                  file=sys.stderr)
+        for _, message in uploader.errors[:10]:
+            print(f"  {message}")
+    return 1 if left else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
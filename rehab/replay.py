@@ -0,0 +1,264 @@
+# -------------------- WIZARD REPLAY --------------------
+# Drives RehabApp through sessions without anyone clicking: each session is a record with
+# the inputs a user would give (name, year, pain, ticked areas, activity), either recorded
+# (the shared .wal session log or a JSON-lines file) or generated. Invalid records go down
+# the same messagebox.showerror paths as a real user; the dialogs are stubbed out and
+# checked against the error the record should have caused.
+# Reports sessions per second and the time taken by every step, for catching GUI throughput
+# regressions in CI. Needs a display: runs under xvfb-run, or pass --xvfb to start Xvfb.
+# Usage: python -m rehab replay [sessions.wal | sessions.jsonl] [--sessions 5000] [--min-rate 200]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+
+from rehab.areas import from_mask
+from rehab.choices import ACTIVITIES, BODY_AREAS, YEAR_LEVELS
+
+# Timed actions of one session, in the order they happen; each submit_* includes the switch to the next step
+STEPS = ("intro", "user_info", "submit_user_info", "submit_pain", "submit_bodypart")
+
+# Error dialogs of the wizard, keyed by the input that is missing
+ERRORS = {
+    "name": "Please enter your name and select a year level.",
+    "year": "Please enter your name and select a year level.",
+    "areas": "Please select at least one body area.",
+    "activity": "Please select your activity type.",
+}
+
+
+# -------------------- Session records --------------------
+def area_names(areas):
+    # Records from the session log store the ticked areas as a bitmask
+    if isinstance(areas, int):
+        return from_mask(areas)
+    return list(areas or ())
+
+
+def expected_error(record):
+    # The dialog the wizard should show for this record (None for a complete one), in the order it validates
+    for field in ("name", "year", "areas", "activity"):
+        if not record.get(field):
+            return ERRORS[field]
+    return None
+
+
+def synthetic(count, invalid=0.05, patients=200, seed=0):
+    """Generate count session records; about the invalid fraction leave one required input out."""
+    import random
+    rng = random.Random(seed)
+    records = []
+    for n in range(count):
+        record = {"name": f"Student {rng.randrange(patients)}", "year": rng.choice(YEAR_LEVELS),
+                  "pain": rng.randint(0, 10), "areas": rng.sample(BODY_AREAS, rng.randint(1, 3)),
+                  "activity": rng.choice(ACTIVITIES)}
+        if rng.random() < invalid:
+            record[rng.choice(tuple(ERRORS))] = None
+        records.append(record)
+    return records
+
+
+def load(path):
+    """Read session records from a session log (.wal) or a JSON-lines file."""
+    if path.endswith(".wal"):
+        from rehab.wal import scan
+        with open(path, "rb") as file:   # Read directly: opening a WriteAheadLog would repair the file
+            return [json.loads(payload) for _, payload in scan(file.read())]
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+# -------------------- Driving the wizard --------------------
+class DialogRecorder:
+    # Stands in for tkinter.messagebox: remembers every dialog instead of blocking on it
+    def __init__(self):
+        self.shown = []   # (kind, title, message)
+
+    def _show(self, kind, title, message):
+        self.shown.append((kind, title, message))
+        return "ok"
+
+    def showerror(self, title=None, message=None, **options):
+        return self._show("error", title, message)
+
+    def showinfo(self, title=None, message=None, **options):
+        return self._show("info", title, message)
+
+    def showwarning(self, title=None, message=None, **options):
+        return self._show("warning", title, message)
+
+
+@contextmanager
+def stub_dialogs():
+    import rehab.gui as gui
+    saved, gui.messagebox = gui.messagebox, DialogRecorder()
+    try:
+        yield gui.messagebox
+    finally:
+        gui.messagebox = saved
+
+
+@contextmanager
+def virtual_display():
+    # Start Xvfb on a spare display number when there is no display to draw on
+    if os.environ.get("DISPLAY"):
+        yield
+        return
+    import shutil
+    import subprocess
+    if not shutil.which("Xvfb"):
+        raise SystemExit("No display: install Xvfb or run under xvfb-run")
+    number = 100 + os.getpid() % 400
+    server = subprocess.Popen(["Xvfb", f":{number}", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}") and time.monotonic() < deadline:
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{number}"
+    try:
+        yield
+    finally:
+        del os.environ["DISPLAY"]
+        server.terminate()
+        server.wait()
+
+
+def scratch_app(folder):
+    # A wizard whose session history goes to throwaway files instead of the kiosk's Desktop
+    from rehab.archive import ReportArchive
+    from rehab.gui import RehabApp
+    from rehab.journal import WizardJournal
+    from rehab.outbox import Outbox
+    from rehab.store import SessionStore
+    from rehab.wal import WriteAheadLog
+    return RehabApp(run=False, store=SessionStore(os.path.join(folder, "sessions.db")),
+                    history=WriteAheadLog(os.path.join(folder, "sessions.wal"), sync=False),
+                    archive=ReportArchive(os.path.join(folder, "archive")),
+                    outbox=Outbox(os.path.join(folder, "outbox.db")),
+                    journal=WizardJournal(os.path.join(folder, "wizard.journal"), sync=False))
+
+
+def close_app(app):
+    app.writer.close()
+    app.root.destroy()
+    app.store.close()
+    app.history.close()
+    app.archive.close()
+    app.close_outbox()
+    app.journal.close()
+
+
+def play(app, record, timings=None):
+    """Enter one session into the wizard; returns True if it reached the final screen."""
+    def step(name, action):
+        if timings is None:
+            action()
+            return
+        start = time.perf_counter_ns()
+        action()
+        app.root.update_idletasks()   # Include the layout and redraw of the new frame
+        timings[name].append(time.perf_counter_ns() - start)
+
+    step("intro", app.launch_intro_window)
+    step("user_info", app.launch_user_info)
+    app.name_entry.insert(0, record.get("name") or "")
+    app.year_dropdown.set(record.get("year") or "Select Year")
+    step("submit_user_info", app.submit_user_info)
+    if app.current_step != "pain":
+        return False
+    app.pain_var.set(record.get("pain") or 0)
+    step("submit_pain", app.submit_pain)
+    for area in area_names(record.get("areas")):
+        app.body_areas[area].set(True)
+    app.activity_dropdown.set(record.get("activity") or "Select Activity")
+    step("submit_bodypart", app.submit_bodypart)
+    return app.current_step == "final"
+
+
+def replay(records, warmup=20):
+    """Play every record back to back and return throughput, step timings and dialog checks."""
+    timings = {name: [] for name in STEPS}
+    completed = mismatched = 0
+    with tempfile.TemporaryDirectory() as folder, stub_dialogs() as dialogs:
+        app = scratch_app(folder)
+        try:
+            for record in records[:warmup]:   # Fonts, Tcl caches and SQLite settle before timing starts
+                play(app, record)
+            app.root.update()
+            dialogs.shown.clear()
+            began = time.perf_counter()
+            for n, record in enumerate(records):
+                shown = len(dialogs.shown)
+                completed += play(app, record, timings)
+                errors = [message for kind, _, message in dialogs.shown[shown:] if kind == "error"]
+                expected = expected_error(record)
+                if errors != ([expected] if expected else []):
+                    mismatched += 1
+                if n % 100 == 99:
+                    app.root.update()         # Let Tk handle its queued events, as the mainloop would
+            elapsed = time.perf_counter() - began
+        finally:
+            close_app(app)
+
+    def summary(values):
+        values = sorted(values)
+        ms = lambda q: values[min(len(values) - 1, int(len(values) * q))] / 1e6
+        return {"count": len(values), "p50_ms": ms(0.5), "p95_ms": ms(0.95), "p99_ms": ms(0.99),
+                "max_ms": values[-1] / 1e6} if values else {"count": 0}
+
+    return {"sessions": len(records), "completed": completed, "rejected": len(records) - completed,
+            "dialog_mismatches": mismatched, "seconds": elapsed,
+            "sessions_per_second": len(records) / elapsed if elapsed else 0.0,
+            "steps": {name: summary(values) for name, values in timings.items()}}
+
+
+def format_summary(result):
+    lines = [f"{result['sessions']:,} sessions in {result['seconds']:.2f} s: "
+             f"{result['sessions_per_second']:,.0f} sessions/s",
+             f"completed {result['completed']:,}, rejected {result['rejected']:,}, "
+             f"unexpected dialogs {result['dialog_mismatches']:,}",
+             f"{'step':18s} {'count':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}"]
+    for name, s in result["steps"].items():
+        if s["count"]:
+            lines.append(f"{name:18s} {s['count']:7,} {s['p50_ms']:8.3f} {s['p95_ms']:8.3f} "
+                         f"{s['p99_ms']:8.3f} {s['max_ms']:8.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab replay", description="Replay sessions through the wizard.")
+    parser.add_argument("input", nargs="?", help="session log (.wal) or JSON lines to replay (default: generated)")
+    parser.add_argument("--sessions", type=int, default=2000, help="sessions to play (recorded ones are repeated or cut to this)")
+    parser.add_argument("--invalid", type=float, default=0.05, help="fraction of generated sessions missing an input")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=20, help="untimed sessions played first")
+    parser.add_argument("--min-rate", type=float, help="exit with status 1 below this many sessions/s")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--xvfb", action="store_true", help="start Xvfb if there is no display")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        records = load(args.input)
+        if not records:
+            parser.error(f"no sessions in {args.input}")
+        records = (records * (args.sessions // len(records) + 1))[:args.sessions]
+    else:
+        records = synthetic(args.sessions, args.invalid, seed=args.seed)
+
+    with virtual_display() if args.xvfb else nullcontext():
+        result = replay(records, args.warmup)
+    print(json.dumps(result, indent=2) if args.json else format_summary(result))
+
+    if result["dialog_mismatches"]:
+        return 1
+    if args.min_rate is not None and result["sessions_per_second"] < args.min_rate:
+        print(f"below the minimum of {args.min_rate:,.0f} sessions/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
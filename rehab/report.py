@@ -0,0 +1,217 @@
+# -------------------- REPORT FORMATTING --------------------
+# Text layout of the saved rehab report (the file written by "Save Report").
+# The layout is compiled once; the advice part of a report is cached per
+# (status, area label, activity) as constant text, and only the patient's name, year,
+# pain and quote are spliced in between.
+from collections import namedtuple
+from operator import itemgetter
+from string import Formatter
+
+# Positive reinforcement messages; one is picked at random for each report
+MOTIVATIONAL_QUOTES = [
+    "Small steps each day lead to big progress.",
+    "Listen to your body — recovery takes time.",
+    "Stay positive, healing is a journey.",
+    "Consistency matters more than intensity.",
+    "Every bit of effort helps!"
+]
+
+
+def report_path(filename="rehab_report.txt"):
+    # Reports are saved on the user's Desktop
+    import os
+    return os.path.join(os.path.expanduser("~"), "Desktop", filename)
+
+
+def session_report_name(name, year, when=None):
+    """File name for one session's report, so kiosks sharing a Desktop never overwrite each other."""
+    import re
+    import socket
+    import time
+    safe = re.sub(r"[^A-Za-z0-9_-]+", "_", f"{name}_{year}").strip("_") or "student"
+    kiosk = re.sub(r"[^A-Za-z0-9_-]+", "_", socket.gethostname()) or "kiosk"
+    return f"rehab_report_{safe}_{time.strftime('%Y%m%d-%H%M%S', time.localtime(when))}_{kiosk}.txt"
+
+
+# -------------------- Report template --------------------
+# Lines that only use these fields are the same for every patient with the same
+# (status, area label, activity), so they are rendered once and cached
+RULE = "-" * 40
+REPORT_LAYOUT = (
+    "Rehab Report for {name} ({year})\n"
+    + RULE + "\n"
+    "Pain Level: {pain} ({status})\n"
+    "Affected Area(s): {area}\n"
+    "Activity Type: {activity}\n\n"
+    "Recommended Exercises: {rec_exercise}\n"
+    "Diet Tips: {diet}\n"
+    "Recovery Advice: {tips}\n\n"
+    "Motivational Quote: {motivation}\n"
+    + RULE + "\n"
+)
+PATIENT_FIELDS = frozenset(("name", "year", "pain", "motivation"))   # Spliced in on every render
+KEY_FIELDS = ("status", "area", "activity")                          # Cache key
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def _getter(fields):
+    # itemgetter that always returns a tuple, even for one field or none
+    if not fields:
+        return lambda r: ()
+    if len(fields) == 1:
+        field = fields[0]
+        return lambda r: (r[field],)
+    return itemgetter(*fields)
+
+
+def _splice(pieces, values):
+    # Any number of slots: the constant pieces with the (already formatted) values in between
+    text = [pieces[0]]
+    for value, piece in zip(values, pieces[1:]):
+        text += (format(value), piece)
+    return "".join(text)
+
+
+def _renderer(template):
+    # render() for any layout: pieces from the cache, values formatted per slot
+    key, values, cache, miss = template.key, template.values, template.cache, template._pieces_for
+    format_values = template._format_values
+
+    def render(r):
+        k = key(r)
+        try:
+            pieces = cache[k]
+        except KeyError:
+            pieces = miss(k, r)
+        else:
+            template.hits += 1
+        return _splice(pieces, format_values(values(r)))
+    return render
+
+
+def _renderer4(template):
+    # render() for four plain {field} slots (REPORT_LAYOUT): the pieces and values are unpacked
+    # into one f-string, so a hit costs no more than the old per-report f-string
+    key, values, cache, miss = template.key, template.values, template.cache, template._pieces_for
+
+    def render(r):
+        k = key(r)
+        try:
+            c0, c1, c2, c3, c4 = cache[k]
+        except KeyError:
+            c0, c1, c2, c3, c4 = miss(k, r)
+        else:
+            template.hits += 1
+        v0, v1, v2, v3 = values(r)
+        return f"{c0}{v0}{c1}{v1}{c2}{v2}{c3}{v3}{c4}"
+    return render
+
+
+class ReportTemplate:
+    def __init__(self, layout=REPORT_LAYOUT, patient_fields=PATIENT_FIELDS, key_fields=KEY_FIELDS, maxsize=4096):
+        # Split the layout into runs of lines: per-patient segments (formatted every time) and
+        # shared segments (formatted once per cache key)
+        self.segments = []   # [is_patient, format string]
+        for line in layout.splitlines(keepends=True):
+            fields = {field for _, field, _, _ in Formatter().parse(line) if field}
+            is_patient = bool(fields & patient_fields)
+            if self.segments and self.segments[-1][0] == is_patient:
+                self.segments[-1][1] += line
+            else:
+                self.segments.append([is_patient, line])
+        shared = {field for _, text in self.segments
+                  for _, field, _, _ in Formatter().parse(text) if field and field not in patient_fields}
+        # The advice text is part of the key (it is what the key determines, and the rules can
+        # be hot-reloaded), so a hit never needs a second check
+        self.key_fields = tuple(key_fields) + tuple(sorted(shared - set(key_fields)))
+        self.key = _getter(self.key_fields)
+        self.maxsize = maxsize
+        self.cache = {}   # key -> constant text pieces (see _pieces_for), oldest first
+        self.hits = 0
+        self.misses = 0
+        self._compile(frozenset(patient_fields))
+
+    def _compile(self, patient_fields):
+        # Each patient segment is split at its patient fields: the slots (field, conversion, spec)
+        # are filled per patient; everything between two slots, shared segments and shared fields
+        # included, is one constant piece per key. Nothing is evaluated, only str.format fields are read
+        self.parts = []    # Format strings of the constant pieces, len(slots) + 1 of them
+        self.slots = []
+        text = ""
+        for is_patient, segment in self.segments:
+            if not is_patient:
+                text += segment
+                continue
+            for literal, field, spec, conversion in Formatter().parse(segment):
+                text += literal.replace("{", "{{").replace("}", "}}")
+                if field is None:
+                    continue
+                if field in patient_fields:
+                    self.parts.append(text)
+                    self.slots.append((field, conversion, spec))
+                    text = ""
+                else:
+                    text += "{" + field + ("!" + conversion if conversion else "") + (":" + spec if spec else "") + "}"
+        self.parts.append(text)
+        self.patient_fields = tuple(dict.fromkeys(field for field, _, _ in self.slots))
+        self.values = _getter([field for field, _, _ in self.slots])
+        # Plain {field} slots need no conversion; !r / :spec slots are formatted as str.format would
+        self.plain = all(conversion is None and not spec for _, conversion, spec in self.slots)
+        self.render = _renderer4(self) if self.plain and len(self.slots) == 4 else _renderer(self)
+        self.render.__doc__ = "Return the report text for r (a dict with the values shown on the final screen)."
+
+    def _format_values(self, values):
+        out = []
+        for value, (_, conversion, spec) in zip(values, self.slots):
+            if conversion:
+                value = {"r": repr, "s": str, "a": ascii}[conversion](value)
+            out.append(format(value, spec))
+        return out
+
+    def _pieces_for(self, key, r):
+        # The constant pieces for one key: the shared segments rendered once and kept as literal
+        # text, so a cache hit is one splice of the patient values
+        self.misses += 1
+        if len(self.cache) >= self.maxsize:
+            del self.cache[next(iter(self.cache))]   # Drop the oldest entry, as the re module's cache does
+        pieces = self.cache[key] = tuple(part.format_map(r) for part in self.parts)
+        return pieces
+
+    def render_columns(self, columns):
+        """Render many reports from parallel columns (field name -> sequence); returns a list."""
+        # Keys and patient values are zipped together in C; each distinct key is looked up once
+        keys = list(zip(*[columns[f] for f in self.key_fields]))
+        distinct = dict.fromkeys(keys)
+        misses = self.misses
+        for key in distinct:
+            pieces = self.cache.get(key)
+            distinct[key] = pieces if pieces is not None else self._pieces_for(key, dict(zip(self.key_fields, key)))
+        self.hits += len(keys) - (self.misses - misses)
+        rows = list(map(distinct.__getitem__, keys))
+        if not self.plain:
+            return list(map(_splice, rows, map(self._format_values, zip(*[columns[f] for f, _, _ in self.slots]))))
+        # Plain slots: every column is turned to text and the reports joined, all without a
+        # Python-level call per report
+        texts = [map(itemgetter(0), rows)]
+        for i, (field, _, _) in enumerate(self.slots, 1):
+            texts += (map(format, columns[field]), map(itemgetter(i), rows))
+        return list(map("".join, zip(*texts)))
+
+    def render_segments(self, r):
+        """Return the report for r as [(is_patient, text)] runs in layout order (see rehab/archive.py)."""
+        return [(is_patient, text.format_map(r)) for is_patient, text in self.segments]
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.cache))
+
+    def cache_clear(self):
+        self.cache.clear()
+        self.hits = self.misses = 0
+
+
+report_template = ReportTemplate()
+
+
+# Return the report text for one patient; r holds the values shown on the final screen
+format_report = report_template.render
@@ -0,0 +1,131 @@
+# -------------------- RECOMMENDATION RULES --------------------
+# Pain thresholds and advice text live in rehab/data/rules.json, keyed on pain band,
+# body area and activity. At load time the rules are compiled into a dense table so a
+# lookup is one list index, and the file is re-read when its modification time changes.
+import json
+import os
+import sys
+import time
+
+from rehab.choices import ACTIVITIES, BODY_AREAS, PAIN_MAX, PAIN_MIN
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "rules.json")
+FIELDS = ("exercise", "diet", "tips")   # Advice fields a rule may set
+INVALID_BAND = 255                      # Band code for bytes outside the pain scale
+
+# Area/activity slots in the table; the extra last slot means "not one of the listed options"
+N_AREAS = len(BODY_AREAS) + 1
+N_ACTIVITIES = len(ACTIVITIES) + 1
+AREA_INDEX = {area: i for i, area in enumerate(BODY_AREAS)}
+ACTIVITY_INDEX = {activity: i for i, activity in enumerate(ACTIVITIES)}
+
+
+class RuleTable:
+    # Compiled form of one rules file
+    def __init__(self, spec):
+        bands = spec["bands"]
+        self.statuses = tuple(b["status"] for b in bands)
+        self.colors = tuple(b.get("color", "white") for b in bands)
+        band_of = {status: i for i, status in enumerate(self.statuses)}
+
+        # 256-entry bytes.translate table: pain byte -> band code (thresholds come from the file)
+        table = bytearray([INVALID_BAND]) * 256
+        low = PAIN_MIN
+        for i, band in enumerate(bands):
+            for pain in range(low, min(band["max_pain"], PAIN_MAX) + 1):
+                table[pain] = i
+            low = band["max_pain"] + 1
+        if INVALID_BAND in table[PAIN_MIN:PAIN_MAX + 1]:
+            raise ValueError("rule bands do not cover the whole pain scale")
+        self.band_table = bytes(table)
+
+        # Resolve every (band, area, activity) cell once. More specific rules win field by field:
+        # band only < band + activity < band + area < band + area + activity
+        cells = [dict() for _ in range(len(bands) * N_AREAS * N_ACTIVITIES)]
+        rules = sorted(spec["rules"], key=lambda r: ("area" in r) * 2 + ("activity" in r))
+        for rule in rules:
+            band = band_of[rule["band"]]
+            areas = [AREA_INDEX[rule["area"]]] if "area" in rule else range(N_AREAS)
+            activities = [ACTIVITY_INDEX[rule["activity"]]] if "activity" in rule else range(N_ACTIVITIES)
+            values = {field: rule[field] for field in FIELDS if field in rule}
+            for a in areas:
+                for c in activities:
+                    cells[(band * N_AREAS + a) * N_ACTIVITIES + c].update(values)
+
+        # Dense table of (status, exercise template, diet, tips, color) tuples
+        self.table = []
+        for index, cell in enumerate(cells):
+            band = index // (N_AREAS * N_ACTIVITIES)
+            missing = [field for field in FIELDS if field not in cell]
+            if missing:
+                raise ValueError(f"no {', '.join(missing)} rule for band {self.statuses[band]!r}")
+            self.table.append((self.statuses[band], cell["exercise"], cell["diet"], cell["tips"],
+                               self.colors[band]))
+
+        # Exercise templates are filled in with the body area at lookup time; a typo such as
+        # {areaa} is rejected here instead of failing for some patients later
+        for template in {row[1] for row in self.table}:
+            try:
+                template.format(area="knee")
+            except (AttributeError, KeyError, IndexError, ValueError) as e:
+                raise ValueError(f"bad exercise template {template!r}: {e!r}") from None
+
+    def band(self, pain):
+        code = self.band_table[pain] if PAIN_MIN <= pain <= PAIN_MAX else INVALID_BAND
+        if code == INVALID_BAND:
+            raise ValueError(f"Pain level must be a number from {PAIN_MIN}–{PAIN_MAX}, got {pain!r}.")
+        return code
+
+    def lookup(self, band, area=None, activity=None):
+        """Return (status, exercise template, diet, tips, color) for one combination."""
+        return self.table[(band * N_AREAS + AREA_INDEX.get(area, N_AREAS - 1)) * N_ACTIVITIES
+                          + ACTIVITY_INDEX.get(activity, N_ACTIVITIES - 1)]
+
+
+class RuleBook:
+    # Keeps the compiled table for a rules file and recompiles it when the file changes
+    def __init__(self, path=DEFAULT_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval   # Seconds between mtime checks (0 = check every call)
+        self.mtime = None
+        self.next_check = 0.0
+        self.table = None
+        self.version = 0                       # Increases each time a new table is loaded
+        self.reload()
+
+    def reload(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, encoding="utf-8") as file:
+            table = RuleTable(json.load(file))
+        self.table, self.mtime = table, mtime
+        self.version += 1
+
+    def current(self):
+        """Return the compiled table, reloading it first if the file was edited."""
+        now = time.monotonic()
+        if now >= self.next_check:
+            self.next_check = now + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                print(f"rehab: keeping previous rules, cannot read {self.path}: {e}", file=sys.stderr)
+                return self.table
+            if mtime != self.mtime:
+                try:
+                    self.reload()
+                except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                    # A half-saved or broken edit keeps the last good rules; retry after the next edit
+                    self.mtime = mtime
+                    print(f"rehab: keeping previous rules, could not load {self.path}: {e}", file=sys.stderr)
+        return self.table
+
+
+_default = None
+
+
+def default_rules():
+    # Shared RuleBook for the packaged rules file
+    global _default
+    if _default is None:
+        _default = RuleBook()
+    return _default
@@ -0,0 +1,91 @@
+# -------------------- SAFE FILE WRITES --------------------
+# Helpers for files that several kiosks may write at the same time (e.g. a shared
+# network home directory): atomic replace-on-write and whole-file exclusive locks.
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl            # POSIX (Linux/macOS; also honoured on NFS)
+except ImportError:         # Windows
+    fcntl = None
+    import msvcrt
+
+# The process umask, read once (os.umask can only be read by setting it); new files get 0o666 & ~UMASK
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def fsync_dir(path):
+    # Make a rename durable: on POSIX the directory entry has to be flushed too
+    if os.name == "nt":
+        return
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data, binary=False, durable=True):
+    """Write data (str/bytes, or an iterable of chunks) to path so readers see the old or the new file, never a mix."""
+    folder = os.path.dirname(os.path.abspath(path))
+    # The temporary file sits next to the target so os.replace() is a same-filesystem rename
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb" if binary else "w") as file:
+            if isinstance(data, (str, bytes)):
+                file.write(data)
+            else:
+                for chunk in data:      # Large exports are streamed in chunks
+                    file.write(chunk)
+            file.flush()
+            if durable:
+                os.fsync(file.fileno())
+        # mkstemp creates the file as 0600; give it the mode the target has, or would get from open()
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)           # Atomic: concurrent writers each replace the whole file
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if durable:
+        fsync_dir(folder)
+
+
+# -------------------- Locks --------------------
+def lock(fd):
+    # Block until this process holds the exclusive lock on the open file
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)   # Retries for ~10 s, then raises
+            return
+        except OSError:
+            continue
+
+
+def unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return
+    os.lseek(fd, 0, os.SEEK_SET)
+    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def locked(fd):
+    lock(fd)
+    try:
+        yield fd
+    finally:
+        unlock(fd)
@@ -0,0 +1,275 @@
+# -------------------- RECOMMENDATION SERVICE --------------------
+# Small HTTP/JSON server (asyncio, standard library only) so tablets on the clinic LAN can
+# ask one process for recommendations instead of each running the Tk wizard.
+#   POST /recommend        {"pain": 6, "areas": ["Knee", "Back"], "activity": "Sports Player"}
+#   POST /recommend/batch  {"patients": [{...}, {...}]}
+#   GET  /health           counters (requests, rejected, batches, queue length)
+# Connections are kept alive (HTTP/1.1). Single requests from all connections are queued
+# and answered together by one recommend_batch() call. A semaphore bounds how many requests
+# are being handled at once; when the queue is full the server answers 503 with Retry-After.
+# Usage: python -m rehab serve [--host 0.0.0.0] [--port 8080]
+import argparse
+import asyncio
+import json
+import sys
+
+from rehab.areas import ALL_AREAS, label, to_mask
+from rehab.choices import ACTIVITIES, PAIN_MAX, PAIN_MIN
+from rehab.engine import recommend_batch
+
+MAX_HEADER = 16 * 1024      # Request line + headers
+MAX_BODY = 1024 * 1024      # JSON body
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+def parse_patient(data):
+    """Validate one patient object; returns (pain, area label, activity)."""
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    pain = data.get("pain", data.get("pain_level"))
+    if isinstance(pain, bool) or not isinstance(pain, int) or not PAIN_MIN <= pain <= PAIN_MAX:
+        raise ValueError(f"pain must be a whole number from {PAIN_MIN}–{PAIN_MAX}")
+    areas = data.get("areas", data.get("body_areas"))
+    if isinstance(areas, int) and not isinstance(areas, bool):
+        if not 0 < areas <= ALL_AREAS:
+            raise ValueError("areas bitmask is out of range")
+        mask = areas
+    elif isinstance(areas, str) or (isinstance(areas, list) and all(isinstance(a, str) for a in areas)):
+        mask = to_mask(areas)
+    else:
+        raise ValueError('areas must be a list of body areas or text like "Knee, Back"')
+    if not mask:
+        raise ValueError("at least one body area is required")
+    activity = data.get("activity")
+    if activity is not None and activity not in ACTIVITIES:
+        raise ValueError(f"activity must be one of {', '.join(ACTIVITIES)}")
+    return pain, label(mask), activity
+
+
+# -------------------- Request batching --------------------
+class Batcher:
+    # Collects single requests from every connection and answers them with one batch call
+    def __init__(self, max_batch=256, max_pending=4096):
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue(max_pending)   # (patient, future); full queue = overloaded
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, patient):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((patient, future))
+        except asyncio.QueueFull:
+            raise HTTPError(503, "server is busy, try again shortly", (("Retry-After", "1"),)) from None
+        return future
+
+    async def run(self):
+        while True:
+            items = [await self.queue.get()]
+            await asyncio.sleep(0)   # Let connections that are ready queue their requests too
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            try:
+                recs = recommend_batch(bytes(p[0] for p, _ in items), [p[1] for p, _ in items],
+                                       [p[2] for p, _ in items])
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for i, (_, future) in enumerate(items):
+                if not future.done():      # The client may have gone away
+                    future.set_result(recs[i])
+            self.batches += 1
+            self.items += len(items)
+
+
+# -------------------- Server --------------------
+class RecommendationService:
+    def __init__(self, host="127.0.0.1", port=8080, max_batch=256, max_pending=4096,
+                 max_concurrency=1024, idle_timeout=30.0, backlog=2048):
+        self.host = host
+        self.port = port
+        self.backlog = backlog                    # Listen queue; 1k tablets may connect at once
+        self.idle_timeout = idle_timeout          # Seconds a kept-alive connection may sit idle
+        self.batcher = Batcher(max_batch, max_pending)
+        self.limit = asyncio.Semaphore(max_concurrency)   # Requests being handled at once
+        self.server = None
+        self.batch_task = None
+        self.handlers = set()                     # Tasks serving open connections, cancelled by close()
+        self.connections = 0
+        self.requests = 0
+        self.rejected = 0
+
+    async def start(self):
+        self.batch_task = asyncio.create_task(self.batcher.run())
+        self.server = await asyncio.start_server(self.handle, self.host, self.port,
+                                                 backlog=self.backlog, limit=MAX_HEADER)
+        self.port = self.server.sockets[0].getsockname()[1]   # Real port when started with port 0
+        return self
+
+    async def close(self):
+        # Stop accepting, then cancel the open connections and the batcher and wait for them,
+        # so shutdown does not leave tasks to be destroyed (and logged) while still pending
+        self.server.close()
+        tasks = list(self.handlers) + [self.batch_task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def stats(self):
+        return {"status": "ok", "connections": self.connections, "requests": self.requests,
+                "rejected": self.rejected, "batches": self.batcher.batches, "batched": self.batcher.items,
+                "queued": self.batcher.queue.qsize()}
+
+    async def handle(self, reader, writer):
+        # One client connection: read requests until it closes, is idle too long or asks to close
+        self.connections += 1
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        loop = asyncio.get_running_loop()
+        try:
+            keep_alive = True
+            while keep_alive:
+                # Idle timer: a plain call_later is much cheaper per request than asyncio.wait_for
+                idle = loop.call_later(self.idle_timeout, writer.transport.abort)
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.respond(writer, 413, {"error": "headers too large"}, False)
+                    break
+                finally:
+                    idle.cancel()
+                self.requests += 1
+                try:
+                    method, path, keep_alive, length = parse_head(head)
+                    body = await reader.readexactly(length) if length else b""
+                except HTTPError as e:
+                    # Framing is unreliable after a malformed request, so the connection is closed
+                    await self.respond(writer, e.status, {"error": str(e)}, False)
+                    break
+                try:
+                    async with self.limit:
+                        status, payload, headers = 200, await self.route(method, path, body), ()
+                except HTTPError as e:
+                    status, payload, headers = e.status, {"error": str(e)}, e.headers
+                    if status == 503:
+                        self.rejected += 1
+                await self.respond(writer, status, payload, keep_alive, headers)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Shut down by close(); ending normally keeps asyncio's stream callback from logging it
+            pass
+        finally:
+            self.connections -= 1
+            self.handlers.discard(task)
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            return self.stats()
+        if path not in ("/recommend", "/recommend/batch"):
+            raise HTTPError(404, f"no such endpoint {path}")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON") from None
+        if path == "/recommend":
+            try:
+                patient = parse_patient(data)
+            except ValueError as e:
+                raise HTTPError(400, str(e)) from e
+            return await self.batcher.submit(patient)
+
+        # A client that already has a list of patients gets them answered in one call
+        patients = data.get("patients") if isinstance(data, dict) else None
+        if not isinstance(patients, list):
+            raise HTTPError(400, 'expected {"patients": [...]}')
+        parsed = []
+        for i, item in enumerate(patients):
+            try:
+                parsed.append(parse_patient(item))
+            except ValueError as e:
+                raise HTTPError(400, f"patient {i}: {e}") from e
+        recs = recommend_batch(bytes(p[0] for p in parsed), [p[1] for p in parsed], [p[2] for p in parsed])
+        return {"results": [recs[i] for i in range(len(recs))]}
+
+    async def respond(self, writer, status, payload, keep_alive, headers=()):
+        body = json.dumps(payload).encode()
+        head = [f"HTTP/1.1 {status} {REASONS[status]}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}"]
+        head.extend(f"{name}: {value}" for name, value in headers)
+        if not keep_alive:
+            head.append("Connection: close")
+        writer.write("\r\n".join(head).encode() + b"\r\n\r\n" + body)
+        await writer.drain()   # Backpressure: a slow reader holds up only its own connection
+
+
+def parse_head(head):
+    # Returns (method, path, keep_alive, content length) for one request
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+    if "transfer-encoding" in headers:
+        raise HTTPError(411, "chunked bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "bad Content-Length") from None
+    if not 0 <= length <= MAX_BODY:
+        raise HTTPError(413, f"body must be at most {MAX_BODY} bytes")
+    return method, path.split("?", 1)[0], keep_alive, length
+
+
+async def serve(host="127.0.0.1", port=8080, **options):
+    service = await RecommendationService(host, port, **options).start()
+    print(f"Serving recommendations on http://{service.host}:{service.port}", flush=True)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="rehab serve", description="Serve recommendations over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for the whole LAN)")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on (0 picks a free one)")
+    parser.add_argument("--max-batch", type=int, default=256, help="most requests answered by one batch call")
+    parser.add_argument("--max-pending", type=int, default=4096, help="queued requests before answering 503")
+    parser.add_argument("--max-concurrency", type=int, default=1024, help="requests handled at once")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, max_batch=args.max_batch, max_pending=args.max_pending,
+                          max_concurrency=args.max_concurrency))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# -------------------- COLUMNAR SESSION LOG --------------------
+# Stores sessions column by column in typed arrays instead of one Python object per
+# session. Users and exercises are interned: each column cell is a small integer id.
+from array import array
+
+from rehab.areas import MASK_TYPECODE, AreaBitmapIndex, from_mask, to_mask
+from rehab.dates import epoch_seconds, format_timestamp, timestamp_day
+
+
+class Interner:
+    # Maps values to small integer ids (and back); each distinct value is stored once
+    def __init__(self):
+        self.values = []      # id -> value
+        self.ids = {}         # key -> id
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value, key=None):
+        key = value if key is None else key
+        vid = self.ids.get(key)
+        if vid is None:
+            vid = self.ids[key] = len(self.values)
+            self.values.append(value)
+        return vid
+
+    def __getitem__(self, vid):
+        return self.values[vid]
+
+
+class SessionView:
+    # Lightweight stand-in for iteration 1's Session, reading one row of a SessionLog
+    __slots__ = ("log", "index")
+
+    def __init__(self, log, index):
+        self.log = log
+        self.index = index
+
+    @property
+    def date(self):
+        return self.log.time[self.index]      # Epoch seconds, like Session.date
+
+    @property
+    def day(self):
+        return timestamp_day(self.log.time[self.index])
+
+    @property
+    def exercise(self):
+        return self.log.exercises[self.log.exercise_id[self.index]]
+
+    @property
+    def pain_level(self):
+        return self.log.pain[self.index]
+
+    @property
+    def user(self):
+        return self.log.users[self.log.user_id[self.index]]
+
+    @property
+    def area_mask(self):
+        return self.log.areas[self.index]
+
+    @property
+    def body_areas(self):
+        return from_mask(self.log.areas[self.index])
+
+    def display_session(self):
+        # Displays key details of the session (same format as Session.display_session)
+        print(f"{format_timestamp(self.date)}: {self.exercise.name}, Pain Level: {self.pain_level}")
+
+
+class SessionLog:
+    def __init__(self):
+        # One typed array per field: 1 + 4 + 4 + 4 + 2 = 15 bytes per session
+        self.pain = array("B")          # Pain level 0–10 (uint8)
+        self.time = array("I")          # Epoch seconds (uint32, good until 2106)
+        self.exercise_id = array("I")   # Index into self.exercises
+        self.user_id = array("I")       # Index into self.users
+        self.areas = array(MASK_TYPECODE)   # Body area bitmask (see rehab/areas.py)
+        self.exercises = Interner()
+        self.users = Interner()
+        self.area_index = None          # AreaBitmapIndex, built on first use and kept up to date
+
+    def __len__(self):
+        return len(self.pain)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.pain)
+        if not 0 <= index < len(self.pain):
+            raise IndexError("session index out of range")
+        return SessionView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.pain)):
+            yield SessionView(self, index)
+
+    def add(self, user, date, exercise, pain_level, areas=0):
+        """Record one session; date may be epoch seconds, a datetime, a datetime.date or an ISO string."""
+        mask = to_mask(areas)
+        self.pain.append(pain_level)
+        self.time.append(epoch_seconds(date))
+        self.exercise_id.append(self.exercises.intern(exercise, getattr(exercise, "name", exercise)))
+        self.user_id.append(self.users.intern(user, getattr(user, "name", user)))
+        self.areas.append(mask)
+        if self.area_index is not None:
+            self.area_index.append(mask)
+
+    def append(self, session, user=None):
+        # List-compatible: accepts a Session object, so it can replace the plain session list
+        areas = getattr(session, "body_areas", None) or getattr(session.exercise, "target_area", None) or 0
+        self.add(user, session.date, session.exercise, session.pain_level, areas)
+
+    def bitmap_index(self):
+        # Per-area bitsets over every session, for multi-area AND/OR queries and counts
+        if self.area_index is None:
+            self.area_index = AreaBitmapIndex(self.areas)
+        return self.area_index
+
+    def nbytes(self):
+        # Memory used by the column arrays (excluding the interned users/exercises)
+        return sum(col.itemsize * len(col) for col in (self.pain, self.time, self.exercise_id, self.user_id, self.areas))
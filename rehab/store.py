@@ -0,0 +1,247 @@
+# -------------------- SESSION STORE --------------------
+# Embedded SQLite history of every completed session, replacing the single
+# overwritten rehab_report.txt as the record of what patients reported.
+import os
+import sqlite3
+from array import array
+
+from rehab.areas import MASK_TYPECODE, from_mask
+from rehab.choices import BODY_AREAS, PAIN_MAX
+from rehab.dates import day_to_date, epoch_day   # Dates are stored as days since 1970-01-01
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id    INTEGER PRIMARY KEY,
+    name  TEXT NOT NULL,
+    year  TEXT NOT NULL,
+    UNIQUE (name, year)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id        INTEGER PRIMARY KEY,
+    user_id   INTEGER NOT NULL REFERENCES users (id),
+    day       INTEGER NOT NULL,
+    pain      INTEGER NOT NULL,
+    areas     TEXT NOT NULL,
+    activity  TEXT
+);
+-- One row per (session, body area); the primary key doubles as the area/pain/date index
+CREATE TABLE IF NOT EXISTS session_areas (
+    area        INTEGER NOT NULL,
+    pain        INTEGER NOT NULL,
+    day         INTEGER NOT NULL,
+    session_id  INTEGER NOT NULL,
+    PRIMARY KEY (area, pain, day, session_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sessions_user_day ON sessions (user_id, day);
+CREATE INDEX IF NOT EXISTS idx_sessions_day ON sessions (day);
+CREATE INDEX IF NOT EXISTS idx_sessions_pain_day ON sessions (pain, day);
+"""
+
+
+MMAP_SIZE = 1 << 30   # Bytes of the database file SQLite may map (address space only, not memory)
+
+
+def default_path():
+    # Keep the history next to the saved report on the Desktop
+    return os.path.join(os.path.expanduser("~"), "Desktop", "rehab_sessions.db")
+
+
+class SessionStore:
+    def __init__(self, path=None, batch_size=1000):
+        self.path = path or default_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Kiosks sharing the file wait for each other's commits instead of failing at once. The
+        # wizard commits from its writer thread, so the connection may be used from a thread other
+        # than its creator's (one at a time)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")      # Readers are not blocked while a batch commits
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Result rows are found through session_areas and then fetched from sessions one by one, all
+        # over the file; reading those pages through a memory map instead of read() calls halves that
+        self.conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self.conn.executescript(SCHEMA)
+
+        self.batch_size = batch_size   # Buffered sessions are committed together once this many are queued
+        self.pending = []              # Sessions waiting for the next commit (ids are assigned then)
+        self.user_ids = {}             # (name, year) -> id, filled as students are written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------- Writing --------------------
+    def _user_id(self, cursor, name, year, new_users):
+        # Look up (or create) a student's id inside the commit; another kiosk may have added them already
+        key = (name, year)
+        uid = self.user_ids.get(key) or new_users.get(key)
+        if uid is None:
+            cursor.execute("INSERT OR IGNORE INTO users (name, year) VALUES (?, ?)", key)
+            uid = new_users[key] = cursor.execute("SELECT id FROM users WHERE name = ? AND year = ?",
+                                                  key).fetchone()[0]
+        return uid
+
+    def students(self):
+        # Every (name, year) in the history, e.g. to seed the name autocomplete
+        return self.conn.execute("SELECT name, year FROM users ORDER BY id").fetchall()
+
+    def user_names(self):
+        """{user id: (name, year)} for every student in the history."""
+        return {uid: (name, year) for uid, name, year in self.conn.execute("SELECT id, name, year FROM users")}
+
+    def add_session(self, name, year, pain, areas, activity=None, day=None):
+        """Queue one session; it is written with the next batched commit."""
+        if isinstance(areas, int):
+            areas = from_mask(areas)
+        elif isinstance(areas, str):
+            areas = [a.strip() for a in areas.split(",") if a.strip()]
+        day = epoch_day() if day is None else day
+        indexes = [BODY_AREAS.index(a) for a in areas]   # Unknown areas fail here, not in the commit
+        self.pending.append((name, year, day, pain, ", ".join(areas), activity, indexes))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Commit every queued session in a single transaction. SQLite assigns the ids, so kiosks
+        # sharing the file never hand out the same one.
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        new_users = {}
+        try:
+            with self.conn:
+                cursor = self.conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")   # Take the write lock now, not halfway through
+                area_rows = []
+                for name, year, day, pain, areas, activity, indexes in pending:
+                    uid = self._user_id(cursor, name, year, new_users)
+                    cursor.execute("INSERT INTO sessions (user_id, day, pain, areas, activity) VALUES (?, ?, ?, ?, ?)",
+                                   (uid, day, pain, areas, activity))
+                    sid = cursor.lastrowid
+                    area_rows += [(area, pain, day, sid) for area in indexes]
+                cursor.executemany("INSERT INTO session_areas VALUES (?, ?, ?, ?)", area_rows)
+        except sqlite3.OperationalError:
+            # Busy or locked past the timeout: nothing was written, so the sessions go in the next commit
+            self.pending = pending + self.pending
+            raise
+        # Any other error is about the sessions themselves and would fail again: they are dropped
+        self.user_ids.update(new_users)   # Only ids that were actually committed are cached
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def area_masks(self):
+        """Return (session ids, area bitmasks) for every session, in id order (see rehab/areas.py)."""
+        self.flush()
+        ids, masks = array("q"), array(MASK_TYPECODE)
+        for sid, mask in self.conn.execute(
+                "SELECT session_id, SUM(1 << area) FROM session_areas GROUP BY session_id ORDER BY session_id"):
+            ids.append(sid)
+            masks.append(mask)
+        return ids, masks
+
+    def iter_sessions(self, batch=10_000):
+        """Yield (user id, day, pain, areas text, activity) for every session in id order, batch rows at a time."""
+        self.flush()
+        cursor = self.conn.execute("SELECT user_id, day, pain, areas, activity FROM sessions ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield from rows
+
+    def pain_history(self, name, year):
+        """Return (days, pain levels) of one student's committed sessions, oldest first, for the pain chart."""
+        days, pain = array("i"), array("B")
+        for day, level in self.conn.execute(
+                "SELECT s.day, s.pain FROM users u JOIN sessions s ON s.user_id = u.id "
+                "WHERE u.name = ? AND u.year = ? ORDER BY s.day, s.id", (name, year)):
+            days.append(day)
+            pain.append(level)
+        return days, pain
+
+    # -------------------- Querying --------------------
+    def _area_filter(self, area, lo, hi, pain_filtered, start_day, end_day):
+        # Filter on the (area, pain, day) key; listing the pain values lets SQLite
+        # seek once per pain level instead of scanning every session for the area
+        sql = "area = ?"
+        params = [BODY_AREAS.index(area)]
+        if pain_filtered:
+            sql += f" AND pain IN ({', '.join('?' * (hi - lo + 1))})"
+            params += range(lo, hi + 1)
+        if start_day is not None:
+            sql += " AND day >= ?"
+            params.append(start_day)
+        if end_day is not None:
+            sql += " AND day <= ?"
+            params.append(end_day)
+        return sql, params
+
+    def _where(self, user, year, area, min_pain, max_pain, since_days, start_day, end_day, for_count=False):
+        # Build the FROM source and WHERE clause shared by query() and count()
+        self.flush()   # Read-your-writes: queued sessions are committed before searching
+        if since_days is not None:
+            start_day = epoch_day() - since_days
+        pain_filtered = min_pain is not None or max_pain is not None
+        lo = 0 if min_pain is None else min_pain
+        hi = PAIN_MAX if max_pain is None else max_pain
+
+        # Area-only counts never need the sessions table: count straight from the key
+        if for_count and area is not None and user is None and year is None:
+            sql, params = self._area_filter(area, lo, hi, pain_filtered, start_day, end_day)
+            return "session_areas", " WHERE " + sql, params
+
+        clauses, params = [], []
+        if area is not None:
+            sub, sub_params = self._area_filter(area, lo, hi, pain_filtered, start_day, end_day)
+            clauses.append(f"s.id IN (SELECT session_id FROM session_areas WHERE {sub})")
+            params += sub_params
+        else:
+            if pain_filtered:
+                clauses.append("s.pain BETWEEN ? AND ?")
+                params += [lo, hi]
+            if start_day is not None:
+                clauses.append("s.day >= ?")
+                params.append(start_day)
+            if end_day is not None:
+                clauses.append("s.day <= ?")
+                params.append(end_day)
+        if user is not None:
+            clauses.append("u.name = ?")
+            params.append(user)
+        if year is not None:
+            clauses.append("u.year = ?")
+            params.append(year)
+        source = "sessions s" if user is None and year is None else "sessions s JOIN users u ON u.id = s.user_id"
+        return source, (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query_rows(self, user=None, year=None, area=None, min_pain=None, max_pain=None,
+                   since_days=None, start_day=None, end_day=None, limit=None):
+        """Return matching sessions (newest first) as (id, name, year, day, pain, areas, activity) tuples.
+
+        Days are left as day numbers (see rehab/dates.py); nothing is built per row beyond SQLite's tuple.
+        """
+        _, where, params = self._where(user, year, area, min_pain, max_pain, since_days, start_day, end_day)
+        sql = ("SELECT s.id, u.name, u.year, s.day, s.pain, s.areas, s.activity "
+               "FROM sessions s JOIN users u ON u.id = s.user_id" + where + " ORDER BY s.day DESC, s.id DESC")
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql, params).fetchall()
+
+    def query(self, user=None, year=None, area=None, min_pain=None, max_pain=None,
+              since_days=None, start_day=None, end_day=None, limit=None):
+        """Return matching sessions (newest first) as dictionaries."""
+        return [{"id": sid, "name": name, "year": yr, "date": day_to_date(day), "pain_level": pain,
+                 "body_area": areas, "activity": activity}
+                for sid, name, yr, day, pain, areas, activity in self.query_rows(
+                    user, year, area, min_pain, max_pain, since_days, start_day, end_day, limit)]
+
+    def count(self, user=None, year=None, area=None, min_pain=None, max_pain=None,
+              since_days=None, start_day=None, end_day=None):
+        """Count matching sessions without building result rows."""
+        source, where, params = self._where(user, year, area, min_pain, max_pain, since_days, start_day, end_day,
+                                            for_count=True)
+        return self.conn.execute("SELECT COUNT(*) FROM " + source + where, params).fetchone()[0]
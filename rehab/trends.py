@@ -0,0 +1,152 @@
+# -------------------- RECOVERY TRENDS --------------------
+# Per-user and per-(user, body area) progress figures that are updated in O(1) for each
+# new session, so screens can show trends without rescanning a user's history.
+from collections import deque
+
+from rehab.dates import parse_day
+
+
+class RollingWindow:
+    # Sum and count of pain over the last `days` days, kept as one bucket per day
+    __slots__ = ("days", "buckets", "total", "count")
+
+    def __init__(self, days):
+        self.days = days
+        self.buckets = deque()   # [day, pain sum, sessions] with the newest day on the right
+        self.total = 0
+        self.count = 0
+
+    def add(self, day, pain):
+        if self.buckets and day < self.buckets[-1][0]:
+            # A late (out-of-order) session: at most `days` buckets to look through
+            if day <= self.buckets[-1][0] - self.days:
+                return
+            for bucket in self.buckets:
+                if bucket[0] == day:
+                    bucket[1] += pain
+                    bucket[2] += 1
+                    break
+            else:
+                self.buckets.append([day, pain, 1])
+                self.buckets = deque(sorted(self.buckets))
+        elif self.buckets and day == self.buckets[-1][0]:
+            self.buckets[-1][1] += pain
+            self.buckets[-1][2] += 1
+        else:
+            self.buckets.append([day, pain, 1])
+        self.total += pain
+        self.count += 1
+        self.expire(self.buckets[-1][0])
+
+    def expire(self, today):
+        # Drop whole days that have fallen out of the window
+        while self.buckets and self.buckets[0][0] <= today - self.days:
+            _, pain, sessions = self.buckets.popleft()
+            self.total -= pain
+            self.count -= sessions
+
+    def mean(self, today=None):
+        if today is not None:
+            self.expire(today)
+        return self.total / self.count if self.count else None
+
+
+class TrendStats:
+    # Running figures for one user (or one user + body area)
+    __slots__ = ("count", "total", "first_day", "last_day", "last_pain", "day_streak", "improving_streak",
+                 "sx", "sy", "sxx", "sxy", "week", "month")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.first_day = None
+        self.last_day = None
+        self.last_pain = None
+        self.day_streak = 0          # Consecutive days with at least one session
+        self.improving_streak = 0    # Consecutive sessions with pain no higher than the one before
+        # Least-squares sums for the slope of pain over time (x = days since first session)
+        self.sx = self.sy = self.sxx = self.sxy = 0
+        self.week = RollingWindow(7)
+        self.month = RollingWindow(30)
+
+    def add(self, day, pain):
+        if self.first_day is None:
+            self.first_day = day
+        if self.last_day is None or day > self.last_day:
+            self.day_streak = self.day_streak + 1 if self.last_day == day - 1 else 1
+        if self.last_day is None or day >= self.last_day:
+            if self.last_pain is not None and pain <= self.last_pain:
+                self.improving_streak += 1
+            else:
+                self.improving_streak = 0
+            self.last_day, self.last_pain = day, pain
+
+        self.count += 1
+        self.total += pain
+        x = day - self.first_day
+        self.sx += x
+        self.sy += pain
+        self.sxx += x * x
+        self.sxy += x * pain
+        self.week.add(day, pain)
+        self.month.add(day, pain)
+
+    def slope(self):
+        # Change in pain per day; negative means the patient is improving
+        denominator = self.count * self.sxx - self.sx * self.sx
+        if self.count < 2 or denominator == 0:
+            return None
+        return (self.count * self.sxy - self.sx * self.sy) / denominator
+
+    def summary(self, today=None):
+        # A streak only counts if it reaches today (or yesterday, before today's session)
+        streak = self.day_streak if today is None or today - self.last_day <= 1 else 0
+        return {
+            "sessions": self.count,
+            "mean_pain": self.total / self.count if self.count else None,
+            "mean_7_days": self.week.mean(today),
+            "mean_30_days": self.month.mean(today),
+            "last_pain": self.last_pain,
+            "day_streak": streak,
+            "improving_streak": self.improving_streak,
+            "slope_per_day": self.slope(),
+        }
+
+
+class TrendTracker:
+    def __init__(self):
+        self.by_user = {}        # user -> TrendStats
+        self.by_user_area = {}   # (user, area) -> TrendStats
+
+    def __contains__(self, user):
+        return user in self.by_user
+
+    def add(self, user, date, pain, areas=()):
+        """Fold one session into the user's and each body area's figures."""
+        day = parse_day(date)
+        if isinstance(areas, str):
+            areas = [a.strip() for a in areas.split(",") if a.strip()]
+        stats = self.by_user.get(user)
+        if stats is None:
+            stats = self.by_user[user] = TrendStats()
+        stats.add(day, pain)
+        for area in areas:
+            area_stats = self.by_user_area.get((user, area))
+            if area_stats is None:
+                area_stats = self.by_user_area[user, area] = TrendStats()
+            area_stats.add(day, pain)
+
+    def summary(self, user, area=None, today=None):
+        stats = self.by_user.get(user) if area is None else self.by_user_area.get((user, area))
+        return stats.summary(None if today is None else parse_day(today)) if stats else None
+
+
+def describe(summary):
+    # One line of text for the final screen, e.g. "7-day average 4.5 over 6 sessions — improving"
+    if not summary or summary["sessions"] < 2:
+        return "First recorded session — progress will appear here next time."
+    slope = summary["slope_per_day"]
+    direction = "steady" if slope is None or abs(slope) < 0.05 else ("improving" if slope < 0 else "worsening")
+    week = summary["mean_7_days"]
+    average = f"7-day average {week:.1f}" if week is not None else f"average {summary['mean_pain']:.1f}"
+    return f"{average} over {summary['sessions']} sessions — {direction} (streak: {summary['day_streak']} days)"
@@ -0,0 +1,157 @@
+# -------------------- WRITE-AHEAD SESSION LOG --------------------
+# Append-only history of completed sessions that several kiosk processes can share (for
+# example on a network home directory). Each record is framed with a marker, its length
+# and a CRC32, so a torn write from a crashed kiosk is detected and skipped on read.
+# Writers take an exclusive file lock for each append; threads in one process that append
+# while a commit is in progress are written and fsynced together (group commit).
+import json
+import os
+import struct
+import threading
+import zlib
+
+from rehab.safeio import locked
+
+MAGIC = b"\xabRWL"
+HEADER = struct.Struct("<4sII")   # marker, payload length, CRC32 of the payload
+
+
+def default_path():
+    # Next to the SQLite history, on the (possibly shared) Desktop
+    return os.path.join(os.path.expanduser("~"), "Desktop", "rehab_sessions.wal")
+
+
+def encode_record(payload):
+    return HEADER.pack(MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def scan(data):
+    """Yield (offset, payload) for every intact record in data, skipping torn or corrupt bytes."""
+    pos, end = 0, len(data)
+    while True:
+        pos = data.find(MAGIC, pos)
+        if pos == -1 or pos + HEADER.size > end:
+            return
+        _, length, crc = HEADER.unpack_from(data, pos)
+        start = pos + HEADER.size
+        payload = data[start:start + length]
+        if len(payload) == length and zlib.crc32(payload) == crc:
+            yield pos, payload
+            pos = start + length
+        else:
+            pos += 1   # Torn write (or the marker bytes inside a payload): look for the next record
+
+
+class WriteAheadLog:
+    def __init__(self, path=None, sync=True):
+        self.path = path or default_path()
+        self.sync = sync                    # fsync every commit (off only for tests/benchmarks)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+        self.cond = threading.Condition()
+        self.pending = []                   # Encoded records waiting for the next commit
+        self.open_batch = 0                 # Batch that new records join
+        self.durable = 0                    # Batches below this number are on disk
+        self.committing = False             # A thread is writing a batch right now
+        self.failures = {}                  # batch -> [exception, appenders yet to see it] for failed commits
+        self.commits = 0
+        self.records = 0
+        self.repair()
+
+    def close(self):
+        os.close(self.fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------- Writing --------------------
+    def append(self, payload):
+        """Append one record (bytes); returns once it is on disk."""
+        frame = encode_record(payload)
+        with self.cond:
+            self.pending.append(frame)
+            batch = self.open_batch
+            while self.durable <= batch:
+                if self.committing:
+                    self.cond.wait()        # Another thread is writing; ours goes in the next batch
+                else:
+                    self._commit()          # Become the leader: write everything pending
+            failed = self.failures.get(batch)
+            if failed is not None:          # Every appender of a failed batch raises its error
+                failed[1] -= 1
+                if not failed[1]:
+                    del self.failures[batch]
+                raise failed[0]
+
+    def append_json(self, record):
+        self.append(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+
+    def _commit(self):
+        # Called with self.cond held; released during the slow locked write + fsync
+        frames, self.pending = self.pending, []
+        batch = self.open_batch
+        self.open_batch += 1
+        self.committing = True
+        self.cond.release()
+        error = None
+        try:
+            self._write(b"".join(frames))
+        except Exception as e:
+            error = e
+        finally:
+            self.cond.acquire()
+            self.committing = False
+            self.durable = batch + 1
+            if error is not None:
+                self.failures[batch] = [error, len(frames)]
+            self.commits += 1
+            self.records += len(frames)
+            self.cond.notify_all()
+
+    def _write(self, data):
+        # One locked append per batch: O_APPEND puts it at the current end, after other kiosks' records
+        view = memoryview(data)
+        with locked(self.fd):
+            while view:
+                view = view[os.write(self.fd, view):]
+            if self.sync:
+                os.fsync(self.fd)
+
+    def repair(self):
+        """Cut off a torn record left at the end of the log by a writer that crashed mid-append."""
+        with locked(self.fd):
+            data = self._read()
+            end = 0
+            for offset, payload in scan(data):
+                end = offset + HEADER.size + len(payload)
+            if end < len(data):             # Writers hold the lock, so nothing is mid-append now
+                os.ftruncate(self.fd, end)
+                return len(data) - end
+        return 0
+
+    # -------------------- Reading --------------------
+    def _read(self):
+        if hasattr(os, "pread"):
+            return os.pread(self.fd, os.fstat(self.fd).st_size, 0)
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def __iter__(self):
+        # Payloads of every intact record, oldest first
+        for _, payload in scan(self._read()):
+            yield payload
+
+    def read_json(self):
+        return [json.loads(payload) for payload in self]
+
+    def check(self):
+        """Return counts of intact records and of bytes that belong to no intact record."""
+        data = self._read()
+        records = good = 0
+        for _, payload in scan(data):
+            records += 1
+            good += HEADER.size + len(payload)
+        return {"records": records, "bytes": len(data), "damaged_bytes": len(data) - good}
@@ -0,0 +1,85 @@
+# -------------------- BACKGROUND REPORT WRITER --------------------
+# Moves report formatting and file I/O off the Tk event loop, and the session history's
+# commits (which can wait on another kiosk's lock). Work runs on a single worker thread,
+# in the order it was queued; completion callbacks are handed back to Tk with root.after().
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rehab.instrument import tracer
+from rehab.safeio import atomic_write
+
+
+class ReportWriter:
+    def __init__(self, root, poll_ms=25):
+        self.root = root                # Tk root used to run callbacks on the GUI thread
+        self.poll_ms = poll_ms          # How often finished jobs are checked while any are outstanding
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-writer")
+        self.lock = threading.Lock()
+        self.pending = {}               # path -> (render, on_done) for jobs that have not started yet
+        self.finished = queue.SimpleQueue()
+        self.outstanding = 0            # Jobs submitted but whose callback has not run yet
+        self.polling = False
+
+    def save(self, path, render, on_done=None):
+        """Write render() to path in the background; returns False if it was merged into a queued save."""
+        with self.lock:
+            coalesced = path in self.pending
+            # A queued save for the same file is replaced by the newest one (repeated clicks)
+            self.pending[path] = (render, on_done)
+        if coalesced:
+            return False
+        self.outstanding += 1
+        self.executor.submit(self._write, path)
+        self._schedule_poll()
+        return True
+
+    def run(self, job, on_done=None):
+        """Run job() in the background; on_done(result, error) is then called on the Tk thread."""
+        self.outstanding += 1
+        self.executor.submit(self._run, job, on_done)
+        self._schedule_poll()
+
+    def _run(self, job, on_done):
+        result = error = None
+        try:
+            result = job()
+        except Exception as e:
+            error = e
+        self.finished.put((on_done, result, error))
+
+    def _write(self, path):
+        # Runs on the worker thread: format and write, never touching Tk
+        with self.lock:
+            render, on_done = self.pending.pop(path)
+        error = None
+        try:
+            with tracer.span("write_report", "io"):
+                # Temp file + rename: another kiosk writing the same path cannot leave a torn file
+                atomic_write(path, render())
+        except Exception as e:
+            error = e
+        self.finished.put((on_done, path, error))
+
+    # -------------------- Tk-side polling --------------------
+    def _schedule_poll(self):
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        # Runs on the Tk thread: deliver finished jobs, keep polling while work remains
+        while True:
+            try:
+                on_done, value, error = self.finished.get_nowait()   # value: the path, or run()'s result
+            except queue.Empty:
+                break
+            self.outstanding -= 1
+            if on_done is not None:
+                on_done(value, error)
+        self.polling = False
+        if self.outstanding:
+            self._schedule_poll()
+
+    def close(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,144 @@
+# -------------------- OUTBOX UPLOADS --------------------
+# The uploader against the stand-in clinic server (benchmarks/sync_server.py): retries with
+# backoff, idempotent re-sends, batch halving, and draining after an outage.
+# Usage: python -m pytest tests
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from rehab.outbox import Outbox, Uploader   # noqa: E402
+from sync_server import ClinicServer         # noqa: E402
+
+
+@pytest.fixture
+def server():
+    server = ClinicServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    with Outbox(str(tmp_path / "outbox.db")) as outbox:
+        yield outbox
+
+
+def queue(outbox, count):
+    return outbox.put_many([{"key": f"session-{n}", "name": f"Student {n}", "pain": n % 11} for n in range(count)])
+
+
+def uploader(outbox, server, **options):
+    options.setdefault("base_delay", 0.01)
+    options.setdefault("timeout", 5)
+    return Uploader(outbox, server.url, **options)
+
+
+# -------------------- Retry and backoff --------------------
+def test_server_errors_back_off_exponentially(server, outbox):
+    queue(outbox, 40)
+    server.fail_rate = 1.0
+    up = uploader(outbox, server, batch_size=32, base_delay=1.0, max_delay=8.0)
+    delays = []
+    for _ in range(5):
+        assert up.step() == 0
+        delays.append(up.delay)
+    assert up.failures == 5
+    for attempt, delay in enumerate(delays):
+        cap = min(8.0, 2 ** attempt)
+        assert cap / 2 <= delay <= cap      # Jittered within [half, full] of the doubled delay
+    assert up.batch_size < 32               # Sends less once the server recovers
+    assert len(outbox) == 40 and server.stored == 0
+
+    server.fail_rate = 0.0
+    assert up.step() > 0
+    assert up.failures == 0 and up.delay == 0.0 and up.last_error is None
+
+
+def test_retry_after_is_honoured(server, outbox):
+    queue(outbox, 5)
+    server.fail_rate, server.retry_after = 1.0, 3
+    up = uploader(outbox, server, max_delay=60.0)
+    up.step()
+    assert up.last_error.status == 503
+    assert up.delay >= 3
+
+
+def test_configuration_errors_keep_the_queue(server, outbox):
+    queue(outbox, 20)
+    for status in (401, 403, 404):
+        server.refuse = status
+        up = uploader(outbox, server)
+        assert up.drain() is False          # Stops instead of retrying forever
+        assert up.config_error and up.delay > 0
+        assert outbox.counts() == (20, 0)
+    server.refuse = None
+    assert uploader(outbox, server).drain()
+    assert server.stored == 20
+
+
+# -------------------- Idempotent re-send --------------------
+def test_lost_reply_is_sent_again_and_stored_once(server, outbox):
+    keys = queue(outbox, 10)
+    server.lost_replies = 1.0
+    up = uploader(outbox, server)
+    assert up.step() == 0                   # Stored by the server, but the kiosk never heard so
+    assert server.stored == 10 and len(outbox) == 10
+
+    server.lost_replies = 0.0
+    assert up.step() == 10
+    assert len(outbox) == 0
+    assert server.stored == 10 and server.duplicates == 10
+    assert server.keys == set(keys)
+
+
+def test_requeued_session_keeps_its_key(server, outbox):
+    outbox.put({"key": "fixed", "name": "Ann"})
+    outbox.put({"key": "fixed", "name": "Ann"})   # Resumed after a crash: queued once
+    assert len(outbox) == 1
+    assert uploader(outbox, server).drain()
+    assert server.keys == {"fixed"} and server.stored == 1
+
+
+# -------------------- Batch halving --------------------
+def test_too_large_batches_are_halved(server, outbox):
+    queue(outbox, 100)
+    server.max_sessions = 10
+    up = uploader(outbox, server, batch_size=64)
+    assert up.drain()
+    assert server.stored == 100 and outbox.counts() == (0, 0)
+    assert max(server.batch_sizes) <= 10
+
+
+def test_refused_session_is_set_aside(server, outbox):
+    queue(outbox, 50)
+    server.bad_keys = {"session-17"}
+    up = uploader(outbox, server, batch_size=32)
+    assert up.drain()
+    assert outbox.counts() == (0, 1)
+    assert server.stored == 49 and "session-17" not in server.keys
+
+    server.bad_keys = set()
+    assert outbox.requeue_rejected() == 1
+    assert up.drain()
+    assert server.stored == 50 and outbox.counts() == (0, 0)
+
+
+# -------------------- Outage --------------------
+def test_drains_after_an_outage(server, outbox):
+    keys = queue(outbox, 200)
+    server.down = True
+    up = uploader(outbox, server, batch_size=50)
+    for _ in range(3):
+        assert up.step() == 0
+    assert up.failures == 3 and server.stored == 0
+
+    server.down = False
+    assert up.drain(deadline=None)
+    assert len(outbox) == 0
+    assert server.keys == set(keys) and server.stored == 200